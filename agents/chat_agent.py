@@ -1,28 +1,33 @@
 # agents/chat_agent.py
 
 from typing import Dict, Any, List, Literal
-from langchain_core.messages import BaseMessage, AIMessage, HumanMessage, SystemMessage
+from langchain_core.messages import BaseMessage, AIMessage, HumanMessage, SystemMessage, ToolMessage
 from langgraph.prebuilt import ToolNode
 from langgraph.graph import START,END, StateGraph, MessagesState
-from langchain_openai import ChatOpenAI
 from langgraph.checkpoint.memory import MemorySaver
 import uuid
 import getpass
 import socket
-import sqlite3
-from langgraph.checkpoint.sqlite import SqliteSaver
-from langchain_community.chat_message_histories import SQLChatMessageHistory
+from agents.model_router import ModelRouter, get_model_router
+from agents.memory import ChatState, create_memory_node
+from agents.checkpointer import create_checkpointer
+from agents.chat_history import get_history_writer
+from agents.utils.timing import stage
 
 
-# Initialize persistence memory saver 
-conn = sqlite3.connect("checkpoints.sqlite",check_same_thread=False)
-memory = SqliteSaver(conn)
+# Initialize persistence memory saver (pooled WAL connections, compression, retention)
+memory = create_checkpointer()
 
-def get_chat_config(username: str = None):
+def get_chat_config(username: str = None, session_id: str = None):
     """
     Generate configuration for chat session
     Args:
         username (str, optional): Username for the thread. If None, gets system username
+        session_id (str, optional): Session suffix for the thread. If None, a new one is generated,
+            so each browser session (and each cleared conversation) gets its own thread
+
+    The config has no checkpoint_id, so every invoke resumes from the latest checkpoint of the
+    thread and callers only need to send the new messages of a turn.
     """
     if username is None:
         try:
@@ -32,41 +37,74 @@ def get_chat_config(username: str = None):
             username = "default_user"
     
     hostname = socket.gethostname()
-    print(f"thread_id: {username}_{hostname}")
+    session_id = session_id or uuid.uuid4().hex[:12]
+    thread_id = f"{username}_{hostname}_{session_id}"
+    print(f"thread_id: {thread_id}")
     return {
         "configurable": {
-            "thread_id": f"{username}_{hostname}",  # Combines username and hostname
-            "checkpoint_ns": "graph_state",
-            "checkpoint_id": str(uuid.uuid4())
+            "thread_id": thread_id,  # Combines username, hostname and session
+            "checkpoint_ns": ""
         }
     }
 
-def create_agent():
-    # Initialize LLM
-    llm = ChatOpenAI(
-        model="gpt-4o", # Note: the prompt works best with gpt-4
-        temperature=0,
-        streaming=True
+def messages_since(messages: List[BaseMessage], message_id: str) -> List[BaseMessage]:
+    """Messages produced after the message with the given id (the current run's output)"""
+    for index in range(len(messages) - 1, -1, -1):
+        if messages[index].id == message_id:
+            return messages[index + 1:]
+    return []
+
+def create_cypher_tool(direct_results: bool = None, router: ModelRouter = None):
+    """cypher_qa tool using the cypher, qa and escalation models of the router"""
+    # Imported here to avoid circular imports
+    from tools.cypher_qa import CypherQATool
+
+    router = router or get_model_router()
+    return CypherQATool(
+        llm=router.get("cypher"),
+        direct_results=direct_results,
+        qa_llm=router.get("qa"),
+        escalation_llm=router.escalation("cypher")
     )
+
+def create_agent(direct_cypher_results: bool = None, router: ModelRouter = None):
+    """
+    Build and compile the agent graph
+
+    Args:
+        direct_cypher_results (bool, optional): If True, cypher_qa returns rows and the executed
+            Cypher straight to the agent (no QA LLM pass). Defaults to CYPHER_QA_RETURN_DIRECT.
+        router (ModelRouter, optional): Model per role (agent, final, cypher, qa). Defaults to
+            the process-wide router configured from the environment; per-role latency and
+            tokens are available from router.usage.snapshot().
+    """
+    # Initialize LLMs. Note: the prompt works best with gpt-4o, which is the default for every role
+    router = router or get_model_router()
     
     # Import tools here to avoid circular imports
     # from tools.web_search import TavilySearchTool
     from tools.web_search_pydantic import TavilySearchTool
-    from tools.cypher_qa import CypherQATool
+    from tools.cypher_qa import DIRECT_RESULTS_INSTRUCTIONS
     
     # Initialize tools
+    cypher_tool = create_cypher_tool(direct_cypher_results, router)
     tools = [
         TavilySearchTool(),
-        CypherQATool(llm=llm)
+        cypher_tool
     ]
+    extra_instructions = DIRECT_RESULTS_INSTRUCTIONS if cypher_tool.direct_results else ""
     
     # Create ToolNode
     tool_node = ToolNode(tools)
     
-    # Bind tools to the model
-    model_with_tools = llm.bind_tools(tools)
+    # Bind tools to the models: a cheap model can route to tools, the final model
+    # writes the answer once tool results are in
+    model_with_tools = {
+        "agent": router.get("agent").bind_tools(tools),
+        "final": router.get("final").bind_tools(tools),
+    }
 
-    def should_continue(state: MessagesState):
+    def should_continue(state: ChatState):
         """Determine if we should continue the conversation or use tools"""
         messages = state["messages"]
         last_message = messages[-1]
@@ -77,14 +115,12 @@ def create_agent():
         return END
 
     
-    def call_model(state: MessagesState, config):
+    def call_model(state: ChatState, config):
         """Call the model to get the next response"""
 
-        # Initialize chat history
-        chat_history = SQLChatMessageHistory(
-            session_id=config["configurable"]["thread_id"],
-            connection="sqlite:///chat_history.db"
-        )
+        # Shared write-behind chat history (writes happen off the hot path)
+        chat_history = get_history_writer()
+        session_id = config["configurable"]["thread_id"]
 
         messages = state["messages"]
         if not any(isinstance(msg, SystemMessage) for msg in messages):
@@ -130,30 +166,40 @@ def create_agent():
             - [Question 1]
             - [Question 2]
             - [Question 3]"
-            """)
+            """ + extra_instructions)
+
+            # Prepend without mutating the state list, which the checkpointer persists
+            messages = [system_message] + messages
 
-            messages.insert(0, system_message)
+        # Running summary of the turns the memory node dropped from the window
+        if state.get("summary"):
+            summary_message = SystemMessage(content=f"Summary of the earlier conversation:\n{state['summary']}")
+            messages = messages[:1] + [summary_message] + messages[1:]
         
         # Get response from model
-        response = model_with_tools.invoke(messages, config=config)
+        role = "final" if isinstance(messages[-1], ToolMessage) else "agent"
+        with stage(role):
+            response = model_with_tools[role].invoke(messages, config=config)
 
         # Save only new messages to chat history
         last_message = messages[-1]
         if isinstance(last_message, HumanMessage):  # Save only if last message was from human
-            chat_history.add_message(last_message)
-        chat_history.add_message(response)
+            chat_history.enqueue(session_id, last_message)
+        chat_history.enqueue(session_id, response)
 
         return {"messages": [response]}
 
   
     # Create the graph
-    workflow = StateGraph(MessagesState)
+    workflow = StateGraph(ChatState)
 
-    # Define the two nodes we will cycle between
+    # Memory management runs once per turn, then the agent and tools cycle
+    workflow.add_node("memory", create_memory_node(router.get("summary")))
     workflow.add_node("agent", call_model)
     workflow.add_node("tools", tool_node)
 
-    workflow.add_edge(START, "agent")
+    workflow.add_edge(START, "memory")
+    workflow.add_edge("memory", "agent")
     workflow.add_conditional_edges(
         "agent", 
         should_continue, 
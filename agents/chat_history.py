@@ -0,0 +1,123 @@
+# agents/chat_history.py
+
+import atexit
+import os
+import queue
+import threading
+import time
+from typing import List, Optional, Tuple
+from langchain_core.messages import BaseMessage
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from agents.utils.timing import stage
+
+_STOP = object()
+
+
+class ChatHistoryWriter:
+    """
+    Process-wide, write-behind store for the chat history table.
+
+    One SQLAlchemy engine is shared by all sessions. `enqueue` only puts the message on a
+    queue; a background worker writes queued messages from all sessions in batched
+    transactions, in enqueue order. `flush` waits for the queued messages to be written;
+    `close` (registered with atexit) drains the queue and stops the worker.
+
+    Args:
+        connection: SQLAlchemy connection string
+        batch_size: Max messages per transaction
+        flush_interval: Seconds the worker waits to fill a batch
+    """
+
+    def __init__(self, connection: str = "sqlite:///chat_history.db", batch_size: int = 200,
+                 flush_interval: float = 0.5):
+        # langchain_community is imported with the first writer, not with the app
+        from langchain_community.chat_message_histories import SQLChatMessageHistory
+
+        self.engine = create_engine(connection)
+        # Creates the message table and provides the message <-> row converter
+        self.converter = SQLChatMessageHistory(session_id="__writer__", connection=self.engine).converter
+        self.session_factory = sessionmaker(bind=self.engine)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: "queue.Queue" = queue.Queue()
+        self._closed = False
+        self._worker = threading.Thread(target=self._run, name="chat-history-writer", daemon=True)
+        self._worker.start()
+
+    def enqueue(self, session_id: str, message: BaseMessage) -> None:
+        """Queue a message for writing; never blocks on the database"""
+        if self._closed:
+            self._write([(session_id, message)])
+            return
+        self._queue.put((session_id, message))
+
+    def get_history(self, session_id: str) -> "SQLChatMessageHistory":
+        """History of one session on the shared engine (for reads)"""
+        from langchain_community.chat_message_histories import SQLChatMessageHistory
+
+        return SQLChatMessageHistory(session_id=session_id, connection=self.engine)
+
+    def flush(self) -> None:
+        """Block until every message queued so far is written"""
+        self._queue.join()
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            taken = 1
+            stop = item is _STOP
+            batch: List[Tuple[str, BaseMessage]] = [] if stop else [item]
+
+            # Give concurrent sessions a moment to add to the same transaction
+            deadline = time.monotonic() + self.flush_interval
+            while not stop and len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                taken += 1
+                if item is _STOP:
+                    stop = True
+                else:
+                    batch.append(item)
+
+            if batch:
+                self._write(batch)
+            for _ in range(taken):
+                self._queue.task_done()
+            if stop:
+                return
+
+    def _write(self, batch: List[Tuple[str, BaseMessage]]) -> None:
+        try:
+            with stage("history_write"), self.session_factory() as session:
+                session.add_all([self.converter.to_sql_model(message, session_id) for session_id, message in batch])
+                session.commit()
+        except Exception as e:
+            print(f"Failed to write {len(batch)} chat history messages: {e}")
+
+    def close(self, timeout: Optional[float] = 10.0) -> None:
+        """Write everything still queued and stop the worker"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._worker.join(timeout)
+
+
+_writer: Optional[ChatHistoryWriter] = None
+_writer_lock = threading.Lock()
+
+
+def get_history_writer() -> ChatHistoryWriter:
+    """Process-wide history writer (env CHAT_HISTORY_DB, default sqlite:///chat_history.db)"""
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = ChatHistoryWriter(os.getenv("CHAT_HISTORY_DB", "sqlite:///chat_history.db"))
+            atexit.register(_writer.close)
+        return _writer
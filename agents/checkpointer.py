@@ -0,0 +1,264 @@
+# agents/checkpointer.py
+
+import os
+import queue
+import sqlite3
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional, Tuple
+from langgraph.checkpoint.serde.base import SerializerProtocol
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+from langgraph.checkpoint.sqlite import SqliteSaver
+from agents.utils.timing import stage
+
+try:
+    import zstandard
+except ImportError:  # zstandard is optional, zlib is used instead
+    zstandard = None
+
+# Offset between the UUIDv6 epoch (1582-10-15) and the unix epoch, in 100ns intervals
+UUID_EPOCH_OFFSET = 0x01B21DD213814000
+
+
+class CompressedSerializer(SerializerProtocol):
+    """
+    Wraps a serializer and compresses typed payloads (checkpoints and writes) larger than
+    `min_size` bytes with zstd, or zlib if zstandard is not installed. The codec is appended
+    to the stored type ("msgpack+zstd") so uncompressed rows stay readable.
+    """
+
+    def __init__(self, inner: Optional[SerializerProtocol] = None, level: int = 3, min_size: int = 512):
+        self.inner = inner or JsonPlusSerializer()
+        self.level = level
+        self.min_size = min_size
+        self.codec = "zstd" if zstandard is not None else "zlib"
+
+    def dumps(self, obj: Any) -> bytes:
+        return self.inner.dumps(obj)
+
+    def loads(self, data: bytes) -> Any:
+        return self.inner.loads(data)
+
+    def dumps_typed(self, obj: Any) -> Tuple[str, bytes]:
+        type_, data = self.inner.dumps_typed(obj)
+        if len(data) < self.min_size:
+            return type_, data
+        if self.codec == "zstd":
+            return f"{type_}+zstd", zstandard.ZstdCompressor(level=self.level).compress(data)
+        return f"{type_}+zlib", zlib.compress(data, self.level)
+
+    def loads_typed(self, data: Tuple[str, bytes]) -> Any:
+        type_, payload = data
+        type_, _, codec = type_.partition("+")
+        if codec == "zstd":
+            if zstandard is None:
+                raise RuntimeError("zstandard is required to read zstd-compressed checkpoints")
+            payload = zstandard.ZstdDecompressor().decompress(payload)
+        elif codec == "zlib":
+            payload = zlib.decompress(payload)
+        return self.inner.loads_typed((type_, payload))
+
+
+def checkpoint_timestamp(checkpoint_id: str) -> Optional[float]:
+    """Unix time encoded in a (UUIDv6) checkpoint id, or None if it cannot be parsed"""
+    try:
+        hex_id = checkpoint_id.replace("-", "")
+        ticks = (int(hex_id[0:12], 16) << 12) | int(hex_id[13:16], 16)
+        return (ticks - UUID_EPOCH_OFFSET) / 1e7
+    except (ValueError, AttributeError):
+        return None
+
+
+class PooledSqliteSaver(SqliteSaver):
+    """
+    SqliteSaver with a pool of WAL-mode connections, compressed blobs and a retention policy.
+
+    Each checkpoint operation checks out its own connection, so readers do not wait on the
+    single shared connection lock and writers only wait on SQLite's own write lock
+    (busy_timeout). `maintain()` applies the retention policy and reclaims space; it runs
+    periodically on a background thread once `start_maintenance()` is called.
+
+    Args:
+        path: SQLite database file
+        pool_size: Number of pooled connections
+        keep_last: Checkpoints kept per thread/namespace (0 keeps all)
+        thread_ttl: Seconds after the last checkpoint before a thread is deleted (0 disables)
+        busy_timeout: Seconds a connection waits for the write lock
+    """
+
+    def __init__(self, path: str, pool_size: int = 4, keep_last: int = 20, thread_ttl: float = 0,
+                 busy_timeout: float = 30.0, serde: Optional[SerializerProtocol] = None):
+        self.path = path
+        self.keep_last = keep_last
+        self.thread_ttl = thread_ttl
+        self.busy_timeout = busy_timeout
+        self._pool: "queue.Queue[sqlite3.Connection]" = queue.Queue()
+        for _ in range(max(1, pool_size)):
+            self._pool.put(self._connect())
+        self._setup_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._maintenance_thread: Optional[threading.Thread] = None
+        # A connection of its own for the base class (setup() and any inherited code using
+        # self.conn), so it never shares one with a thread that checked out a pooled connection
+        super().__init__(self._connect(), serde=serde or CompressedSerializer())
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, check_same_thread=False, timeout=self.busy_timeout)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout * 1000)}")
+        return conn
+
+    def setup(self) -> None:
+        if self.is_setup:
+            return
+        with self._setup_lock:
+            if self.is_setup:
+                return
+            # Only takes effect on a new database, before the tables are created
+            self.conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            super().setup()
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """Check out a pooled connection (the wait is reported as the checkpoint_pool_wait stage)"""
+        with stage("checkpoint_pool_wait"):
+            conn = self._pool.get()
+        try:
+            yield conn
+        finally:
+            self._pool.put(conn)
+
+    @contextmanager
+    def cursor(self, transaction: bool = True) -> Iterator[sqlite3.Cursor]:
+        self.setup()
+        with stage("checkpoint_write" if transaction else "checkpoint_read"), self.connection() as conn:
+            cur = conn.cursor()
+            try:
+                yield cur
+                if transaction:
+                    conn.commit()
+            except Exception:
+                if transaction:
+                    conn.rollback()
+                raise
+            finally:
+                cur.close()
+
+    def prune(self) -> Dict[str, int]:
+        """
+        Apply the retention policy: delete threads idle for longer than thread_ttl and all but
+        the last keep_last checkpoints of each thread, then orphaned writes.
+
+        Returns:
+            dict with the number of deleted threads, checkpoints and writes
+        """
+        deleted = {"threads": 0, "checkpoints": 0, "writes": 0}
+        with self.cursor() as cur:
+            if self.thread_ttl:
+                cutoff = time.time() - self.thread_ttl
+                cur.execute("SELECT thread_id, MAX(checkpoint_id) FROM checkpoints GROUP BY thread_id")
+                stale = [
+                    (thread_id,) for thread_id, last_id in cur.fetchall()
+                    if (checkpoint_timestamp(last_id) or cutoff) < cutoff
+                ]
+                if stale:
+                    cur.executemany("DELETE FROM checkpoints WHERE thread_id = ?", stale)
+                    deleted["checkpoints"] += cur.rowcount
+                    cur.executemany("DELETE FROM writes WHERE thread_id = ?", stale)
+                    deleted["writes"] += cur.rowcount
+                    deleted["threads"] = len(stale)
+
+            if self.keep_last:
+                cur.execute("""
+                    DELETE FROM checkpoints WHERE rowid IN (
+                        SELECT rowid FROM (
+                            SELECT rowid, ROW_NUMBER() OVER (
+                                PARTITION BY thread_id, checkpoint_ns ORDER BY checkpoint_id DESC
+                            ) AS rn
+                            FROM checkpoints
+                        ) WHERE rn > ?
+                    )""", (self.keep_last,))
+                deleted["checkpoints"] += cur.rowcount
+                cur.execute("""
+                    DELETE FROM writes WHERE NOT EXISTS (
+                        SELECT 1 FROM checkpoints c
+                        WHERE c.thread_id = writes.thread_id
+                          AND c.checkpoint_ns = writes.checkpoint_ns
+                          AND c.checkpoint_id = writes.checkpoint_id
+                    )""")
+                deleted["writes"] += cur.rowcount
+        return deleted
+
+    def vacuum(self) -> None:
+        """Truncate the WAL and return free pages to the file system"""
+        with self.connection() as conn:
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            auto_vacuum = conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+            if auto_vacuum == 2:  # INCREMENTAL
+                conn.execute("PRAGMA incremental_vacuum")
+                conn.commit()
+                return
+            # Databases created before auto_vacuum was enabled need one full VACUUM to switch
+            free_pages = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            total_pages = conn.execute("PRAGMA page_count").fetchone()[0]
+            if total_pages and free_pages > total_pages // 4:
+                conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+                conn.execute("VACUUM")
+
+    def maintain(self) -> Dict[str, int]:
+        """Prune and vacuum once"""
+        deleted = self.prune()
+        self.vacuum()
+        if any(deleted.values()):
+            print(f"Checkpoint maintenance: deleted {deleted}")
+        return deleted
+
+    def start_maintenance(self, interval: float = 600) -> None:
+        """Run maintain() every `interval` seconds on a daemon thread"""
+        if self._maintenance_thread is not None:
+            return
+
+        def run():
+            while not self._stop.wait(interval):
+                try:
+                    self.maintain()
+                except Exception as e:
+                    print(f"Checkpoint maintenance failed: {e}")
+
+        self._maintenance_thread = threading.Thread(target=run, name="checkpoint-maintenance", daemon=True)
+        self._maintenance_thread.start()
+
+    def close(self) -> None:
+        """Stop the maintenance thread and close the pooled connections"""
+        self._stop.set()
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+def create_checkpointer(path: str = None) -> PooledSqliteSaver:
+    """
+    Create the checkpoint store from the environment and start its background maintenance.
+
+    Env vars:
+        CHECKPOINT_DB: Database file (default checkpoints.sqlite)
+        CHECKPOINT_POOL_SIZE: Pooled connections (default 4)
+        CHECKPOINT_KEEP_LAST: Checkpoints kept per thread (default 20, 0 keeps all)
+        CHECKPOINT_THREAD_TTL_HOURS: Delete threads idle for longer (default 168, 0 disables)
+        CHECKPOINT_VACUUM_INTERVAL: Seconds between maintenance runs (default 600, 0 disables)
+    """
+    saver = PooledSqliteSaver(
+        path or os.getenv("CHECKPOINT_DB", "checkpoints.sqlite"),
+        pool_size=int(os.getenv("CHECKPOINT_POOL_SIZE", "4")),
+        keep_last=int(os.getenv("CHECKPOINT_KEEP_LAST", "20")),
+        thread_ttl=float(os.getenv("CHECKPOINT_THREAD_TTL_HOURS", "168")) * 3600,
+    )
+    interval = float(os.getenv("CHECKPOINT_VACUUM_INTERVAL", "600"))
+    if interval > 0:
+        saver.start_maintenance(interval)
+    return saver
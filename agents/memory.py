@@ -0,0 +1,168 @@
+# agents/memory.py
+
+import json
+import logging
+import os
+from typing import Any, Dict, List, Optional
+from langchain_core.messages import (
+    AIMessage, BaseMessage, HumanMessage, RemoveMessage, SystemMessage, ToolMessage
+)
+from langgraph.graph import MessagesState
+from agents.utils.timing import stage
+
+DIGEST_PREFIX = "[digest]"
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_PROMPT = """You maintain a running summary of an investigation conversation between an AML analyst and an assistant.
+Update the existing summary with the new messages. Keep names of persons, aliases, programs, document numbers,
+Cypher queries that were useful, key findings and open questions. Be concise (at most 200 words)."""
+
+
+class ChatState(MessagesState):
+    """Graph state: the message list plus a running summary of messages dropped from it"""
+    summary: str
+
+
+def estimate_tokens(message: BaseMessage) -> int:
+    """Rough token count of a message (about 4 characters per token)"""
+    content = message.content if isinstance(message.content, str) else json.dumps(message.content)
+    size = len(content)
+    for tool_call in getattr(message, "tool_calls", None) or []:
+        size += len(json.dumps(tool_call.get("args", {})))
+    return size // 4 + 4
+
+
+def split_turns(messages: List[BaseMessage]) -> List[List[BaseMessage]]:
+    """Group messages into turns, each starting with a HumanMessage"""
+    turns: List[List[BaseMessage]] = []
+    for message in messages:
+        if isinstance(message, HumanMessage) or not turns:
+            turns.append([])
+        turns[-1].append(message)
+    return turns
+
+
+def digest_tool_output(content: str, max_chars: int) -> str:
+    """Short description of a tool output that keeps the query and the size of the result"""
+    try:
+        payload = json.loads(content)
+    except (json.JSONDecodeError, TypeError):
+        payload = None
+
+    if isinstance(payload, dict) and ("cypher" in payload or "intermediate_steps" in payload):
+        steps = payload.get("intermediate_steps") or [{}]
+        cypher = payload.get("cypher") or steps[0].get("query", "")
+        if "row_count" in payload:
+            detail = f"{payload['row_count']} rows: {json.dumps(payload.get('rows', []))}"
+        else:
+            detail = str(payload.get("result", ""))
+        text = f"cypher_qa ran `{cypher}` -> {detail}"
+    elif isinstance(payload, dict) and "results" in payload:
+        sources = "; ".join(f"{r.get('title')} ({r.get('url')})" for r in payload.get("results", []))
+        text = f"web_search '{payload.get('query')}': {payload.get('answer') or ''} Sources: {sources}"
+    else:
+        text = content
+
+    if len(text) > max_chars:
+        text = text[:max_chars] + "..."
+    return f"{DIGEST_PREFIX} {text}"
+
+
+def format_transcript(messages: List[BaseMessage]) -> str:
+    """Plain text transcript of messages for the summarizer"""
+    lines = []
+    for message in messages:
+        if isinstance(message, HumanMessage):
+            lines.append(f"Analyst: {message.content}")
+        elif isinstance(message, ToolMessage):
+            lines.append(f"Tool {message.name}: {message.content}")
+        elif isinstance(message, AIMessage):
+            for tool_call in message.tool_calls or []:
+                lines.append(f"Assistant called {tool_call['name']} with {json.dumps(tool_call['args'])}")
+            if message.content:
+                lines.append(f"Assistant: {message.content}")
+    return "\n".join(lines)
+
+
+def create_memory_node(summarizer_llm: Any, token_budget: int = None, keep_turns: int = None,
+                       digest_chars: int = None):
+    """
+    Build the memory management node that runs before each agent turn.
+
+    The last `keep_turns` turns are kept verbatim. Tool outputs in older turns are replaced
+    with short digests. If the conversation is still over `token_budget`, the oldest turns are
+    removed from the state and folded into the running summary; when the recent turns alone
+    are over it, they are digested and summarized the same way, oldest first, down to the
+    current turn.
+
+    Args:
+        summarizer_llm: Chat model used to update the running summary
+        token_budget: Max estimated tokens of history (env MEMORY_TOKEN_BUDGET, default 12000)
+        keep_turns: Number of recent turns kept verbatim (env MEMORY_KEEP_TURNS, default 4)
+        digest_chars: Max characters of a tool output digest (env MEMORY_DIGEST_CHARS, default 400)
+    """
+    token_budget = token_budget or int(os.getenv("MEMORY_TOKEN_BUDGET", "12000"))
+    keep_turns = max(1, keep_turns or int(os.getenv("MEMORY_KEEP_TURNS", "4")))
+    digest_chars = digest_chars or int(os.getenv("MEMORY_DIGEST_CHARS", "400"))
+
+    def manage_memory(state: ChatState) -> Optional[Dict[str, Any]]:
+        """Digest old tool outputs and summarize turns that no longer fit the token budget"""
+        turns = split_turns(state["messages"])
+        older, recent = turns[:-keep_turns], turns[-keep_turns:]
+        updates: List[BaseMessage] = []
+
+        def digest_turn(turn: List[BaseMessage]) -> int:
+            """Replace the tool outputs of a turn with digests; returns the tokens saved"""
+            saved = 0
+            for index, message in enumerate(turn):
+                if (isinstance(message, ToolMessage) and len(message.content) > digest_chars
+                        and not message.content.startswith(DIGEST_PREFIX)):
+                    # Same id, so add_messages replaces the original
+                    digest = ToolMessage(
+                        content=digest_tool_output(message.content, digest_chars),
+                        tool_call_id=message.tool_call_id,
+                        name=message.name,
+                        id=message.id
+                    )
+                    saved += estimate_tokens(message) - estimate_tokens(digest)
+                    turn[index] = digest
+                    updates.append(digest)
+            return saved
+
+        for turn in older:
+            digest_turn(turn)
+
+        summary = state.get("summary", "")
+        total = sum(estimate_tokens(m) for turn in turns for m in turn) + len(summary) // 4
+
+        # Drop whole turns (tool calls stay paired with their results) until under budget. When
+        # only recent turns are left, the oldest of them becomes an older turn (digested first,
+        # dropped if that is not enough); the current turn is always kept.
+        dropped: List[BaseMessage] = []
+        while total > token_budget and (older or len(recent) > 1):
+            if not older:
+                turn = recent.pop(0)
+                total -= digest_turn(turn)
+                older.append(turn)
+                continue
+            turn = older.pop(0)
+            total -= sum(estimate_tokens(m) for m in turn)
+            dropped.extend(turn)
+
+        if not dropped:
+            # None, not {}: LangGraph rejects an update that writes no channel
+            return {"messages": updates} if updates else None
+
+        logger.info("Summarizing %d messages to stay under %d tokens", len(dropped), token_budget)
+        with stage("summary"):
+            response = summarizer_llm.invoke([
+                SystemMessage(content=SUMMARY_PROMPT),
+                HumanMessage(content=f"Existing summary:\n{summary or '(none)'}\n\nNew messages:\n{format_transcript(dropped)}")
+            ])
+        dropped_ids = {m.id for m in dropped}
+        updates = [m for m in updates if m.id not in dropped_ids]
+        updates.extend(RemoveMessage(id=m.id) for m in dropped)
+        return {"messages": updates, "summary": response.content}
+
+    return manage_memory
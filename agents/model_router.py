@@ -0,0 +1,176 @@
+# agents/model_router.py
+
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+from uuid import UUID
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+from langchain_openai import ChatOpenAI
+from agents.utils.cassettes import CassetteChatModel, get_cassette_store
+from agents.utils.metrics import get_metrics
+
+DEFAULT_MODEL = "gpt-4o"
+
+# Role -> env var holding the model name used for that role
+ROLE_ENV = {
+    "agent": "AGENT_MODEL",    # ReAct steps that decide which tool to call
+    "final": "FINAL_MODEL",    # Agent step that writes the answer from tool results
+    "cypher": "CYPHER_MODEL",  # Cypher generation in cypher_qa
+    "qa": "QA_MODEL",          # QA step in cypher_qa (unused in direct mode)
+    "summary": "SUMMARY_MODEL",  # Rolling conversation summary in the memory node
+}
+ESCALATION_ENV = "ESCALATION_MODEL"
+
+logger = logging.getLogger(__name__)
+
+
+class ModelUsageStats:
+    """Thread-safe per-role counters for LLM calls, latency and tokens"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, Any]] = {}
+
+    def record(self, role: str, model: str, latency: float, input_tokens: int = 0,
+               output_tokens: int = 0, error: bool = False):
+        with self._lock:
+            stats = self._stats.setdefault(role, {
+                "model": model,
+                "calls": 0,
+                "errors": 0,
+                "latency_s": 0.0,
+                "max_latency_s": 0.0,
+                "input_tokens": 0,
+                "output_tokens": 0,
+            })
+            stats["calls"] += 1
+            stats["errors"] += int(error)
+            stats["latency_s"] += latency
+            stats["max_latency_s"] = max(stats["max_latency_s"], latency)
+            stats["input_tokens"] += input_tokens
+            stats["output_tokens"] += output_tokens
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Copy of the counters with the average latency per call added"""
+        with self._lock:
+            result = {role: dict(stats) for role, stats in self._stats.items()}
+        for stats in result.values():
+            stats["avg_latency_s"] = stats["latency_s"] / stats["calls"] if stats["calls"] else 0.0
+        return result
+
+
+class UsageRecorder(BaseCallbackHandler):
+    """Callback that records the latency and token usage of each call made by one role"""
+
+    def __init__(self, role: str, model: str, stats: ModelUsageStats):
+        self.role = role
+        self.model = model
+        self.stats = stats
+        self._starts: Dict[UUID, float] = {}
+
+    def on_chat_model_start(self, serialized, messages, *, run_id: UUID, **kwargs):
+        self._starts[run_id] = time.perf_counter()
+
+    def on_llm_start(self, serialized, prompts, *, run_id: UUID, **kwargs):
+        self._starts[run_id] = time.perf_counter()
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs):
+        latency = time.perf_counter() - self._starts.pop(run_id, time.perf_counter())
+        input_tokens, output_tokens = extract_token_usage(response)
+        self.stats.record(self.role, self.model, latency, input_tokens, output_tokens)
+        metrics = get_metrics()
+        metrics.observe("chatbot_llm_seconds", latency, role=self.role, model=self.model)
+        metrics.increment("chatbot_llm_tokens", input_tokens, role=self.role, model=self.model, direction="input")
+        metrics.increment("chatbot_llm_tokens", output_tokens, role=self.role, model=self.model, direction="output")
+        logger.debug("[model:%s] %s %.2fs tokens in=%d out=%d", self.role, self.model, latency, input_tokens, output_tokens)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs):
+        latency = time.perf_counter() - self._starts.pop(run_id, time.perf_counter())
+        self.stats.record(self.role, self.model, latency, error=True)
+        get_metrics().increment("chatbot_llm_errors", role=self.role, model=self.model)
+
+
+def extract_token_usage(response: LLMResult):
+    """Get (input_tokens, output_tokens) from an LLM result, streaming or not"""
+    for generations in response.generations:
+        for generation in generations:
+            usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+            if usage:
+                return usage.get("input_tokens", 0), usage.get("output_tokens", 0)
+
+    token_usage = (response.llm_output or {}).get("token_usage") or {}
+    return token_usage.get("prompt_tokens", 0), token_usage.get("completion_tokens", 0)
+
+
+class ModelRouter:
+    """
+    Hands out one chat model per role so that cheap models can do the routing and
+    Cypher generation while the large model writes the final answers.
+
+    Models are taken from the `models` argument, then the role env vars (AGENT_MODEL,
+    FINAL_MODEL, CYPHER_MODEL, QA_MODEL, SUMMARY_MODEL), then DEFAULT_MODEL (gpt-4o). ESCALATION_MODEL
+    is used to retry a role whose output failed (e.g. invalid Cypher).
+    """
+
+    def __init__(self, models: Optional[Dict[str, str]] = None, escalation_model: Optional[str] = None,
+                 temperature: float = 0):
+        default_model = os.getenv("DEFAULT_MODEL", DEFAULT_MODEL)
+        self.models = {role: os.getenv(env, default_model) for role, env in ROLE_ENV.items()}
+        self.models.update(models or {})
+        self.escalation_model = escalation_model or os.getenv(ESCALATION_ENV, default_model)
+        self.temperature = temperature
+        self.usage = ModelUsageStats()
+        self._llms: Dict[str, ChatOpenAI] = {}
+        self._lock = threading.Lock()
+
+    def get(self, role: str) -> ChatOpenAI:
+        """Chat model for a role"""
+        if role not in self.models:
+            raise ValueError(f"Unknown model role: {role}")
+        return self._get_or_build(role, self.models[role])
+
+    def escalation(self, role: str) -> Optional[ChatOpenAI]:
+        """Larger model used to retry a role, or None if the role already uses it"""
+        if self.models.get(role) == self.escalation_model:
+            return None
+        return self._get_or_build(f"{role}_escalated", self.escalation_model)
+
+    def _get_or_build(self, role: str, model: str) -> ChatOpenAI:
+        with self._lock:
+            if role not in self._llms:
+                recorder = UsageRecorder(role, model, self.usage)
+                store = get_cassette_store()
+                if store is None:
+                    self._llms[role] = self._build(model, callbacks=[recorder])
+                else:
+                    # Record/replay run: no OpenAI client at all when replaying
+                    inner = self._build(model) if store.mode == "record" else None
+                    self._llms[role] = CassetteChatModel(
+                        inner=inner, model_name=model, store=store, callbacks=[recorder]
+                    )
+            return self._llms[role]
+
+    def _build(self, model: str, callbacks: Optional[list] = None) -> ChatOpenAI:
+        return ChatOpenAI(
+            model=model,
+            temperature=self.temperature,
+            streaming=True,
+            stream_usage=True,
+            callbacks=callbacks
+        )
+
+
+_default_router: Optional[ModelRouter] = None
+_default_router_lock = threading.Lock()
+
+
+def get_model_router() -> ModelRouter:
+    """Process-wide router built from the environment"""
+    global _default_router
+    with _default_router_lock:
+        if _default_router is None:
+            _default_router = ModelRouter()
+        return _default_router
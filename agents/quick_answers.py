@@ -0,0 +1,185 @@
+# agents/quick_answers.py
+
+"""
+Precomputed database results of the quick questions.
+
+The warm-up runs the cypher_qa tool on each quick question, without an agent turn (so no
+final-answer call, chat history or checkpoints), and keeps the tool output (generated
+Cypher, rows and graph payload) and the rendered graph HTML in the artifact store. When a
+quick question is asked, run_turn hands the stored output to the agent as the result of
+its cypher_qa call, so only the answer is generated.
+
+A stored result is only handed over once a full turn on the question showed that the
+agent answers it from the database alone (no web search, not a refusal); questions it
+answered otherwise, and questions whose run gave no rows or an error, are not run again.
+Results belong to one data version; after an OFAC reload they are computed again.
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+from agents.utils.artifacts import get_artifact_store
+
+
+def normalize_question(question: str) -> str:
+    return " ".join(question.lower().split())
+
+
+class QuickAnswerStore:
+    """
+    Index of the precomputed quick question results and of how the agent answered each
+    question, kept in one JSON file; the outputs themselves are artifacts
+    (agents/utils/artifacts.py).
+
+    Args:
+        path: The index file
+        data_version_fn: Returns the current data version string
+        version_check_interval: Seconds between data version checks
+    """
+
+    def __init__(self, path: str = "quick_answers.json", data_version_fn: Optional[Callable[[], str]] = None,
+                 version_check_interval: float = 60):
+        self.path = path
+        self.data_version_fn = data_version_fn
+        self.version_check_interval = version_check_interval
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        # Question -> whether the agent answered it from the database alone
+        self._database_only: Dict[str, bool] = {}
+        self._data_version: Optional[str] = None
+        self._version_checked_at = 0.0
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                stored = json.load(f)
+            self._entries = stored["entries"]
+            self._database_only = stored["database_only"]
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            print(f"Could not load quick answers, starting empty: {e}")
+
+    def _save(self) -> None:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump({"entries": self._entries, "database_only": self._database_only}, f, ensure_ascii=False)
+        os.replace(self.path + ".tmp", self.path)
+
+    def data_version(self) -> Optional[str]:
+        """Current data version, checked at most every version_check_interval seconds"""
+        if self.data_version_fn is None:
+            return None
+        if self._data_version is None or time.monotonic() - self._version_checked_at >= self.version_check_interval:
+            self._version_checked_at = time.monotonic()
+            try:
+                self._data_version = self.data_version_fn()
+            except Exception as e:
+                print(f"Could not read data version: {e}")
+        return self._data_version
+
+    def _entry(self, question: str) -> Optional[Dict[str, Any]]:
+        """Index entry of a question for the current data version"""
+        entry = self._entries.get(normalize_question(question))
+        if entry is None or entry.get("data_version") != self.data_version():
+            return None
+        return entry
+
+    def knows(self, question: str) -> bool:
+        """Whether the question is a quick question the warm-up has seen"""
+        return normalize_question(question) in self._entries
+
+    def status(self, question: str) -> str:
+        """
+        Returns:
+            str: "missing" (never run for this data version, or its artifacts were pruned),
+            "unanswerable" (no rows from the database, or the agent does not answer it from
+            the database alone) or "ready"
+        """
+        if self._database_only.get(normalize_question(question)) is False:
+            return "unanswerable"
+        entry = self._entry(question)
+        if entry is None:
+            return "missing"
+        if entry["content"] is None:
+            return "unanswerable"
+        store = get_artifact_store()
+        if store.get(entry["content"]) is None or store.get(entry["graph"]) is None:
+            return "missing"
+        return "ready"
+
+    def get(self, question: str) -> Optional[Dict[str, Any]]:
+        """
+        Stored result of a quick question.
+
+        Returns:
+            dict with the cypher_qa message content ("content") and graph payload ("graph"),
+            or None if the question has no usable result, or a full turn has not yet shown
+            that the agent answers it from the database alone
+        """
+        if not self._database_only.get(normalize_question(question)):
+            return None
+        entry = self._entry(question)
+        if entry is None or entry["content"] is None:
+            return None
+        store = get_artifact_store()
+        content, graph = store.get(entry["content"]), store.get_json(entry["graph"])
+        if content is None or graph is None:
+            return None
+        return {"question": entry["question"], "content": content, "graph": graph}
+
+    def put(self, question: str, content: Optional[str], graph: Optional[Dict[str, Any]] = None,
+            html: Optional[str] = None, display_key: Optional[str] = None) -> None:
+        """
+        Record the cypher_qa result of a question; content None marks it as not answerable
+        from the database. display_key is the artifact key the app stores the tool output
+        under, so it can find the pre-rendered html.
+        """
+        store = get_artifact_store()
+        entry = {
+            "question": question,
+            "data_version": self.data_version(),
+            "content": store.put(content) if content is not None else None,
+            "graph": store.put_json(graph) if content is not None else None,
+            "html": store.put(html) if html else None,
+            "display": display_key,
+            "created_at": time.time(),
+        }
+        with self._lock:
+            self._entries[normalize_question(question)] = entry
+            self._save()
+
+    def record_answer(self, question: str, database_only: bool) -> None:
+        """Record how the agent answered a quick question in a full turn"""
+        key = normalize_question(question)
+        with self._lock:
+            if self._database_only.get(key) != database_only:
+                self._database_only[key] = database_only
+                self._save()
+
+    def html_for(self, display_key: str) -> Optional[str]:
+        """Artifact key of the pre-rendered graph of a stored tool output, or None"""
+        for entry in list(self._entries.values()):
+            if entry.get("display") == display_key and entry.get("html"):
+                return entry["html"]
+        return None
+
+
+_store: Optional[QuickAnswerStore] = None
+_store_lock = threading.Lock()
+
+
+def get_quick_answers() -> QuickAnswerStore:
+    """Process-wide quick answer store (env: QUICK_ANSWERS_FILE, default quick_answers.json)"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            from tools.graph_store import get_data_version
+
+            _store = QuickAnswerStore(
+                os.getenv("QUICK_ANSWERS_FILE", "quick_answers.json"),
+                data_version_fn=get_data_version
+            )
+        return _store
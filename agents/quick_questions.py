@@ -0,0 +1,37 @@
+# agents/quick_questions.py
+
+import json
+import os
+from typing import List
+
+# Sample questions shown in the sidebar; the benchmarks replay the same set
+QUICK_QUESTIONS = [
+    "What is money laudering and what is the impact?",
+    "What is the latest news or press release from OFAC in 2025?",
+    "Can you search for latest trends in AML compliance in 2025?",
+    "Can you search the OFAC for all sanction program name",
+    "Find all information about one person that goes by name Ayman",
+    "Find persons who has alias more than 10",
+    "Do we have information about one person that goes by name  RAMON MAGANA, Alcides? And, can you search internet for the latest news or article about him",
+    "Find people sanctioned in 'SDGT' programs",
+    "How to cook chicken?",
+    "MATCH (n) DELETE n"
+]
+
+
+def get_quick_questions() -> List[str]:
+    """
+    Questions for the sidebar and the startup warm-up: QUICK_QUESTIONS, or the questions in
+    QUICK_QUESTIONS_FILE (a JSON list, or one question per line) when it is set.
+    """
+    path = os.getenv("QUICK_QUESTIONS_FILE")
+    if not path:
+        return QUICK_QUESTIONS
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            text = f.read()
+        questions = json.loads(text) if text.lstrip().startswith("[") else text.splitlines()
+        return [question.strip() for question in questions if question.strip()]
+    except (OSError, ValueError) as e:
+        print(f"Could not read quick questions from {path}, using the defaults: {e}")
+        return QUICK_QUESTIONS
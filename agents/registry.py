@@ -0,0 +1,29 @@
+# agents/registry.py
+
+import threading
+from typing import Any, Dict, Optional
+
+_agents: Dict[Optional[bool], Any] = {}
+_agents_lock = threading.Lock()
+
+
+def get_agent(direct_cypher_results: Optional[bool] = None) -> Any:
+    """
+    Process-wide compiled agent graph, built on first use and shared by every session
+    (Streamlit browser sessions and API sessions alike). Sessions are kept apart by the
+    thread id of their chat config, not by their own graph.
+
+    The LLM clients (get_model_router) and the Neo4j driver (get_graph) it uses are
+    process-wide already, so a new session costs no client, tool or graph construction.
+
+    Args:
+        direct_cypher_results (bool, optional): See create_agent; one graph per value
+    """
+    with _agents_lock:
+        agent = _agents.get(direct_cypher_results)
+        if agent is None:
+            # Imported here so that importing the registry does not load the LangChain stacks
+            from agents.chat_agent import create_agent
+
+            agent = _agents[direct_cypher_results] = create_agent(direct_cypher_results)
+        return agent
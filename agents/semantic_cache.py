@@ -0,0 +1,223 @@
+# agents/semantic_cache.py
+
+import json
+import os
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+import numpy as np
+
+# Questions that refer back to the conversation cannot be answered from the cache. Words
+# like "that" or "it" only count where they point back ("that person", "about it", a
+# question starting with them), not in relative clauses ("a person that goes by ...").
+CONTEXT_DEPENDENT_PATTERN = re.compile(
+    r"^\W*(it|its|this|that|these|those|and|also|what about|how about)\b"
+    r"|\b(he|she|him|her|his|hers|they|them|their)\b"
+    r"|\b(about|of|for|on|with|in) (it|this|that|these|those)\W*$"
+    r"|\b(is|was|does|did|has) (it|this|that)\b"
+    r"|\b(this|that|these|those) (person|persons|people|individual|individuals|man|woman|entity|entities|"
+    r"program|programs|alias|aliases|name|names|document|documents|result|results|query|one|ones)\b"
+    r"|\bthe same\b"
+    r"|\b(above|previous|earlier|last) (question|answer|answers|result|results|query|person|one)\b",
+    re.IGNORECASE
+)
+
+# The specifics of a question are its words other than these: function words, request
+# phrasing and the graph's own labels. Names are often typed in lower case ("a person
+# named ayman"), so every other word counts, whatever its case.
+WORD_PATTERN = re.compile(r"\w[\w-]*")
+STOPWORDS = frozenset("""
+a about all an and any are as at be been by can could do does find for from get give
+has have how i in information info is it its list me my named called name names of on
+or please search show tell that the their there these this those to under using was
+were what which who whom whose with would you
+person persons people individual individuals entity entities program programs alias
+aliases sanction sanctions sanctioned document documents
+""".split())
+
+
+def is_standalone(question: str) -> bool:
+    """True if the question does not seem to depend on earlier turns"""
+    return not CONTEXT_DEPENDENT_PATTERN.search(question)
+
+
+def question_literals(question: str) -> List[str]:
+    """
+    Content words of a question (names, codes, numbers, attributes), lower-cased. Questions
+    that differ only in these ("sanctioned under SDGT" and "under SYRIA", "named ayman" and
+    "named omar") embed almost identically, so a cached answer is only served when they are
+    equal.
+    """
+    words = {word.strip("-") for word in WORD_PATTERN.findall(question.lower())}
+    return sorted(word for word in words if word not in STOPWORDS and (len(word) > 1 or word.isdigit()))
+
+
+class SemanticCache:
+    """
+    Cache of final answers keyed by question meaning.
+
+    Question embeddings go into a FAISS inner-product index (normalized vectors, so scores
+    are cosine similarities). A lookup returns the cached entry of the closest question
+    whose similarity is at least `threshold` and whose content words (question_literals)
+    are the same. Entries belong to one data version; when
+    `data_version_fn` reports a new version (an OFAC reload) the cache is emptied.
+
+    Args:
+        embeddings: LangChain Embeddings model (anything with embed_query)
+        directory: Where the index and entries are persisted
+        threshold: Minimum cosine similarity for a hit
+        data_version_fn: Returns the current data version string
+        version_check_interval: Seconds between data version checks
+    """
+
+    def __init__(self, embeddings: Any, directory: str = "semantic_cache", threshold: float = 0.92,
+                 data_version_fn: Optional[Callable[[], str]] = None, version_check_interval: float = 60):
+        self.embeddings = embeddings
+        self.directory = directory
+        self.threshold = threshold
+        self.data_version_fn = data_version_fn
+        self.version_check_interval = version_check_interval
+        self._lock = threading.Lock()
+        self._index = None
+        self._entries: List[Dict[str, Any]] = []
+        self._data_version: Optional[str] = None
+        self._version_checked_at = 0.0
+        self._load()
+
+    @property
+    def index_path(self) -> str:
+        return os.path.join(self.directory, "index.faiss")
+
+    @property
+    def entries_path(self) -> str:
+        return os.path.join(self.directory, "entries.json")
+
+    def _load(self) -> None:
+        # faiss is imported on first use, not with the app (it is only needed once the cache is on)
+        import faiss
+
+        if not (os.path.exists(self.index_path) and os.path.exists(self.entries_path)):
+            return
+        try:
+            with open(self.entries_path, "r", encoding="utf-8") as f:
+                stored = json.load(f)
+            self._index = faiss.read_index(self.index_path)
+            self._entries = stored["entries"]
+            self._data_version = stored.get("data_version")
+        except Exception as e:
+            print(f"Could not load semantic cache, starting empty: {e}")
+            self._index, self._entries = None, []
+
+    def _save(self) -> None:
+        import faiss
+
+        os.makedirs(self.directory, exist_ok=True)
+        faiss.write_index(self._index, self.index_path + ".tmp")
+        with open(self.entries_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump({"data_version": self._data_version, "entries": self._entries}, f, ensure_ascii=False)
+        os.replace(self.index_path + ".tmp", self.index_path)
+        os.replace(self.entries_path + ".tmp", self.entries_path)
+
+    def _embed(self, question: str) -> np.ndarray:
+        import faiss
+
+        vector = np.asarray([self.embeddings.embed_query(question.strip().lower())], dtype="float32")
+        faiss.normalize_L2(vector)
+        return vector
+
+    def _check_data_version(self) -> None:
+        """Empty the cache if the data version changed (called with the lock held)"""
+        if self.data_version_fn is None or time.monotonic() - self._version_checked_at < self.version_check_interval:
+            return
+        self._version_checked_at = time.monotonic()
+        try:
+            version = self.data_version_fn()
+        except Exception as e:
+            print(f"Could not read data version: {e}")
+            return
+        if version != self._data_version:
+            if self._entries:
+                print(f"Data version changed ({self._data_version} -> {version}), clearing semantic cache")
+            self._index, self._entries, self._data_version = None, [], version
+            if os.path.exists(self.index_path):
+                os.remove(self.index_path)
+
+    def lookup(self, question: str, candidates: int = 5) -> Optional[Dict[str, Any]]:
+        """
+        Cached entry for a question with a similar meaning and the same literals.
+
+        Args:
+            question: The question
+            candidates: Closest entries checked for matching literals
+
+        Returns:
+            dict with question, answer, cypher, tool_content and score, or None on a miss
+        """
+        vector = self._embed(question)
+        literals = question_literals(question)
+        with self._lock:
+            self._check_data_version()
+            if self._index is None or self._index.ntotal == 0:
+                return None
+            scores, ids = self._index.search(vector, min(candidates, self._index.ntotal))
+            for score, entry_id in zip(scores[0], ids[0]):
+                if entry_id < 0 or score < self.threshold:
+                    break
+                entry = self._entries[int(entry_id)]
+                if question_literals(entry["question"]) == literals:
+                    return {**entry, "score": float(score)}
+            return None
+
+    def add(self, question: str, answer: str, cypher: str = None, tool_content: str = None) -> None:
+        """Cache the final answer (and the cypher_qa output it was based on) for a question"""
+        vector = self._embed(question)
+        with self._lock:
+            self._check_data_version()
+            if self._index is None:
+                import faiss
+
+                self._index = faiss.IndexFlatIP(vector.shape[1])
+            self._index.add(vector)
+            self._entries.append({
+                "question": question,
+                "answer": answer,
+                "cypher": cypher,
+                "tool_content": tool_content,
+                "created_at": time.time(),
+            })
+            self._save()
+
+
+def create_default_embeddings() -> Any:
+    """Local sentence-transformers model (env SEMANTIC_CACHE_MODEL)"""
+    from langchain_huggingface import HuggingFaceEmbeddings
+    return HuggingFaceEmbeddings(
+        model_name=os.getenv("SEMANTIC_CACHE_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+    )
+
+
+_cache: Optional[SemanticCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_semantic_cache() -> Optional[SemanticCache]:
+    """
+    Process-wide semantic cache, or None unless SEMANTIC_CACHE=true.
+
+    Env vars: SEMANTIC_CACHE_DIR (default semantic_cache), SEMANTIC_CACHE_THRESHOLD
+    (default 0.92), SEMANTIC_CACHE_MODEL (embedding model).
+    """
+    global _cache
+    if os.getenv("SEMANTIC_CACHE", "false").strip().lower() not in ("1", "true", "yes", "on"):
+        return None
+    with _cache_lock:
+        if _cache is None:
+            from tools.graph_store import get_data_version
+            _cache = SemanticCache(
+                create_default_embeddings(),
+                directory=os.getenv("SEMANTIC_CACHE_DIR", "semantic_cache"),
+                threshold=float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.92")),
+                data_version_fn=get_data_version
+            )
+        return _cache
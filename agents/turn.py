@@ -0,0 +1,203 @@
+# agents/turn.py
+
+import json
+import uuid
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
+from agents.chat_agent import messages_since
+from agents.chat_history import get_history_writer
+from agents.quick_answers import get_quick_answers
+from agents.semantic_cache import get_semantic_cache, is_standalone
+from agents.utils.metrics import get_metrics, with_metrics
+from agents.utils.timing import stage
+from agents.utils.visualization import visualize_neo4j_results_v2
+
+
+def extract_cypher_result(tool_content: dict):
+    """
+    Get the executed Cypher and the result rows from a cypher_qa tool payload.
+    Handles both the QA mode (intermediate_steps) and the direct mode (cypher/rows) payloads.
+
+    Returns:
+        tuple: (cypher_query, rows); cypher_query is None if the payload has no query
+    """
+    if "cypher" in tool_content:
+        return tool_content["cypher"].replace("cypher\n", ""), tool_content.get("rows") or []
+
+    steps = tool_content.get("intermediate_steps") or []
+    if not steps:
+        return None, []
+    cypher_query = steps[0]["query"].replace("cypher\n", "")
+    rows = steps[1].get("context") if len(steps) > 1 else None
+    return cypher_query, rows or []
+
+
+def tool_output(message: ToolMessage) -> Any:
+    """
+    Output of a tool call for display and caching: the content the model saw, with the
+    graph payload that cypher_qa returns as the message artifact (kept out of the model's
+    context) added back under "graph".
+    """
+    artifact = getattr(message, "artifact", None)
+    if artifact is None or not isinstance(message.content, str):
+        return message.content
+    try:
+        content = json.loads(message.content)
+    except json.JSONDecodeError:
+        return message.content
+    if not isinstance(content, dict):
+        return message.content
+    return json.dumps({**content, "graph": artifact}, ensure_ascii=False, default=str)
+
+
+def build_visualization(content: str) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Executed Cypher and graph visualization HTML of a cypher_qa tool output
+
+    Returns:
+        tuple: (cypher_query, html); html is None if the query returned no rows
+
+    Raises:
+        json.JSONDecodeError: The tool output is not a JSON payload (e.g. an error message)
+    """
+    tool_content = json.loads(content)
+    cypher_query, cypher_result = extract_cypher_result(tool_content)
+    if cypher_query is None or not cypher_result:
+        return cypher_query, None
+    with stage("visualization"):
+        html = visualize_neo4j_results_v2({
+            "cypher_result": cypher_result,
+            "graph": tool_content.get("graph"),
+            "generated_cypher": cypher_query,
+        })
+    return cypher_query, html
+
+
+def lookup_cached_answer(prompt: str):
+    """Semantic cache entry for a standalone question, or None"""
+    cache = get_semantic_cache()
+    if cache is None or not is_standalone(prompt):
+        return None
+    try:
+        cached = cache.lookup(prompt)
+        get_metrics().record_cache("semantic", hit=cached is not None)
+        return cached
+    except Exception as e:
+        print(f"Semantic cache lookup failed: {e}")
+        return None
+
+
+def answered_from_database(new_messages: list) -> bool:
+    """Whether a turn ended with an answer based on cypher_qa results only"""
+    tool_messages = [msg for msg in new_messages if isinstance(msg, ToolMessage)]
+    if not new_messages or not isinstance(new_messages[-1], AIMessage) or not tool_messages:
+        return False
+    return all(msg.name == "cypher_qa" for msg in tool_messages)
+
+
+def cache_answer(prompt: str, new_messages: list):
+    """Cache the answer of a standalone question answered from the database only"""
+    cache = get_semantic_cache()
+    # Web results change over time, only database answers are cached
+    if cache is None or not is_standalone(prompt) or not answered_from_database(new_messages):
+        return
+    tool_messages = [msg for msg in new_messages if isinstance(msg, ToolMessage)]
+    try:
+        tool_content = tool_output(tool_messages[-1])
+        cypher_query, _ = extract_cypher_result(json.loads(tool_content))
+        cache.add(prompt, new_messages[-1].content, cypher_query, tool_content)
+    except Exception as e:
+        print(f"Could not cache answer: {e}")
+
+
+def lookup_quick_answer(prompt: str):
+    """Precomputed cypher_qa result of a quick question, or None"""
+    store = get_quick_answers()
+    try:
+        if not store.knows(prompt):
+            return None
+        quick = store.get(prompt)
+        get_metrics().record_cache("quick_answer", hit=quick is not None)
+        return quick
+    except Exception as e:
+        print(f"Quick answer lookup failed: {e}")
+        return None
+
+
+def quick_answer_messages(question: str, quick: Dict[str, Any]) -> Tuple[AIMessage, ToolMessage]:
+    """The cypher_qa call and its result message for a precomputed quick answer"""
+    tool_call_id = f"call_{uuid.uuid4().hex[:24]}"
+    call = AIMessage(
+        content="",
+        tool_calls=[{"name": "cypher_qa", "args": {"query": question}, "id": tool_call_id}],
+        id=str(uuid.uuid4())
+    )
+    result = ToolMessage(
+        content=quick["content"],
+        artifact=quick["graph"],
+        tool_call_id=tool_call_id,
+        name="cypher_qa",
+        id=str(uuid.uuid4())
+    )
+    return call, result
+
+
+def run_turn(agent: Any, config: Dict[str, Any], user_message: HumanMessage,
+             on_chunk: Optional[Callable[[str, Any], None]] = None) -> Dict[str, Any]:
+    """
+    Answer one user message: from the semantic cache when a similar standalone question
+    was answered before, otherwise by running the agent graph. Only the new message is
+    sent; the checkpointer holds the conversation history of the thread. For a quick
+    question with a precomputed result (agents/quick_answers.py) the graph starts after
+    the tools node, with the stored cypher_qa call and result already in the thread.
+
+    Args:
+        agent: Compiled agent graph
+        config: Chat config of the thread (see get_chat_config)
+        user_message: The new HumanMessage; it needs an id
+        on_chunk: If given, the graph is streamed and every ("messages", data) and
+            ("updates", data) chunk is passed to it as it arrives (not called on a cache hit)
+
+    Returns:
+        dict: "messages" (the new messages of the turn, the answer last) and "cached"
+        (the semantic cache entry, or None)
+    """
+    config = with_metrics(config)
+    with stage("turn"):
+        cached = lookup_cached_answer(user_message.content)
+        if cached:
+            answer_message = AIMessage(content=cached["answer"], id=str(uuid.uuid4()))
+            # Record the turn in the thread so that follow-up questions have the context
+            agent.update_state(config, {"messages": [user_message, answer_message]}, as_node="agent")
+            return {"messages": [answer_message], "cached": cached}
+
+        inputs = {"messages": [user_message]}
+        quick = lookup_quick_answer(user_message.content)
+        if quick:
+            call, tool_result = quick_answer_messages(user_message.content, quick)
+            agent.update_state(config, {"messages": [user_message, call, tool_result]}, as_node="tools")
+            # The agent node records the messages it answers; these two it did not see
+            history = get_history_writer()
+            history.enqueue(config["configurable"]["thread_id"], user_message)
+            history.enqueue(config["configurable"]["thread_id"], call)
+            if on_chunk is not None:
+                on_chunk("updates", {"tools": {"messages": [tool_result]}})
+            # Resume the thread from the tools node: the agent writes the answer
+            inputs = None
+
+        if on_chunk is None:
+            result = agent.invoke(inputs, config=config)
+        else:
+            result = {"messages": []}
+            for mode, data in agent.stream(inputs, config=config,
+                                           stream_mode=["messages", "updates", "values"]):
+                if mode == "values":
+                    result = data
+                else:
+                    on_chunk(mode, data)
+        new_messages: List[BaseMessage] = messages_since(result["messages"], user_message.id)
+        cache_answer(user_message.content, new_messages)
+        if not quick and get_quick_answers().knows(user_message.content):
+            # Decides whether the precomputed result is handed over next time
+            get_quick_answers().record_answer(user_message.content, answered_from_database(new_messages))
+        return {"messages": new_messages, "cached": None}
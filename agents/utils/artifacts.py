@@ -0,0 +1,95 @@
+# agents/utils/artifacts.py
+
+import hashlib
+import json
+import os
+import threading
+import time
+import zlib
+from typing import Any, Optional
+
+
+class ArtifactStore:
+    """
+    Content-addressed store for the artifacts shown with chat messages (cypher_qa outputs,
+    rendered graph HTML), so the session only keeps their keys.
+
+    Each artifact is one zlib-compressed file named by the sha256 of its content; storing
+    the same content twice (a cached answer, an unchanged graph) writes it once. Artifacts
+    not stored again for `ttl_days` are deleted by prune().
+
+    Args:
+        directory: Where the artifacts are stored
+        ttl_days: Days an unused artifact is kept
+    """
+
+    def __init__(self, directory: str = "artifacts", ttl_days: float = 7):
+        self.directory = directory
+        self.ttl_days = ttl_days
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key)
+
+    def put(self, text: str) -> str:
+        """Store text and return its key"""
+        data = text.encode("utf-8")
+        key = hashlib.sha256(data).hexdigest()
+        path = self._path(key)
+        if os.path.exists(path):
+            # Refresh the age of an artifact that is in use again
+            os.utime(path)
+            return key
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(zlib.compress(data, 6))
+        os.replace(tmp_path, path)
+        return key
+
+    def get(self, key: str) -> Optional[str]:
+        """Stored text, or None if it was pruned"""
+        try:
+            with open(self._path(key), "rb") as f:
+                return zlib.decompress(f.read()).decode("utf-8")
+        except FileNotFoundError:
+            return None
+
+    def put_json(self, value: Any) -> str:
+        return self.put(json.dumps(value, ensure_ascii=False, sort_keys=True, separators=(",", ":"), default=str))
+
+    def get_json(self, key: str) -> Any:
+        text = self.get(key)
+        return json.loads(text) if text is not None else None
+
+    def prune(self) -> int:
+        """Delete artifacts older than ttl_days; returns the number deleted"""
+        cutoff = time.time() - self.ttl_days * 86400
+        deleted = 0
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    if os.path.getmtime(path) < cutoff:
+                        os.remove(path)
+                        deleted += 1
+                except OSError:
+                    pass
+        return deleted
+
+
+_store: Optional[ArtifactStore] = None
+_store_lock = threading.Lock()
+
+
+def get_artifact_store() -> ArtifactStore:
+    """
+    Process-wide artifact store; old artifacts are pruned in the background on first use.
+
+    Env vars: ARTIFACT_DIR (default artifacts), ARTIFACT_TTL_DAYS (default 7).
+    """
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ArtifactStore(os.getenv("ARTIFACT_DIR", "artifacts"), float(os.getenv("ARTIFACT_TTL_DAYS", "7")))
+            threading.Thread(target=_store.prune, name="artifact-prune", daemon=True).start()
+        return _store
@@ -0,0 +1,223 @@
+# agents/utils/cassettes.py
+
+"""
+Record/replay cassettes for the external calls of a chat turn: LLM completions, Tavily
+searches and Neo4j queries.
+
+With CASSETTE_MODE=record every call goes upstream and its response is saved under
+CASSETTE_DIR, keyed by a hash of the request. With CASSETTE_MODE=replay nothing goes
+upstream: responses are served from the cassettes after the recorded latency multiplied
+by CASSETTE_LATENCY_SCALE (0 replays instantly), and a missing cassette raises
+CassetteMissError. Everything between those boundaries (agent graph, tools, caches,
+visualization) runs for real, so it can be profiled on a machine with no network.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import BaseMessage, message_to_dict, messages_from_dict
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from langchain_neo4j import Neo4jGraph
+from pydantic import Field
+
+
+class CassetteMissError(KeyError):
+    """No cassette recorded for a request in replay mode"""
+
+
+class CassetteStore:
+    """
+    Cassettes on disk, one JSON file per request: {directory}/{kind}/{hash}.json
+
+    Args:
+        directory: Root directory of the cassettes
+        mode: "record" or "replay"
+        latency_scale: Multiplier applied to the recorded latency when replaying
+    """
+
+    def __init__(self, directory: str = "cassettes", mode: str = "replay", latency_scale: float = 1.0):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        self.directory = directory
+        self.mode = mode
+        self.latency_scale = latency_scale
+
+    @staticmethod
+    def request_hash(request: Any) -> str:
+        return hashlib.sha256(json.dumps(request, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+    def _path(self, kind: str, key: str) -> str:
+        return os.path.join(self.directory, kind, f"{key}.json")
+
+    def play(self, kind: str, request: Any, call: Callable[[], Any],
+             encode: Callable[[Any], Any] = lambda value: value,
+             decode: Callable[[Any], Any] = lambda value: value) -> Any:
+        """
+        Replay the response recorded for `request`, or run `call` and record its response.
+
+        Args:
+            kind: Cassette category (llm, tavily, neo4j, ...)
+            request: JSON-serializable description of the request (the cassette key)
+            call: Makes the real request
+            encode / decode: Convert the response to / from JSON-serializable data
+        """
+        key = self.request_hash(request)
+        path = self._path(kind, key)
+
+        if self.mode == "replay":
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    entry = json.load(f)
+            except FileNotFoundError:
+                raise CassetteMissError(f"No {kind} cassette for request {key[:12]}: {json.dumps(request, default=str)[:200]}")
+            if self.latency_scale > 0:
+                time.sleep(entry.get("latency", 0) * self.latency_scale)
+            return decode(entry["response"])
+
+        started = time.perf_counter()
+        response = call()
+        latency = time.perf_counter() - started
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"request": request, "response": encode(response), "latency": latency},
+                      f, ensure_ascii=False, default=str, indent=1)
+        return response
+
+
+def normalize_message(message: BaseMessage) -> Dict[str, Any]:
+    """Message fields that affect the completion (ids are random per run and left out)"""
+    data = {"type": message.type, "content": message.content}
+    if getattr(message, "tool_calls", None):
+        data["tool_calls"] = [{"name": c["name"], "args": c["args"], "id": c.get("id")} for c in message.tool_calls]
+    if getattr(message, "tool_call_id", None):
+        data["tool_call_id"] = message.tool_call_id
+    return data
+
+
+def encode_chat_result(result: ChatResult) -> Dict[str, Any]:
+    return {
+        "generations": [
+            {"message": message_to_dict(g.message), "generation_info": g.generation_info}
+            for g in result.generations
+        ],
+        "llm_output": result.llm_output,
+    }
+
+
+def decode_chat_result(data: Dict[str, Any]) -> ChatResult:
+    return ChatResult(
+        generations=[
+            ChatGeneration(message=messages_from_dict([g["message"]])[0], generation_info=g.get("generation_info"))
+            for g in data["generations"]
+        ],
+        llm_output=data.get("llm_output"),
+    )
+
+
+class CassetteChatModel(BaseChatModel):
+    """
+    Chat model that records the completions of `inner` or replays them.
+    In replay mode `inner` can be None, so no API key or network is needed.
+    """
+
+    inner: Optional[Any] = None
+    model_name: str
+    store: Any = Field(exclude=True)
+
+    @property
+    def _llm_type(self) -> str:
+        return "cassette"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return {"model_name": self.model_name, "mode": self.store.mode}
+
+    def bind_tools(self, tools: List[Any], **kwargs: Any):
+        return self.bind(tools=[convert_to_openai_tool(tool) for tool in tools], **kwargs)
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        request = {
+            "model": self.model_name,
+            "messages": [normalize_message(m) for m in messages],
+            "stop": stop,
+            "kwargs": kwargs,
+        }
+        return self.store.play(
+            "llm",
+            request,
+            lambda: self.inner._generate(messages, stop=stop, **kwargs),
+            encode=encode_chat_result,
+            decode=decode_chat_result,
+        )
+
+
+class CassetteGraph(Neo4jGraph):
+    """
+    Neo4jGraph stand-in that records the query results and the schema of `inner`, or
+    replays them without a database (inner is None in replay mode).
+    """
+
+    def __init__(self, inner: Optional[Neo4jGraph], store: CassetteStore):
+        # Neo4jGraph.__init__ connects to the database, so it is not called
+        self.inner = inner
+        self.store = store
+        schema = store.play(
+            "neo4j_schema",
+            {"schema": True},
+            lambda: {"schema": inner.get_schema, "structured_schema": inner.get_structured_schema},
+        )
+        self.schema = schema["schema"]
+        self.structured_schema = schema["structured_schema"]
+
+    def query(self, query: str, params: dict = {}, session_params: dict = {}) -> List[Dict[str, Any]]:
+        return self.store.play(
+            "neo4j",
+            {"query": query, "params": params},
+            lambda: self.inner.query(query, params),
+        )
+
+    def query_with_graph(self, query: str, params: dict, max_rows: Optional[int]):
+        from tools.graph_result import query_with_graph
+
+        return self.store.play(
+            "neo4j_graph",
+            {"query": query, "params": params, "max_rows": max_rows},
+            lambda: query_with_graph(self.inner, query, params, max_rows),
+            encode=list,
+            decode=tuple,
+        )
+
+    def refresh_schema(self) -> None:
+        if self.inner is not None:
+            self.inner.refresh_schema()
+
+
+_store: Optional[CassetteStore] = None
+_store_lock = threading.Lock()
+
+
+def get_cassette_store() -> Optional[CassetteStore]:
+    """
+    Process-wide cassette store, or None unless CASSETTE_MODE is record or replay.
+
+    Env vars: CASSETTE_MODE, CASSETTE_DIR (default cassettes), CASSETTE_LATENCY_SCALE
+    (default 1.0).
+    """
+    global _store
+    mode = os.getenv("CASSETTE_MODE", "off").strip().lower()
+    if mode not in ("record", "replay"):
+        return None
+    with _store_lock:
+        if _store is None:
+            _store = CassetteStore(
+                os.getenv("CASSETTE_DIR", "cassettes"),
+                mode=mode,
+                latency_scale=float(os.getenv("CASSETTE_LATENCY_SCALE", "1.0"))
+            )
+        return _store
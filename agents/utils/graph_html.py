@@ -0,0 +1,210 @@
+# agents/utils/graph_html.py
+
+"""
+In-memory HTML rendering of vis-network graphs.
+
+The page is a precompiled template: the vis-network script and stylesheet are read once
+and inlined, so the HTML works inside the Streamlit iframe without network access, and
+each render only serializes the node and edge lists into it. Nothing is written to disk,
+so concurrent sessions cannot overwrite each other's output.
+
+The assets are taken from VIS_NETWORK_DIR (a directory with vis-network.min.js and
+vis-network.css) or from the copy bundled with the pyvis package; if neither exists the
+page falls back to the unpkg CDN.
+"""
+
+import glob
+import hashlib
+import importlib.util
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+VIS_NETWORK_CDN = "https://unpkg.com/vis-network@9.1.2/standalone/umd"
+
+NETWORK_OPTIONS: Dict[str, Any] = {
+    "physics": {
+        "forceAtlas2Based": {
+            "gravitationalConstant": -50,
+            "springLength": 100,
+            "springConstant": 0.08
+        },
+        "solver": "forceAtlas2Based",
+        "minVelocity": 0.75
+    },
+    "edges": {
+        "font": {
+            "size": 8,
+            "align": "middle"
+        },
+        "smooth": False
+    },
+    "nodes": {
+        "font": {
+            "size": 12
+        }
+    }
+}
+
+_HEAD = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+%(assets)s
+<style type="text/css">
+  html, body { margin: 0; }
+  #mynetwork { width: 100%%; height: 600px; background-color: #ffffff; border: 1px solid lightgray; position: relative; float: left; }
+</style>
+</head>
+<body>
+<div id="mynetwork"></div>
+<script type="text/javascript">
+"""
+
+_TAIL = """
+  var network = new vis.Network(document.getElementById("mynetwork"), {nodes: nodes, edges: edges}, options);
+  clusters.forEach(function (cluster) {
+    network.cluster({
+      joinCondition: function (node) { return node.cid === cluster.id; },
+      clusterNodeProperties: cluster
+    });
+  });
+  network.on("doubleClick", function (params) {
+    if (params.nodes.length === 1 && network.isCluster(params.nodes[0])) {
+      network.openCluster(params.nodes[0]);
+    }
+  });
+</script>
+"""
+
+_page_parts: Optional[Tuple[str, str]] = None
+_page_lock = threading.Lock()
+
+
+def find_vis_assets() -> Optional[Tuple[str, str]]:
+    """Paths of vis-network.min.js and vis-network.css, or None if no local copy exists"""
+    candidates = []
+    if os.getenv("VIS_NETWORK_DIR"):
+        candidates.append(os.getenv("VIS_NETWORK_DIR"))
+    # pyvis ships vis-network under pyvis/lib/vis-<version>/; locate it without importing pyvis
+    spec = importlib.util.find_spec("pyvis")
+    if spec is not None and spec.submodule_search_locations:
+        for location in spec.submodule_search_locations:
+            candidates.extend(sorted(glob.glob(os.path.join(location, "lib", "vis-*")), reverse=True))
+    for directory in candidates:
+        script = os.path.join(directory, "vis-network.min.js")
+        style = os.path.join(directory, "vis-network.css")
+        if os.path.isfile(script) and os.path.isfile(style):
+            return script, style
+    return None
+
+
+def _script_safe(text: str) -> str:
+    """Keep inlined text from closing the <script>/<style> element it is embedded in"""
+    return text.replace("</", "<\\/")
+
+
+def _assets_html() -> str:
+    assets = find_vis_assets()
+    if assets is None:
+        print(f"vis-network not found locally (set VIS_NETWORK_DIR or install pyvis), using {VIS_NETWORK_CDN}")
+        return (
+            f'<link rel="stylesheet" href="{VIS_NETWORK_CDN}/vis-network.min.css">\n'
+            f'<script type="text/javascript" src="{VIS_NETWORK_CDN}/vis-network.min.js"></script>'
+        )
+    script_path, style_path = assets
+    with open(script_path, "r", encoding="utf-8") as f:
+        script = f.read()
+    with open(style_path, "r", encoding="utf-8") as f:
+        style = f.read()
+    print(f"Inlining vis-network from {os.path.dirname(script_path)}")
+    return (
+        f'<style type="text/css">\n{_script_safe(style)}\n</style>\n'
+        f'<script type="text/javascript">\n{_script_safe(script)}\n</script>'
+    )
+
+
+def page_parts() -> Tuple[str, str]:
+    """The page before and after the graph data, with the assets inlined; built once per process"""
+    global _page_parts
+    with _page_lock:
+        if _page_parts is None:
+            _page_parts = (_HEAD % {"assets": _assets_html()}, _TAIL)
+        return _page_parts
+
+
+def render_network_html(nodes: List[Dict[str, Any]], edges: List[Dict[str, Any]],
+                        options: Optional[Dict[str, Any]] = None, footer_html: str = "",
+                        clusters: Optional[List[Dict[str, Any]]] = None) -> str:
+    """
+    HTML page drawing a vis-network graph.
+
+    Args:
+        nodes: vis-network node objects (id, label, title, color, ...)
+        edges: vis-network edge objects (from, to, label, ...)
+        options: vis-network options, NETWORK_OPTIONS by default
+        footer_html: HTML added after the graph (e.g. a metadata box)
+        clusters: vis-network cluster node objects; the nodes whose "cid" is the id of a
+            cluster start collapsed into it (see agents/utils/graph_layout.py)
+
+    Returns:
+        str: The self-contained HTML page
+    """
+    head, tail = page_parts()
+    data = (
+        f"  var nodes = new vis.DataSet({_script_safe(json.dumps(nodes, default=str))});\n"
+        f"  var edges = new vis.DataSet({_script_safe(json.dumps(edges, default=str))});\n"
+        f"  var options = {json.dumps(options if options is not None else NETWORK_OPTIONS)};\n"
+        f"  var clusters = {_script_safe(json.dumps(clusters or [], default=str))};"
+    )
+    return "".join((head, data, tail, footer_html, "\n</body>\n</html>\n"))
+
+
+class RenderCache:
+    """
+    Thread-safe LRU cache of rendered HTML by result hash.
+
+    Args:
+        max_entries: Number of pages kept; 0 disables the cache
+    """
+
+    def __init__(self, max_entries: int = 128):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(*parts: Any) -> str:
+        payload = json.dumps(parts, sort_keys=True, default=str, separators=(",", ":"))
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            html = self._entries.get(key)
+            if html is not None:
+                self._entries.move_to_end(key)
+            return html
+
+    def put(self, key: str, html: str) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = html
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+_render_cache: Optional[RenderCache] = None
+_render_cache_lock = threading.Lock()
+
+
+def get_render_cache() -> RenderCache:
+    """Process-wide render cache; RENDER_CACHE_SIZE pages (default 128)"""
+    global _render_cache
+    with _render_cache_lock:
+        if _render_cache is None:
+            _render_cache = RenderCache(int(os.getenv("RENDER_CACHE_SIZE", "128")))
+        return _render_cache
@@ -0,0 +1,219 @@
+# agents/utils/graph_layout.py
+
+"""
+Server-side preparation of large graphs for vis-network.
+
+Small results are drawn as before, with the forceAtlas2 physics running in the browser.
+Above VIS_LAYOUT_THRESHOLD nodes that simulation freezes the tab, so instead:
+
+1. The graph is capped at VIS_MAX_NODES nodes (in result order).
+2. Fan-outs of at least VIS_CLUSTER_MIN_LEAVES leaves of one type around the same hub
+   (e.g. the persons under a Program, or the aliases of a person), and loose nodes of
+   one type, are collapsed into a cluster node; double-clicking it opens the cluster.
+3. The collapsed graph without its remaining leaves is laid out once with a vectorized
+   Fruchterman-Reingold layout in NumPy; leaves are put on a ring around their hub and
+   cluster members on a spiral around their cluster node. The browser physics is
+   switched off.
+"""
+
+import math
+import os
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+from agents.utils.graph_html import NETWORK_OPTIONS
+
+# Layout units are scaled to pixels by this (the browser physics uses springLength 100)
+LAYOUT_SCALE = 120.0
+# Distance between neighbouring members on a cluster's spiral, in pixels
+MEMBER_SPACING = 28.0
+GOLDEN_ANGLE = math.pi * (3 - math.sqrt(5))
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+def _env_int(name: str, default: int) -> int:
+    return int(os.getenv(name, str(default)))
+
+
+def force_layout(count: int, edges: List[Tuple[int, int]], iterations: int = 50, seed: int = 7) -> "np.ndarray":
+    """
+    Fruchterman-Reingold layout with a weak pull towards the centre, so disconnected
+    components stay together. All pairwise repulsions of an iteration are computed in
+    one NumPy pass over (count, count) matrices.
+
+    Args:
+        count: Number of nodes
+        edges: (source index, target index) pairs
+        iterations: Number of cooling steps
+        seed: Seed of the initial positions
+
+    Returns:
+        np.ndarray: (count, 2) positions, in units of the ideal edge length
+    """
+    # Imported here: only graphs above VIS_LAYOUT_THRESHOLD are laid out on the server
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    pos = (rng.random((count, 2), dtype=np.float32) - 0.5) * math.sqrt(count)
+    if count < 2:
+        return pos
+    src = np.array([s for s, _ in edges], dtype=np.intp)
+    dst = np.array([t for _, t in edges], dtype=np.intp)
+    temperature = math.sqrt(count) / 10
+    cooling = temperature / (iterations + 1)
+    for _ in range(iterations):
+        dx = pos[:, 0, None] - pos[None, :, 0]
+        dy = pos[:, 1, None] - pos[None, :, 1]
+        inverse = dx * dx
+        inverse += dy * dy
+        np.maximum(inverse, 1e-4, out=inverse)
+        np.reciprocal(inverse, out=inverse)
+        # Repulsion k^2/d along delta/d, with k = 1
+        disp = np.stack(((dx * inverse).sum(axis=1), (dy * inverse).sum(axis=1)), axis=1)
+        if len(src):
+            d = pos[src] - pos[dst]
+            # Attraction d^2/k along d/|d|
+            pull = d * np.sqrt((d * d).sum(axis=1))[:, None]
+            np.subtract.at(disp, src, pull)
+            np.add.at(disp, dst, pull)
+        disp -= pos * (0.1 / math.sqrt(count))
+        length = np.sqrt((disp * disp).sum(axis=1))
+        np.maximum(length, 1e-6, out=length)
+        pos += disp * (np.minimum(length, temperature) / length)[:, None]
+        temperature -= cooling
+    return pos
+
+
+def leaf_groups(nodes: List[Dict[str, Any]], edges: List[Dict[str, Any]]) -> Dict[Tuple[Any, str], List[Any]]:
+    """
+    Group leaves (one neighbour) by hub and node type, and loose nodes (no neighbour) by
+    node type under the hub None.
+
+    Returns:
+        dict: (hub id, node type) -> member node ids
+    """
+    neighbours: Dict[Any, set] = {node["id"]: set() for node in nodes}
+    for edge in edges:
+        # Edges to nodes that are not drawn (e.g. endpoints without a node object) are ignored
+        if edge["from"] != edge["to"] and edge["from"] in neighbours and edge["to"] in neighbours:
+            neighbours[edge["from"]].add(edge["to"])
+            neighbours[edge["to"]].add(edge["from"])
+
+    groups: Dict[Tuple[Any, str], List[Any]] = {}
+    for node in nodes:
+        linked = neighbours[node["id"]]
+        if len(linked) > 1:
+            continue
+        hub = next(iter(linked)) if linked else None
+        # A pair of nodes linked only to each other is not a fan-out
+        if hub is not None and len(neighbours[hub]) == 1:
+            continue
+        groups.setdefault((hub, node.get("nodeType", "Unknown")), []).append(node["id"])
+    return groups
+
+
+def layout_graph(nodes: List[Dict[str, Any]], edges: List[Dict[str, Any]], max_nodes: Optional[int] = None,
+                 layout_threshold: Optional[int] = None, cluster_min_leaves: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Prepare vis-network nodes and edges for drawing; see the module docstring.
+
+    Args:
+        nodes: vis-network node objects; "nodeType" is used to group cluster members
+        edges: vis-network edge objects
+        max_nodes: Node cap (default VIS_MAX_NODES, 2000)
+        layout_threshold: Node count above which the layout is precomputed (default
+            VIS_LAYOUT_THRESHOLD, 150)
+        cluster_min_leaves: Smallest fan-out collapsed into a cluster (default
+            VIS_CLUSTER_MIN_LEAVES, 8)
+
+    Returns:
+        dict: "nodes", "edges", "clusters" (vis-network cluster node objects with their
+        member ids), "options" (vis-network options) and "omitted" (nodes over the cap)
+    """
+    max_nodes = max_nodes if max_nodes is not None else _env_int("VIS_MAX_NODES", 2000)
+    layout_threshold = layout_threshold if layout_threshold is not None else _env_int("VIS_LAYOUT_THRESHOLD", 150)
+    cluster_min_leaves = cluster_min_leaves if cluster_min_leaves is not None else _env_int("VIS_CLUSTER_MIN_LEAVES", 8)
+
+    omitted = max(0, len(nodes) - max_nodes)
+    if omitted:
+        nodes = nodes[:max_nodes]
+        kept = {node["id"] for node in nodes}
+        edges = [edge for edge in edges if edge["from"] in kept and edge["to"] in kept]
+
+    if len(nodes) <= layout_threshold:
+        return {"nodes": nodes, "edges": edges, "clusters": [], "options": NETWORK_OPTIONS, "omitted": omitted}
+
+    by_id = {node["id"]: node for node in nodes}
+    cluster_members: Dict[str, List[Any]] = {}
+    # Leaves of fan-outs too small for a cluster are placed around their hub afterwards
+    satellites: Dict[Any, List[Any]] = {}
+    for (hub, node_type), members in leaf_groups(nodes, edges).items():
+        if len(members) >= cluster_min_leaves:
+            cluster_members[f"cluster:{hub}:{node_type}"] = members
+        elif hub is not None:
+            satellites.setdefault(hub, []).extend(members)
+    member_of = {member: cluster_id for cluster_id, members in cluster_members.items() for member in members}
+    satellite_ids = {member for members in satellites.values() for member in members}
+
+    # Lay out the collapsed graph: hubs and other inner nodes plus one node per cluster
+    core_ids = [
+        node["id"] for node in nodes if node["id"] not in member_of and node["id"] not in satellite_ids
+    ] + list(cluster_members)
+    index = {node_id: i for i, node_id in enumerate(core_ids)}
+    core_edges = set()
+    for edge in edges:
+        a = index.get(member_of.get(edge["from"], edge["from"]))
+        b = index.get(member_of.get(edge["to"], edge["to"]))
+        if a is not None and b is not None and a != b:
+            core_edges.add((a, b))
+    # Fewer cooling steps for very large graphs keep the O(n^2) passes bounded
+    iterations = max(15, min(50, int(4e7 / max(1, len(core_ids)) ** 2)))
+    positions = force_layout(len(core_ids), sorted(core_edges), iterations=iterations) * LAYOUT_SCALE
+
+    laid_out = []
+    for node_id in core_ids[: len(core_ids) - len(cluster_members)]:
+        x, y = positions[index[node_id]]
+        laid_out.append({**by_id[node_id], "x": float(x), "y": float(y)})
+        for i, satellite in enumerate(satellites.get(node_id, [])):
+            angle = 2 * math.pi * i / len(satellites[node_id])
+            laid_out.append({
+                **by_id[satellite],
+                "x": float(x + 0.5 * LAYOUT_SCALE * math.cos(angle)),
+                "y": float(y + 0.5 * LAYOUT_SCALE * math.sin(angle)),
+            })
+
+    clusters = []
+    for cluster_id, members in cluster_members.items():
+        cx, cy = positions[index[cluster_id]]
+        first = by_id[members[0]]
+        node_type = first.get("nodeType", "Unknown")
+        for i, member in enumerate(members):
+            # Sunflower spiral around the cluster node, seen when the cluster is opened
+            radius = MEMBER_SPACING * math.sqrt(i + 1)
+            angle = i * GOLDEN_ANGLE
+            laid_out.append({
+                **by_id[member],
+                "x": float(cx + radius * math.cos(angle)),
+                "y": float(cy + radius * math.sin(angle)),
+                "cid": cluster_id,
+            })
+        names = [str(by_id[member].get("label", member)).replace("\n", " ") for member in members[:20]]
+        clusters.append({
+            "id": cluster_id,
+            "label": f"{len(members)} x {node_type}",
+            "title": "\n".join(names + (["..."] if len(members) > 20 else []) + ["(double-click to expand)"]),
+            "color": first.get("color"),
+            "shape": "dot",
+            "size": 10 + 4 * math.log2(len(members)),
+            "x": float(cx),
+            "y": float(cy),
+        })
+
+    options = {
+        **NETWORK_OPTIONS,
+        "physics": {"enabled": False},
+        "layout": {"improvedLayout": False},
+        "interaction": {"hideEdgesOnDrag": True, "tooltipDelay": 200},
+    }
+    return {"nodes": laid_out, "edges": edges, "clusters": clusters, "options": options, "omitted": omitted}
@@ -0,0 +1,291 @@
+# agents/utils/metrics.py
+
+"""
+Built-in metrics for the chat workflow.
+
+The process-wide registry (get_metrics) keeps counters and latency/size histograms in
+memory, for the debug panel in the Streamlit sidebar, and forwards every observation to
+the optional exporters:
+
+- Prometheus (pip install prometheus-client): set METRICS_PROMETHEUS_PORT and scrape
+  http://<host>:<port>/metrics
+- OpenTelemetry OTLP (pip install opentelemetry-sdk opentelemetry-exporter-otlp): set
+  OTEL_EXPORTER_OTLP_ENDPOINT; metrics are pushed every OTEL_METRIC_EXPORT_INTERVAL ms and
+  the LangGraph node and tool runs are also exported as spans
+
+What is recorded:
+- chatbot_stage_seconds{stage}: the timing stages (LLM steps, Cypher generation, query
+  execution, QA, web search, visualization, history writes, checkpoints, whole turns)
+- chatbot_node_seconds{node} and chatbot_tool_seconds{tool}, with *_errors counters
+- chatbot_llm_seconds{role,model} and chatbot_llm_tokens{role,model,direction}
+- chatbot_cypher_rows: rows returned per executed Cypher statement
+- chatbot_cypher_attempts{attempt,result}: generated statements by attempt (1, or 2 when
+  escalated) and outcome (ok, invalid, error)
+- chatbot_cache_requests{cache,result}: hits and misses of the semantic, search,
+  render, cypher_template and quick_answer caches
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+from uuid import UUID
+from langchain_core.callbacks import BaseCallbackHandler
+from agents.utils.timing import add_stage_listener, percentile
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    """Count, sum and max of all observations plus a window of recent ones for percentiles"""
+
+    def __init__(self, window: int = 1000):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.recent: Deque[float] = deque(maxlen=window)
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+        self.recent.append(value)
+
+
+class MetricsRegistry:
+    """
+    Thread-safe in-memory counters and histograms, forwarded to exporters (objects with
+    `increment(name, amount, labels)` and `observe(name, value, labels)` methods).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters: Dict[Tuple[str, LabelKey], float] = {}
+        self.histograms: Dict[Tuple[str, LabelKey], Histogram] = {}
+        self.exporters: List[Any] = []
+
+    def increment(self, name: str, amount: float = 1, **labels: str) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+        for exporter in self.exporters:
+            exporter.increment(name, amount, labels)
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.observe(value)
+        for exporter in self.exporters:
+            exporter.observe(name, value, labels)
+
+    def record_cache(self, cache: str, hit: bool) -> None:
+        self.increment("chatbot_cache_requests", cache=cache, result="hit" if hit else "miss")
+
+    def snapshot(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Counters, histogram summaries (avg/p50/p95/max over the recent window) and cache hit rates"""
+        with self._lock:
+            counters = [{"name": name, **dict(labels), "value": value} for (name, labels), value in self.counters.items()]
+            histograms = [
+                {
+                    "name": name,
+                    **dict(labels),
+                    "count": h.count,
+                    "avg": h.total / h.count if h.count else 0.0,
+                    "p50": percentile(h.recent, 50),
+                    "p95": percentile(h.recent, 95),
+                    "max": h.max,
+                }
+                for (name, labels), h in self.histograms.items()
+            ]
+        caches: Dict[str, Dict[str, float]] = {}
+        for counter in counters:
+            if counter["name"] == "chatbot_cache_requests":
+                caches.setdefault(counter["cache"], {"hit": 0, "miss": 0})[counter["result"]] += counter["value"]
+        cache_rates = [
+            {"cache": cache, "hits": c["hit"], "misses": c["miss"], "hit_rate": c["hit"] / (c["hit"] + c["miss"])}
+            for cache, c in sorted(caches.items()) if c["hit"] + c["miss"]
+        ]
+        return {
+            "histograms": sorted(histograms, key=lambda h: (h["name"], -h["count"])),
+            "counters": sorted(counters, key=lambda c: c["name"]),
+            "caches": cache_rates,
+        }
+
+
+class PrometheusExporter:
+    """Mirrors the registry into prometheus_client metrics served on `port`"""
+
+    def __init__(self, port: int):
+        import prometheus_client
+
+        self.client = prometheus_client
+        self.metrics: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        prometheus_client.start_http_server(port)
+
+    def _metric(self, kind: str, name: str, labels: Dict[str, str]):
+        with self._lock:
+            metric = self.metrics.get(name)
+            if metric is None:
+                factory = self.client.Counter if kind == "counter" else self.client.Histogram
+                metric = self.metrics[name] = factory(name, name.replace("_", " "), sorted(labels))
+        return metric.labels(**labels) if labels else metric
+
+    def increment(self, name: str, amount: float, labels: Dict[str, str]) -> None:
+        self._metric("counter", name, labels).inc(amount)
+
+    def observe(self, name: str, value: float, labels: Dict[str, str]) -> None:
+        self._metric("histogram", name, labels).observe(value)
+
+
+class OtlpExporter:
+    """Mirrors the registry into OpenTelemetry instruments pushed over OTLP"""
+
+    def __init__(self):
+        from opentelemetry import metrics, trace
+        from opentelemetry.exporter.otlp.proto.http.metric_exporter import OTLPMetricExporter
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        from opentelemetry.sdk.metrics import MeterProvider
+        from opentelemetry.sdk.metrics.export import PeriodicExportingMetricReader
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+
+        resource = Resource.create({"service.name": os.getenv("OTEL_SERVICE_NAME", "aml-graphrag-chatbot")})
+        reader = PeriodicExportingMetricReader(OTLPMetricExporter())
+        metrics.set_meter_provider(MeterProvider(resource=resource, metric_readers=[reader]))
+        tracer_provider = TracerProvider(resource=resource)
+        tracer_provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter()))
+        trace.set_tracer_provider(tracer_provider)
+
+        self.meter = metrics.get_meter("chatbot")
+        self.tracer = trace.get_tracer("chatbot")
+        self.instruments: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def _instrument(self, kind: str, name: str):
+        with self._lock:
+            instrument = self.instruments.get(name)
+            if instrument is None:
+                create = self.meter.create_counter if kind == "counter" else self.meter.create_histogram
+                instrument = self.instruments[name] = create(name)
+        return instrument
+
+    def increment(self, name: str, amount: float, labels: Dict[str, str]) -> None:
+        self._instrument("counter", name).add(amount, attributes=labels)
+
+    def observe(self, name: str, value: float, labels: Dict[str, str]) -> None:
+        self._instrument("histogram", name).record(value, attributes=labels)
+
+
+class MetricsCallbackHandler(BaseCallbackHandler):
+    """
+    Records the duration and errors of each LangGraph node run and tool run. With the OTLP
+    exporter, each run is also exported as a span under the span of its parent run.
+    """
+
+    def __init__(self, registry: MetricsRegistry, tracer: Any = None):
+        self.registry = registry
+        self.tracer = tracer
+        self._runs: Dict[UUID, Tuple[str, str, float, Any]] = {}
+        self._lock = threading.Lock()
+
+    def _start(self, run_id: UUID, parent_run_id: Optional[UUID], kind: str, name: str) -> None:
+        span = None
+        if self.tracer is not None:
+            from opentelemetry import trace
+
+            with self._lock:
+                parent = self._runs.get(parent_run_id) if parent_run_id else None
+            context = trace.set_span_in_context(parent[3]) if parent and parent[3] is not None else None
+            span = self.tracer.start_span(f"{kind} {name}", context=context)
+        with self._lock:
+            self._runs[run_id] = (kind, name, time.perf_counter(), span)
+
+    def _end(self, run_id: UUID, error: Optional[BaseException] = None) -> None:
+        with self._lock:
+            run = self._runs.pop(run_id, None)
+        if run is None:
+            return
+        kind, name, started, span = run
+        self.registry.observe(f"chatbot_{kind}_seconds", time.perf_counter() - started, **{kind: name})
+        if error is not None:
+            self.registry.increment(f"chatbot_{kind}_errors", **{kind: name})
+        if span is not None:
+            if error is not None:
+                span.record_exception(error)
+            span.end()
+
+    def on_chain_start(self, serialized, inputs, *, run_id: UUID, parent_run_id: Optional[UUID] = None,
+                       metadata: Optional[Dict[str, Any]] = None, **kwargs):
+        # Node runs carry their node name in the metadata; nested runnables inside a node do too
+        node = (metadata or {}).get("langgraph_node")
+        if node and kwargs.get("name") == node:
+            self._start(run_id, parent_run_id, "node", node)
+
+    def on_chain_end(self, outputs, *, run_id: UUID, **kwargs):
+        self._end(run_id)
+
+    def on_chain_error(self, error: BaseException, *, run_id: UUID, **kwargs):
+        self._end(run_id, error)
+
+    def on_tool_start(self, serialized, input_str, *, run_id: UUID, parent_run_id: Optional[UUID] = None, **kwargs):
+        self._start(run_id, parent_run_id, "tool", (serialized or {}).get("name") or kwargs.get("name") or "tool")
+
+    def on_tool_end(self, output, *, run_id: UUID, **kwargs):
+        self._end(run_id)
+
+    def on_tool_error(self, error: BaseException, *, run_id: UUID, **kwargs):
+        self._end(run_id, error)
+
+
+_registry: Optional[MetricsRegistry] = None
+_callback: Optional[MetricsCallbackHandler] = None
+_registry_lock = threading.Lock()
+
+
+def get_metrics() -> MetricsRegistry:
+    """
+    Process-wide registry. On first use it subscribes to the timing stages and starts the
+    exporters configured in the environment (METRICS_PROMETHEUS_PORT,
+    OTEL_EXPORTER_OTLP_ENDPOINT); a missing exporter package is reported and skipped.
+    """
+    global _registry, _callback
+    with _registry_lock:
+        if _registry is None:
+            registry = MetricsRegistry()
+            tracer = None
+            port = os.getenv("METRICS_PROMETHEUS_PORT")
+            if port:
+                try:
+                    registry.exporters.append(PrometheusExporter(int(port)))
+                    print(f"Prometheus metrics on port {port}")
+                except ImportError:
+                    print("METRICS_PROMETHEUS_PORT is set but prometheus-client is not installed")
+            if os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT"):
+                try:
+                    exporter = OtlpExporter()
+                    registry.exporters.append(exporter)
+                    tracer = exporter.tracer
+                except ImportError:
+                    print("OTEL_EXPORTER_OTLP_ENDPOINT is set but the OpenTelemetry SDK/OTLP exporter is not installed")
+
+            def on_stage(name: str, elapsed: float, allocated: Optional[int], error: bool) -> None:
+                registry.observe("chatbot_stage_seconds", elapsed, stage=name)
+                if error:
+                    registry.increment("chatbot_stage_errors", stage=name)
+
+            add_stage_listener(on_stage)
+            _callback = MetricsCallbackHandler(registry, tracer)
+            _registry = registry
+        return _registry
+
+
+def with_metrics(config: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy of a run config with the node/tool metrics callback added"""
+    get_metrics()
+    return {**config, "callbacks": list(config.get("callbacks") or []) + [_callback]}
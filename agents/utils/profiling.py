@@ -0,0 +1,212 @@
+# agents/utils/profiling.py
+
+"""
+On-demand sampling profiler for chat turns.
+
+While a turn runs, a background thread samples the Python stacks of every thread in the
+process (the Streamlit script thread, LangGraph node threads, tool threads, the history
+writer, HTTP client workers) every PROFILE_INTERVAL_MS. Each sample is weighted by the
+wall time since the previous one and, where the platform has per-thread CPU clocks, by
+the thread's CPU time, so the time spent waiting on I/O (wall but no CPU) can be told
+apart from pyvis, JSON or pydantic work (wall and CPU).
+
+The result is written as a speedscope file (https://www.speedscope.app, or
+`speedscope <file>`) with a wall and a CPU profile per active thread:
+    {PROFILE_DIR}/{thread_id}_{timestamp}.speedscope.json
+Only the newest PROFILE_MAX_FILES files are kept.
+
+Enable with PROFILE_TURNS=true (app and API server) or the "Profile turns" sidebar toggle.
+"""
+
+import json
+import os
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+PROFILE_DIR = "profiles"
+
+FrameKey = Tuple[str, str, int]
+
+
+def profiling_enabled() -> bool:
+    return os.getenv("PROFILE_TURNS", "false").strip().lower() in ("1", "true", "yes", "on")
+
+
+def thread_cpu_time(ident: int) -> Optional[float]:
+    """CPU seconds used by a thread, None where per-thread CPU clocks are not available"""
+    try:
+        return time.clock_gettime(time.pthread_getcpuclockid(ident))
+    except (AttributeError, OSError, OverflowError):
+        return None
+
+
+class SamplingProfiler:
+    """
+    Samples the stacks of all threads from a background thread.
+
+    Args:
+        interval: Seconds between samples
+    """
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.frames: List[FrameKey] = []
+        self.frame_index: Dict[FrameKey, int] = {}
+        # thread ident -> list of (stack as frame indexes root first, wall weight, cpu weight)
+        self.samples: Dict[int, List[Tuple[Tuple[int, ...], float, Optional[float]]]] = {}
+        self.thread_names: Dict[int, str] = {}
+        self.initial_threads: set = set()
+        self.started_at = 0.0
+        self.duration = 0.0
+        self._start = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _frame(self, frame: Any) -> int:
+        code = frame.f_code
+        key = (getattr(code, "co_qualname", code.co_name), code.co_filename, code.co_firstlineno)
+        index = self.frame_index.get(key)
+        if index is None:
+            index = self.frame_index[key] = len(self.frames)
+            self.frames.append(key)
+        return index
+
+    def _stack(self, frame: Any) -> Tuple[int, ...]:
+        stack = []
+        while frame is not None:
+            stack.append(self._frame(frame))
+            frame = frame.f_back
+        stack.reverse()
+        return tuple(stack)
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        last_wall = time.perf_counter()
+        last_cpu: Dict[int, Optional[float]] = {}
+        self.initial_threads = set(sys._current_frames())
+        while not self._stop.wait(self.interval):
+            now = time.perf_counter()
+            wall = now - last_wall
+            last_wall = now
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                cpu = thread_cpu_time(ident)
+                previous = last_cpu.get(ident)
+                last_cpu[ident] = cpu
+                cpu_weight = cpu - previous if cpu is not None and previous is not None else None
+                self.samples.setdefault(ident, []).append((self._stack(frame), wall, cpu_weight))
+            for thread in threading.enumerate():
+                self.thread_names.setdefault(thread.ident, thread.name)
+
+    def start(self) -> None:
+        self.started_at = time.time()
+        self._start = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="turn-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.duration = time.perf_counter() - self._start
+
+    def to_speedscope(self, name: str) -> Dict[str, Any]:
+        """Speedscope document with a wall and a CPU profile per thread that did anything"""
+        profiles = []
+        for ident, samples in self.samples.items():
+            stacks = {stack for stack, _, _ in samples}
+            cpu_total = sum(cpu for _, _, cpu in samples if cpu)
+            # Idle pool threads sit in the same stack for the whole turn; threads started
+            # during the turn are kept even if they only waited (e.g. on a socket)
+            if len(stacks) <= 1 and not cpu_total and ident in self.initial_threads:
+                continue
+            thread_name = self.thread_names.get(ident, str(ident))
+            for kind, position in (("wall", 1), ("cpu", 2)):
+                weighted = [(sample[0], sample[position]) for sample in samples if sample[position]]
+                if not weighted:
+                    continue
+                profiles.append({
+                    "type": "sampled",
+                    "name": f"{thread_name} ({kind})",
+                    "unit": "seconds",
+                    "startValue": 0,
+                    "endValue": sum(weight for _, weight in weighted),
+                    "samples": [list(stack) for stack, _ in weighted],
+                    "weights": [weight for _, weight in weighted],
+                })
+        # Busiest thread first, so speedscope opens on it
+        profiles.sort(key=lambda p: (not p["name"].endswith("(wall)"), -p["endValue"]))
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": "agents.utils.profiling",
+            "activeProfileIndex": 0,
+            "shared": {"frames": [{"name": n, "file": f, "line": line} for n, f, line in self.frames]},
+            "profiles": profiles,
+        }
+
+
+class TurnProfile:
+    """Result of profile_turn: the path of the written file (None if profiling was off)"""
+
+    def __init__(self):
+        self.path: Optional[str] = None
+        self.duration = 0.0
+
+
+def enforce_retention(directory: str, max_files: int) -> None:
+    """Delete the oldest profiles beyond max_files"""
+    paths = [
+        os.path.join(directory, name) for name in os.listdir(directory)
+        if name.endswith(".speedscope.json")
+    ]
+    paths.sort(key=os.path.getmtime)
+    for path in paths[: max(0, len(paths) - max_files)]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+@contextmanager
+def profile_turn(thread_id: str, enabled: Optional[bool] = None) -> Iterator[TurnProfile]:
+    """
+    Profile the enclosed turn and write a speedscope file named after the thread id.
+
+    Args:
+        thread_id: Checkpointer thread id of the conversation
+        enabled: Profile this turn; defaults to PROFILE_TURNS
+
+    Env vars: PROFILE_DIR (default profiles), PROFILE_INTERVAL_MS (default 5),
+    PROFILE_MAX_FILES (default 50).
+    """
+    result = TurnProfile()
+    if not (profiling_enabled() if enabled is None else enabled):
+        yield result
+        return
+
+    profiler = SamplingProfiler(interval=float(os.getenv("PROFILE_INTERVAL_MS", "5")) / 1000)
+    profiler.start()
+    try:
+        yield result
+    finally:
+        profiler.stop()
+        result.duration = profiler.duration
+        try:
+            directory = os.getenv("PROFILE_DIR", PROFILE_DIR)
+            os.makedirs(directory, exist_ok=True)
+            stamp = time.strftime("%Y%m%dT%H%M%S", time.localtime(profiler.started_at))
+            safe_id = re.sub(r"[^A-Za-z0-9_.-]", "_", thread_id)
+            path = os.path.join(directory, f"{safe_id}_{stamp}_{int(profiler.started_at * 1000) % 1000:03d}.speedscope.json")
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(profiler.to_speedscope(f"{thread_id} {stamp} ({profiler.duration:.2f}s)"), f)
+            enforce_retention(directory, int(os.getenv("PROFILE_MAX_FILES", "50")))
+            result.path = path
+            print(f"Profile of turn written to {path}")
+        except Exception as e:
+            print(f"Could not write profile: {e}")
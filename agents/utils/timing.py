@@ -0,0 +1,59 @@
+# agents/utils/timing.py
+
+import math
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Callable, Iterator, List, Optional, Sequence
+
+# Called with (stage name, elapsed seconds, net traced bytes or None, error)
+StageListener = Callable[[str, float, Optional[int], bool], None]
+
+_listeners: List[StageListener] = []
+_listeners_lock = threading.Lock()
+
+
+def add_stage_listener(listener: StageListener) -> None:
+    with _listeners_lock:
+        _listeners.append(listener)
+
+
+def remove_stage_listener(listener: StageListener) -> None:
+    with _listeners_lock:
+        if listener in _listeners:
+            _listeners.remove(listener)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """
+    Time a stage of a chat turn (agent step, Cypher generation, query execution, ...) and
+    report it to the registered listeners. When tracemalloc is tracing, the net memory
+    allocated during the stage is reported too. Costs two clock reads when nobody listens.
+    """
+    tracing = tracemalloc.is_tracing()
+    before = tracemalloc.get_traced_memory()[0] if tracing else 0
+    started = time.perf_counter()
+    error = False
+    try:
+        yield
+    except BaseException:
+        error = True
+        raise
+    finally:
+        elapsed = time.perf_counter() - started
+        if _listeners:
+            allocated = tracemalloc.get_traced_memory()[0] - before if tracing else None
+            with _listeners_lock:
+                listeners = list(_listeners)
+            for listener in listeners:
+                listener(name, elapsed, allocated, error)
+
+
+def percentile(values: Sequence[float], p: float) -> float:
+    """p-th percentile (nearest rank) of the values, 0.0 if there are none"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(len(ordered) * p / 100) - 1))]
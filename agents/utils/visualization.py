@@ -1,12 +1,12 @@
-from py2neo import Graph as py2neo_Graph
-import networkx as nx
-from pyvis.network import Network
-from IPython.display import IFrame, display
+# agents/utils/visualization.py
+
 from datetime import datetime
-import os
+from agents.utils.graph_html import render_network_html, get_render_cache
+from agents.utils.graph_layout import layout_graph
+from agents.utils.metrics import get_metrics
 
 
-def visualize_neo4j_results_v1(result_dict,html_filename = "visualize_graph.html"):
+def visualize_neo4j_results_v1(result_dict):
     """
     Updated function to handle:
       1) 'Graph-style' returns (e.g. RETURN p, a, r or RETURN n, r, p).
@@ -43,7 +43,8 @@ def visualize_neo4j_results_v1(result_dict,html_filename = "visualize_graph.html
     # Extract the list of records
     cypher_result = result_dict.get("cypher_result", [])
     
-    net = Network(height='600px', width='100%', bgcolor='#ffffff', font_color='black', directed=True)
+    nodes = []
+    edges = []
 
     color_map = {
         'Person': '#F9C6CD',            # Light pink
@@ -80,24 +81,27 @@ def visualize_neo4j_results_v1(result_dict,html_filename = "visualize_graph.html
     def add_node(node_id, label, props):
         if node_id not in added_nodes:
             title = build_title(label, props)
-            net.add_node(
-                node_id,
-                label=label,
-                title=title,
-                color=color_map.get(label, '#cccccc')
-            )
+            nodes.append({
+                "id": node_id,
+                "label": label,
+                "title": title,
+                "color": color_map.get(label, '#cccccc'),
+                "nodeType": label,
+                "shape": "dot",
+                "font": {"color": "black"}
+            })
             added_nodes.add(node_id)
 
     def add_edge(src_id, dst_id, rel_type):
         edge_key = f"{src_id}-{dst_id}-{rel_type}"
         if edge_key not in added_edges:
-            net.add_edge(
-                src_id,
-                dst_id,
-                title=rel_type,
-                label=rel_type,
-                arrows='to'
-            )
+            edges.append({
+                "from": src_id,
+                "to": dst_id,
+                "title": rel_type,
+                "label": rel_type,
+                "arrows": "to"
+            })
             added_edges.add(edge_key)
 
     # Iterate over each record in cypher_result
@@ -177,34 +181,10 @@ def visualize_neo4j_results_v1(result_dict,html_filename = "visualize_graph.html
             # Catch-all: If there's some other structure, handle or skip as needed.
             pass
 
-    # Network options
-    net.set_options("""
-    var options = {
-        "physics": {
-            "forceAtlas2Based": {
-                "gravitationalConstant": -50,
-                "springLength": 100,
-                "springConstant": 0.08
-            },
-            "solver": "forceAtlas2Based",
-            "minVelocity": 0.75
-        },
-        "edges": {
-            "font": {
-                "size": 8,
-                "align": "middle"
-            },
-            "smooth": false
-        },
-        "nodes": {
-            "font": {
-                "size": 12
-            }
-        }
-    }
-    """)
+    # Cap, cluster and lay out large results (see agents/utils/graph_layout.py)
+    view = layout_graph(nodes, edges)
+    omitted_note = f"<br>Showing {len(nodes) - view['omitted']} of {len(nodes)} nodes" if view["omitted"] else ""
 
-    cypher_query = result_dict.get("generated_cypher", "No query provided")
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
     # metadata_html = f"""
@@ -221,64 +201,130 @@ def visualize_neo4j_results_v1(result_dict,html_filename = "visualize_graph.html
     <div style="position: fixed; top: 10px; right: 10px; background: rgba(255,255,255,0.9); 
             padding: 5px 10px; border-radius: 5px; border: 1px solid #ccc; 
             font-family: monospace; font-size: 12px;">
-    <strong>Generated:</strong> {timestamp}
+    <strong>Generated:</strong> {timestamp}{omitted_note}
     </div>
     """
 
-    # Write to HTML and return the IFrame
+    # Render the HTML in memory, with the metadata div before the closing body tag
     try:
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        parent_dir = os.path.dirname(current_dir)
-        html_path = os.path.join(parent_dir, html_filename)
-        
-        print(f"Saving graph: {html_path}")
-        net.write_html(html_path)
-
-        # Insert metadata into the generated HTML
-        with open(html_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        # Insert metadata div before the closing body tag
-        content = content.replace('</body>', f'{metadata_html}</body>')
-        
-        # Return the HTML content directly
-        return content
-
+        return render_network_html(
+            view["nodes"], view["edges"], options=view["options"], footer_html=metadata_html, clusters=view["clusters"]
+        )
     except Exception as e:
-        print(f"Error saving graph: {e}")
+        print(f"Error rendering graph: {e}")
         return None
     
 
-from pyvis.network import Network
-from datetime import datetime
-import os
+# Color scheme for different node types
+NODE_COLORS = {
+    'Person': '#F9C6CD',            # Light pink
+    'Alias': '#7DB37D',             # Sage green
+    'Address': '#E8935A',           # Coral orange
+    'Program': '#E57C9C',           # Pink rose
+    'Identitydocument': '#4C8FBD',  # Blue
+    'Unknown': '#cccccc'            # Gray for unknown types
+}
+
+
+def node_caption(node_type, node_data, fallback):
+    """Label of a node: its type and name"""
+    if node_type == 'Identitydocument':
+        # For identity documents, show type and number
+        return f"{node_data.get('type', 'Document')}\n{node_data.get('documentnumber', '')}"
+    if node_type == 'Person':
+        # For persons, show "Person" text and full name
+        full_name = node_data.get('fullName') or node_data.get('firstName', '') + ' ' + node_data.get('lastName', '')
+        return f"Person\n{full_name}"
+    if node_type == 'Alias':
+        # For aliases, show "Alias" text and full name
+        alias_name = node_data.get('fullname') or node_data.get('firstName', '') + ' ' + node_data.get('lastName', '')
+        return f"Alias\n{alias_name}"
+    if node_type == 'Program':
+        # For programs, show the program name
+        return node_data.get('name', 'Program')
+    return str(fallback)
+
+
+def network_node(node_id, node_type, node_data, label):
+    """vis-network node object"""
+    return {
+        "id": node_id,
+        "label": label,
+        "title": "\n".join(f"{k}: {v}" for k, v in node_data.items()),
+        "color": NODE_COLORS.get(node_type, NODE_COLORS['Unknown']),
+        "nodeType": node_type,
+        "shape": "dot",
+        "font": {"color": "black"}
+    }
+
+
+def graph_payload_elements(graph_payload):
+    """
+    vis-network nodes and edges of a cypher_qa graph payload (see tools/graph_result.py).
+    Nodes are unique by element id and typed by their label, so this is a single pass.
+
+    Returns:
+        tuple: (nodes, edges)
+    """
+    nodes = []
+    for node in graph_payload["nodes"]:
+        labels = node["labels"]
+        node_type = next((label for label in labels if label in NODE_COLORS), labels[0] if labels else 'Unknown')
+        nodes.append(network_node(node["id"], node_type, node["properties"],
+                                  node_caption(node_type, node["properties"], node_type)))
+    edges = [
+        {
+            "id": relationship["id"],
+            "from": relationship["start"],
+            "to": relationship["end"],
+            "title": relationship["type"],
+            "label": relationship["type"],
+            "arrows": "to"
+        }
+        for relationship in graph_payload["relationships"]
+    ]
+    return nodes, edges
+
+
+# Stands for the render time in cached HTML; filled in whenever the HTML is returned
+GENERATED_PLACEHOLDER = "<!--generated-->"
+
+
+def with_timestamp(html: str) -> str:
+    return html.replace(GENERATED_PLACEHOLDER, datetime.now().strftime("%Y-%m-%d %H:%M:%S"), 1)
+
 
-def visualize_neo4j_results_v2(result_dict, html_filename="visualize_graph.html"):
+def visualize_neo4j_results_v2(result_dict):
     """
     A more flexible visualization function that can handle various Cypher query patterns.
+    The HTML is rendered in memory and cached by the hash of the result, so repeated
+    results (history reruns, cached answers) are not rendered again.
+
+    When the result comes with the graph payload of cypher_qa (tools/graph_result.py),
+    nodes are taken from it by element id and typed by their label, in a single pass.
+    Otherwise nodes are identified and typed from their properties in the rows.
     
     Args:
         result_dict: Dictionary containing:
             - cypher_result: List of dictionaries with query results
+            - graph: Optional graph payload of the results
             - generated_cypher: The Cypher query that was executed
-        html_filename: Name of the output HTML file
     
     Returns:
         str: HTML content for the visualization
     """
     cypher_result = result_dict.get("cypher_result", [])
+    graph_payload = result_dict.get("graph")
+
+    render_cache = get_render_cache()
+    cache_key = render_cache.key(graph_payload or cypher_result)
+    cached_html = render_cache.get(cache_key)
+    get_metrics().record_cache("render", hit=cached_html is not None)
+    if cached_html is not None:
+        return with_timestamp(cached_html)
     
-    net = Network(height='600px', width='100%', bgcolor='#ffffff', font_color='black', directed=True)
-
-    # Color scheme for different node types
-    color_map = {
-        'Person': '#F9C6CD',            # Light pink
-        'Alias': '#7DB37D',             # Sage green
-        'Address': '#E8935A',           # Coral orange
-        'Program': '#E57C9C',           # Pink rose
-        'Identitydocument': '#4C8FBD',  # Blue
-        'Unknown': '#cccccc'            # Gray for unknown types
-    }
+    nodes = []
+    edges = []
 
     added_nodes = set()
     added_edges = set()
@@ -317,33 +363,7 @@ def visualize_neo4j_results_v2(result_dict, html_filename="visualize_graph.html"
         if node_id not in added_nodes:
             node_type = guess_node_type(node_data)
             
-            # Build node label based on type
-            if node_type == 'Identitydocument':
-                # For identity documents, show type and number
-                label = f"{node_data.get('type', 'Document')}\n{node_data.get('documentnumber', '')}"
-            elif node_type == 'Person':
-                # For persons, show "Person" text and full name
-                full_name = node_data.get('fullName') or node_data.get('firstName', '') + ' ' + node_data.get('lastName', '')
-                label = f"Person\n{full_name}"
-            elif node_type == 'Alias':
-                # For aliases, show "Alias" text and full name
-                alias_name = node_data.get('fullname') or node_data.get('firstName', '') + ' ' + node_data.get('lastName', '')
-                label = f"Alias\n{alias_name}"
-            elif node_type == 'Program':
-                # For programs, show the program name
-                label = node_data.get('name', 'Program')
-            else:
-                label = str(node_id)
-            
-            # Build tooltip content
-            tooltip = "\n".join(f"{k}: {v}" for k, v in node_data.items())
-            
-            net.add_node(
-                node_id,
-                label=label,
-                title=tooltip,
-                color=color_map.get(node_type, color_map['Unknown'])
-            )
+            nodes.append(network_node(node_id, node_type, node_data, node_caption(node_type, node_data, node_id)))
             added_nodes.add(node_id)
         
         return node_id
@@ -355,13 +375,13 @@ def visualize_neo4j_results_v2(result_dict, html_filename="visualize_graph.html"
             
         edge_key = f"{source_id}-{target_id}-{rel_type}"
         if edge_key not in added_edges:
-            net.add_edge(
-                source_id,
-                target_id,
-                title=rel_type,
-                label=rel_type,
-                arrows='to'
-            )
+            edges.append({
+                "from": source_id,
+                "to": target_id,
+                "title": rel_type,
+                "label": rel_type,
+                "arrows": "to"
+            })
             added_edges.add(edge_key)
 
     def process_record(record):
@@ -397,66 +417,33 @@ def visualize_neo4j_results_v2(result_dict, html_filename="visualize_graph.html"
                 rel_name = str(rel_type)
             add_edge(start_id, end_id, rel_name)
 
-    # Process all records
-    for record in cypher_result:
-        process_record(record)
-
-    # Add physics options for better layout
-    net.set_options("""
-    var options = {
-        "physics": {
-            "forceAtlas2Based": {
-                "gravitationalConstant": -50,
-                "springLength": 100,
-                "springConstant": 0.08
-            },
-            "solver": "forceAtlas2Based",
-            "minVelocity": 0.75
-        },
-        "edges": {
-            "font": {
-                "size": 8,
-                "align": "middle"
-            },
-            "smooth": false
-        },
-        "nodes": {
-            "font": {
-                "size": 12
-            }
-        }
-    }
-    """)
+    if graph_payload:
+        nodes, edges = graph_payload_elements(graph_payload)
+    else:
+        # Process all records
+        for record in cypher_result:
+            process_record(record)
 
-    # Add metadata (timestamp and query)
-    cypher_query = result_dict.get("generated_cypher", "No query provided")
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    
+    # Cap, cluster and lay out large results (see agents/utils/graph_layout.py)
+    view = layout_graph(nodes, edges)
+    omitted_note = f"<br>Showing {len(nodes) - view['omitted']} of {len(nodes)} nodes" if view["omitted"] else ""
+
+    # Add metadata (the timestamp is filled in outside the cached HTML)
     metadata_html = f"""
     <div style="position: fixed; top: 10px; right: 10px; background: rgba(255,255,255,0.9); 
             padding: 5px 10px; border-radius: 5px; border: 1px solid #ccc; 
             font-family: monospace; font-size: 12px;">
-    <strong>Generated:</strong> {timestamp}
+    <strong>Generated:</strong> {GENERATED_PLACEHOLDER}{omitted_note}
     </div>
     """
 
     try:
-        # Save to HTML file
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        parent_dir = os.path.dirname(current_dir)
-        html_path = os.path.join(parent_dir, html_filename)
-        
-        print(f"Saving graph: {html_path}")
-        net.write_html(html_path)
-
-        # Add metadata to HTML
-        with open(html_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        content = content.replace('</body>', f'{metadata_html}</body>')
-        
-        return content
+        content = render_network_html(
+            view["nodes"], view["edges"], options=view["options"], footer_html=metadata_html, clusters=view["clusters"]
+        )
+        render_cache.put(cache_key, content)
+        return with_timestamp(content)
 
     except Exception as e:
-        print(f"Error saving graph: {e}")
+        print(f"Error rendering graph: {e}")
         return None
\ No newline at end of file
@@ -0,0 +1,160 @@
+# agents/warmup.py
+
+"""
+Background warm-up after a start, so the first analyst does not pay for cold caches.
+
+Stages, in order:
+    driver          open the Neo4j connection pool (get_graph) and run a trivial query
+    schema          fetch the schema and build the schema catalog
+    agent           build the shared agent graph and LLM clients (agents/registry.py)
+    quick_questions run cypher_qa on every quick question without a stored result
+                    (generated Cypher, rows and graph payload go to the quick answer
+                    store, agents/quick_answers.py) and pre-render the graph of each one
+
+The state becomes "ready" once the first three stages are done; quick_questions runs
+after that, so /ready does not wait on LLM calls. The stage needs no agent turn and no
+semantic cache: only the Cypher generation (and QA, unless in direct mode) is paid, once
+per question and data version. Questions that gave no rows, or that the agent answered
+with web search or without a tool in an earlier turn, are not run again.
+
+warmup_status() reports the progress; the app shows it in the sidebar and the API server
+at /ready.
+"""
+
+import json
+import os
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, Optional
+from agents.utils.timing import stage
+
+_status: Dict[str, Any] = {"state": "not_started", "stages": {}, "questions": {"warmed": 0, "total": 0}}
+_status_lock = threading.Lock()
+_thread: Optional[threading.Thread] = None
+
+
+def warmup_enabled() -> bool:
+    """Whether a start warms the caches (env: WARMUP, default true)"""
+    return os.getenv("WARMUP", "true").strip().lower() in ("1", "true", "yes", "on")
+
+
+def warmup_status() -> Dict[str, Any]:
+    """
+    Progress of the warm-up.
+
+    Returns:
+        dict: "state" (not_started, running, ready, failed or disabled), "stages" (name ->
+        state, seconds and error) and "questions" (warmed and total quick questions)
+    """
+    with _status_lock:
+        return json.loads(json.dumps(_status))
+
+
+def _update(**changes: Any) -> None:
+    with _status_lock:
+        _status.update(changes)
+
+
+def _run_stage(name: str, fn: Callable[[], Optional[str]]) -> bool:
+    """Run a stage and record its outcome; returns False if it failed"""
+    with _status_lock:
+        _status["stages"][name] = {"state": "running"}
+    started = time.perf_counter()
+    try:
+        with stage(f"warmup_{name}"):
+            note = fn()
+        result = {"state": "skipped" if note else "done", "note": note}
+    except Exception as e:
+        print(f"Warm-up stage {name} failed: {e}")
+        result = {"state": "failed", "error": str(e)}
+    result["seconds"] = round(time.perf_counter() - started, 3)
+    with _status_lock:
+        _status["stages"][name] = result
+    return result["state"] != "failed"
+
+
+def _warm_driver() -> None:
+    from tools.graph_store import get_graph
+
+    get_graph().query("RETURN 1 AS ok")
+
+
+def _warm_schema() -> None:
+    from tools.graph_store import get_graph
+    from tools.schema_catalog import get_schema_catalog
+
+    graph = get_graph()
+    # The text schema is built on first access; the catalog uses the structured one
+    graph.get_schema
+    get_schema_catalog(graph)
+
+
+def _warm_agent() -> None:
+    from agents.registry import get_agent
+
+    get_agent()
+
+
+def _warm_quick_questions() -> Optional[str]:
+    from agents.chat_agent import create_cypher_tool
+    from agents.quick_answers import get_quick_answers
+    from agents.quick_questions import get_quick_questions
+    from agents.semantic_cache import is_standalone
+    from agents.turn import build_visualization, extract_cypher_result, quick_answer_messages, tool_output
+    from agents.utils.artifacts import get_artifact_store
+
+    store = get_quick_answers()
+    # Follow-up questions depend on a conversation, so they have no result of their own
+    questions = [question for question in get_quick_questions() if is_standalone(question)]
+    _update(questions={"warmed": 0, "total": len(questions)})
+    tool = None
+    for i, question in enumerate(questions, start=1):
+        try:
+            quick = store.get(question)
+            if quick is None and store.status(question) == "missing":
+                tool = tool or create_cypher_tool()
+                # Called as the agent's tool node does, so the content is what the model sees
+                message = tool.invoke({
+                    "name": "cypher_qa", "args": {"query": question}, "id": f"warmup_{uuid.uuid4().hex[:12]}",
+                    "type": "tool_call",
+                })
+                # Errors (e.g. a rejected write query) come without a graph payload
+                _, rows = extract_cypher_result(json.loads(message.content)) if message.artifact else (None, [])
+                quick = {"content": message.content, "graph": message.artifact} if rows else None
+                if quick is None:
+                    store.put(question, None)
+            if quick is not None:
+                # The output as the app stores it, and its graph rendered (also into the render cache)
+                output = tool_output(quick_answer_messages(question, quick)[1])
+                _, html = build_visualization(output)
+                display_key = get_artifact_store().put_json(json.loads(output))
+                store.put(question, quick["content"], quick["graph"], html, display_key)
+        except Exception as e:
+            print(f"Could not warm up quick question {question!r}: {e}")
+        _update(questions={"warmed": i, "total": len(questions)})
+    return None
+
+
+def _warm_up() -> None:
+    started = time.perf_counter()
+    ok = _run_stage("driver", _warm_driver) and _run_stage("schema", _warm_schema)
+    ok = ok and _run_stage("agent", _warm_agent)
+    _update(state="ready" if ok else "failed", seconds=round(time.perf_counter() - started, 3))
+    print(f"Warm-up {'finished' if ok else 'failed'} in {time.perf_counter() - started:.1f}s")
+    if ok:
+        _run_stage("quick_questions", _warm_quick_questions)
+
+
+def start_warmup() -> None:
+    """Start the warm-up in a background thread, once per process (env: WARMUP)"""
+    global _thread
+    with _status_lock:
+        if _thread is not None or _status["state"] != "not_started":
+            return
+        if not warmup_enabled():
+            _status["state"] = "disabled"
+            return
+        _status["state"] = "running"
+        _thread = threading.Thread(target=_warm_up, name="warmup", daemon=True)
+        _thread.start()
@@ -5,16 +5,30 @@ from typing import List
 import os
 from dotenv import load_dotenv
 from langchain_core.messages import AIMessage, HumanMessage, ToolMessage, SystemMessage
-from agents.chat_agent import create_agent, get_chat_config
+from agents.chat_agent import get_chat_config
+from agents.quick_answers import get_quick_answers
+from agents.quick_questions import get_quick_questions
+from agents.registry import get_agent
+from agents.turn import build_visualization, extract_cypher_result, run_turn, tool_output
+from agents.utils.artifacts import get_artifact_store
+from agents.utils.graph_layout import layout_graph
+from agents.utils.metrics import get_metrics
+from agents.utils.profiling import profile_turn, profiling_enabled
+from agents.utils.visualization import graph_payload_elements
+from agents.warmup import start_warmup, warmup_status
+from components.graph_explorer import explorer_enabled, graph_explorer
 import json
-from agents.utils.visualization import visualize_neo4j_results_v1,visualize_neo4j_results_v2 
 import streamlit.components.v1 as components
 import getpass
-from langchain_community.chat_message_histories import SQLChatMessageHistory
+import uuid
 
 # Load environment variables
 load_dotenv(override=True)
 
+# Messages rendered per history page, and answers whose graphs are shown without a click
+HISTORY_PAGE_SIZE = int(os.getenv("HISTORY_PAGE_SIZE", "20"))
+HISTORY_EXPANDED_GRAPHS = int(os.getenv("HISTORY_EXPANDED_GRAPHS", "2"))
+
 def initialize_page():
     st.set_page_config(
         page_title="AML/OFAC GraphRAG Chatbot",
@@ -22,76 +36,229 @@ def initialize_page():
         layout="wide"
     )
 
+def expand_graph_node(node_id):
+    """vis-network nodes and edges around a node, for the graph explorer"""
+    from tools.graph_result import expand_neighbors
+    from tools.graph_store import get_graph
+
+    payload = expand_neighbors(get_graph(), node_id)
+    return graph_payload_elements(payload) if payload else ([], [])
+
+def store_artifacts(tool_contents: List[str]) -> List[dict]:
+    """
+    Put cypher_qa outputs in the artifact store
+
+    Returns:
+        list: One entry per output with a query: the executed Cypher, the artifact key of
+        the output, whether it carries a graph payload and, for a precomputed quick answer,
+        the key of its pre-rendered graph HTML
+    """
+    store = get_artifact_store()
+    quick_answers = get_quick_answers()
+    entries = []
+    for content in tool_contents:
+        try:
+            tool_content = json.loads(content)
+        except json.JSONDecodeError as e:
+            print(f"Failed to parse tool message: {e}")
+            st.error("Failed to parse tool message")
+            continue
+        if not isinstance(tool_content, dict):
+            continue
+        cypher_query, _ = extract_cypher_result(tool_content)
+        if cypher_query is not None:
+            key = store.put_json(tool_content)
+            entry = {
+                "cypher": cypher_query,
+                "content": key,
+                "graph": tool_content.get("graph") is not None,
+            }
+            html_key = quick_answers.html_for(key)
+            if html_key:
+                entry["html"] = html_key
+            entries.append(entry)
+    return entries
+
+def render_artifact(entry: dict, key: str, show_graph: bool = True):
+    """
+    Show the Cypher query and the graph visualization of a stored cypher_qa output.
+    Results with a graph payload are shown in the graph explorer, which keeps its graph on
+    the client across reruns; the others as HTML, rendered once and then read from the
+    artifact store. With show_graph False the graph is loaded on demand.
+    """
+    store = get_artifact_store()
+    # Get the actual executed query
+    with st.expander("View Cypher Query"):
+        st.code(entry["cypher"], language="cypher")
+
+    if not show_graph and key not in st.session_state.loaded_graphs:
+        if st.button("Show graph", key=f"load-{key}"):
+            st.session_state.loaded_graphs.add(key)
+            st.rerun()
+        return
+
+    if entry["graph"] and explorer_enabled():
+        content = store.get(entry["content"])
+        if content is None:
+            st.caption("This result is no longer stored")
+            return
+        st.markdown("### Graph Visualization")
+        graph_explorer(
+            key=key,
+            load=lambda: layout_graph(*graph_payload_elements(json.loads(content)["graph"])),
+            expand=expand_graph_node
+        )
+        return
+
+    visualization_html = store.get(entry["html"]) if entry.get("html") else None
+    if visualization_html is None:
+        content = store.get(entry["content"])
+        if content is None:
+            st.caption("This result is no longer stored")
+            return
+        _, visualization_html = build_visualization(content)
+        if visualization_html:
+            entry["html"] = store.put(visualization_html)
+    # Process visualization if context exists
+    if visualization_html:
+        st.markdown("### Graph Visualization")
+        # Fixed the components.html reference
+        st.components.v1.html(
+            visualization_html, 
+            height=650, 
+            width=650,
+            scrolling=True
+        )
+
+def render_warmup_status():
+    """Sidebar caption with the progress of the startup warm-up"""
+    status = warmup_status()
+    if status["state"] == "running":
+        questions = status["questions"]
+        running = [name for name, info in status["stages"].items() if info["state"] == "running"]
+        progress = f" ({questions['warmed']}/{questions['total']})" if running == ["quick_questions"] else ""
+        st.caption(f"Warming up: {', '.join(running) or 'starting'}{progress}")
+    elif status["state"] == "ready":
+        questions = status["questions"]
+        if status["stages"].get("quick_questions", {}).get("state") == "running":
+            st.caption(f"Warming up quick questions ({questions['warmed']}/{questions['total']})")
+        else:
+            st.caption(f"Warm-up done in {status.get('seconds', 0):.0f}s")
+    elif status["state"] == "failed":
+        failed = [f"{name}: {info.get('error')}" for name, info in status["stages"].items() if info["state"] == "failed"]
+        st.caption(f"Warm-up failed ({'; '.join(failed)})")
+
+def render_history():
+    """
+    Show the latest page of the conversation. Earlier messages are rendered on request, and
+    only the latest answers show their graphs right away, so a rerun costs the same however
+    long the conversation is.
+    """
+    messages = st.session_state.messages
+    first = max(0, len(messages) - st.session_state.history_size)
+    if first and st.button(f"Show earlier messages ({first})", key="history-earlier"):
+        st.session_state.history_size += HISTORY_PAGE_SIZE
+        st.rerun()
+
+    expanded = [
+        message.id for message in reversed(messages)
+        if isinstance(message, AIMessage) and message.id in st.session_state.artifacts
+    ][:HISTORY_EXPANDED_GRAPHS]
+
+    for message in messages[first:]:
+        if isinstance(message, HumanMessage):
+            with st.chat_message("user"):
+                st.markdown(message.content)
+        elif isinstance(message, AIMessage):
+            with st.chat_message("assistant"):
+                st.markdown(message.content)
+                for i, entry in enumerate(st.session_state.artifacts.get(message.id, [])):
+                    render_artifact(entry, key=f"graph-{message.id}-{i}", show_graph=message.id in expanded)
+        elif isinstance(message, ToolMessage):
+            with st.chat_message("assistant"):
+                st.markdown(f"🔧 Tool ({message.name}): {message.content}")
+
+def render_metrics_panel():
+    """Sidebar debug panel with the in-process metrics of this server process"""
+    snapshot = get_metrics().snapshot()
+    if snapshot["caches"]:
+        st.caption("Cache hit rates")
+        st.dataframe(
+            [{"cache": c["cache"], "hits": int(c["hits"]), "misses": int(c["misses"]), "hit rate": f"{c['hit_rate']:.0%}"}
+             for c in snapshot["caches"]],
+            hide_index=True, use_container_width=True
+        )
+    timings = []
+    for h in snapshot["histograms"]:
+        labels = ", ".join(str(v) for k, v in h.items() if k not in ("name", "count", "avg", "p50", "p95", "max"))
+        scale = 1000 if h["name"].endswith("_seconds") else 1
+        timings.append({
+            "metric": f"{h['name'].removeprefix('chatbot_')} {labels}".strip(),
+            "n": h["count"],
+            "avg": round(h["avg"] * scale, 1),
+            "p95": round(h["p95"] * scale, 1),
+            "max": round(h["max"] * scale, 1),
+        })
+    if timings:
+        st.caption("Latency (ms) and Cypher rows")
+        st.dataframe(timings, hide_index=True, use_container_width=True)
+    tokens = [c for c in snapshot["counters"] if c["name"] == "chatbot_llm_tokens"]
+    if tokens:
+        st.caption("LLM tokens")
+        st.dataframe(
+            [{"role": c["role"], "model": c["model"], "direction": c["direction"], "tokens": int(c["value"])} for c in tokens],
+            hide_index=True, use_container_width=True
+        )
+
 def process_message(prompt: str, chat_container):
     """Process a message and update the chat"""
     if not prompt.strip():
         return
     
-    user_message = HumanMessage(content=prompt)
+    user_message = HumanMessage(content=prompt, id=str(uuid.uuid4()))
 
     with chat_container.chat_message("user"):
         st.markdown(prompt)
 
     st.session_state.messages.append(user_message)
 
+    thread_id = st.session_state.chat_config["configurable"]["thread_id"]
     with chat_container.chat_message("assistant"):
-        with st.spinner("Processing query..."):
+        with st.spinner("Processing query..."), profile_turn(thread_id, st.session_state.get("profile_turns")) as profile:
             try:
-                # Get response from agent
-                result = st.session_state.agent_workflow.invoke(
-                    {"messages": st.session_state.messages.copy()},
-                     config=st.session_state.chat_config
-                )
+                # Answer from the semantic cache or the agent (see agents/turn.py)
+                turn = run_turn(st.session_state.agent_workflow, st.session_state.chat_config, user_message)
+                new_messages = turn["messages"]
+                cached = turn["cached"]
 
                 # First display the final AI response
-                last_message = result["messages"][-1]
+                last_message = new_messages[-1] if new_messages else None
                 if isinstance(last_message, AIMessage):
                     st.markdown(last_message.content)
                     st.session_state.messages.append(last_message)
-                
-                # Then process tool message if exists
-                for msg in result["messages"]:
-                    if isinstance(msg, ToolMessage) and msg.name == "cypher_qa":
-                        try:
-                            tool_content = json.loads(msg.content)
-
-                            # Debug
-                            # print(f"tool_content: {tool_content}")
-
-                            if "intermediate_steps" in tool_content:
-                                # Get the actual executed query
-                                cypher_query = tool_content["intermediate_steps"][0]["query"].replace("cypher\n", "")
-                                with st.expander("View Cypher Query"):
-                                    st.code(cypher_query, language="cypher")
-
-                                # Process visualization if context exists
-                                if len(tool_content["intermediate_steps"]) > 1:
-
-                                    # print(f"\nsteps: {len(tool_content["intermediate_steps"])}")
-
-                                    cypher_result = tool_content["intermediate_steps"][1].get("context")
-                                    if cypher_result:
-                                        visualization_html = visualize_neo4j_results_v2(
-                                            {"cypher_result": cypher_result, "generated_cypher": cypher_query}
-                                        )
-                                        if visualization_html:
-                                            st.markdown("### Graph Visualization")
-                                            # Fixed the components.html reference
-                                            st.components.v1.html(
-                                                visualization_html, 
-                                                height=650, 
-                                                width=650,
-                                                scrolling=True
-                                            )
-                        except json.JSONDecodeError as e:
-                            print(f"Failed to parse tool message: {e}")
-                            st.error("Failed to parse tool message")
-
-                
+
+                if cached:
+                    st.caption(f"Answered from cache (similar question: \"{cached['question']}\", score {cached['score']:.2f})")
+                    tool_contents = [cached["tool_content"]] if cached.get("tool_content") else []
+                else:
+                    # Then process tool messages of this turn if any
+                    tool_contents = [
+                        tool_output(msg) for msg in new_messages
+                        if isinstance(msg, ToolMessage) and msg.name == "cypher_qa"
+                    ]
+                # Stored with the answer, so they are shown with it in the history too
+                answer_id = last_message.id if isinstance(last_message, AIMessage) else str(uuid.uuid4())
+                entries = store_artifacts(tool_contents)
+                if entries:
+                    st.session_state.artifacts[answer_id] = entries
+                for i, entry in enumerate(entries):
+                    render_artifact(entry, key=f"graph-{answer_id}-{i}")
 
             except Exception as e:
                 st.error(f"An error occurred: {str(e)}")
                 print(f"Full error: {e}")
+        if profile.path:
+            st.caption(f"Profile ({profile.duration:.2f}s): {profile.path}")
 
 def main():
     # Initialize username in session state if not present
@@ -102,9 +269,12 @@ def main():
             st.warning("Could not get system username. Using default.")
             st.session_state.username = "default_user"
 
-    # Initialize agent workflow and chat configuration with username
+    # Warm the driver, schema and quick-question answers in the background (once per process)
+    start_warmup()
+
+    # Agent workflow shared by all sessions of the process; the chat configuration is per session
     if "agent_workflow" not in st.session_state:
-        st.session_state.agent_workflow = create_agent()
+        st.session_state.agent_workflow = get_agent()
         st.session_state.chat_config = get_chat_config()
 
     # Initialize messages for display
@@ -113,6 +283,12 @@ def main():
             AIMessage(content="Hello, how can I help you today?")
         ]
     
+    # Artifact entries of the cypher_qa outputs by answer message id (see store_artifacts)
+    if "artifacts" not in st.session_state:
+        st.session_state.artifacts = {}
+        st.session_state.loaded_graphs = set()
+        st.session_state.history_size = HISTORY_PAGE_SIZE
+    
     if "selected_question" not in st.session_state:
         st.session_state.selected_question = None
 
@@ -183,49 +359,37 @@ def main():
         st.header("Options")
         if st.button("Clear Conversation", type="secondary", use_container_width=True):
             st.session_state.messages = []
+            st.session_state.artifacts = {}
+            st.session_state.loaded_graphs = set()
+            st.session_state.history_size = HISTORY_PAGE_SIZE
             st.session_state.chat_config = get_chat_config()  # Generate new config
             st.rerun()
         
         st.header("Quick Questions")
-        questions = [
-            "What is money laudering and what is the impact?",
-            "What is the latest news or press release from OFAC in 2025?",
-            "Can you search for latest trends in AML compliance in 2025?",
-            "Can you search the OFAC for all sanction program name",
-            "Find all information about one person that goes by name Ayman",
-            "Find persons who has alias more than 10",
-            "Do we have information about one person that goes by name  RAMON MAGANA, Alcides? And, can you search internet for the latest news or article about him",
-            "Find people sanctioned in 'SDGT' programs",
-            "How to cook chicken?",
-            "MATCH (n) DELETE n"
-        ]
         
-        for question in questions:
+        for question in get_quick_questions():
             if st.button(question, use_container_width=True):
                 st.session_state.selected_question = question
                 st.rerun()
 
+        render_warmup_status()
+
+        st.session_state.profile_turns = st.checkbox(
+            "Profile turns", value=profiling_enabled(),
+            help="Write a speedscope profile of each turn to the profiles directory"
+        )
+
+        show_metrics = os.getenv("METRICS_DEBUG_PANEL", "false").strip().lower() in ("1", "true", "yes", "on")
+        if st.checkbox("Show metrics", value=show_metrics):
+            st.header("Metrics")
+            render_metrics_panel()
+
     # Chat container for history
     chat_container = st.container()
 
     # Display existing chat history
     with chat_container:
-        for message in st.session_state.messages:
-            if isinstance(message, HumanMessage):
-                with st.chat_message("user"):
-                    st.markdown(message.content)
-            elif isinstance(message, AIMessage):
-                with st.chat_message("assistant"):
-                    st.markdown(message.content)
-                    
-                    # If there's a stored cypher query for this message
-                    if hasattr(message, 'cypher_query'):
-                        with st.expander("View Cypher Query"):
-                            st.code(message.cypher_query, language="cypher")
-                            
-            elif isinstance(message, ToolMessage):
-                with st.chat_message("assistant"):
-                    st.markdown(f"🔧 Tool ({message.name}): {message.content}")
+        render_history()
 
     # Handle quick question selection
     if st.session_state.selected_question:
@@ -0,0 +1 @@
+# Offline benchmarks (see README)
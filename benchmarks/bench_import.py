@@ -0,0 +1,114 @@
+# benchmarks/bench_import.py
+
+"""
+Cold-start import benchmark.
+
+Imports each module in a fresh interpreter (python -X importtime), several times, and
+reports the median wall time and peak RSS of the import, the heaviest packages it pulled
+in and which of the lazily loaded modules (visualization, vector index and
+LangChain community stacks) were imported anyway. Nothing is connected or built: the
+app and the server create their agent, LLM clients and Neo4j driver on first use.
+
+Usage:
+    python -m benchmarks.bench_import                     # app, server and the agent modules
+    python -m benchmarks.bench_import --modules app --runs 10 --top 15
+    python -m benchmarks.bench_import --max-ms 1500       # exit 1 if a module is slower
+
+Exits with status 1 when a lazily loaded module is imported eagerly, or a module takes
+longer than --max-ms.
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+from typing import Any, Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_MODULES = ("app", "server", "agents.turn", "agents.chat_agent", "agents.utils.visualization")
+
+# Loaded on first use only; importing one of the modules above must not pull these in
+LAZY_MODULES = ("py2neo", "IPython", "networkx", "pyvis", "faiss", "langchain_community", "tavily")
+
+CHILD = """
+import json, resource, sys, time
+started = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started
+print(json.dumps({{
+    "ms": elapsed * 1000,
+    "rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    "loaded": sorted(name for name in {lazy!r} if name in sys.modules),
+}}))
+"""
+
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def import_once(module: str) -> Dict[str, Any]:
+    """Import a module in a new interpreter; returns its timings and the loaded lazy modules"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", CHILD.format(module=module, lazy=LAZY_MODULES)],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "import failed")
+    stats = json.loads(result.stdout.strip().splitlines()[-1])
+    # Cumulative microseconds of the top-level packages (the least indented importtime lines)
+    packages: Dict[str, int] = {}
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match and len(match.group(3)) == 1:
+            name = match.group(4).split(".")[0]
+            packages[name] = packages.get(name, 0) + int(match.group(2))
+    stats["packages"] = packages
+    return stats
+
+
+def bench_module(module: str, runs: int) -> Dict[str, Any]:
+    samples = [import_once(module) for _ in range(runs)]
+    return {
+        "ms": statistics.median(sample["ms"] for sample in samples),
+        "rss_mb": statistics.median(sample["rss_kb"] for sample in samples) / 1024,
+        "loaded": samples[-1]["loaded"],
+        "packages": samples[-1]["packages"],
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modules", default=",".join(DEFAULT_MODULES), help="Comma-separated modules to import")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per module")
+    parser.add_argument("--top", type=int, default=10, help="Heaviest packages shown per module")
+    parser.add_argument("--max-ms", type=float, default=None, help="Fail when a median import is slower")
+    args = parser.parse_args()
+
+    failures: List[str] = []
+    for module in [name.strip() for name in args.modules.split(",") if name.strip()]:
+        try:
+            result = bench_module(module, args.runs)
+        except RuntimeError as e:
+            print(f"\n{module}: could not be imported ({e})")
+            failures.append(f"{module} failed to import")
+            continue
+        print(f"\n{module}: {result['ms']:.0f} ms, peak RSS {result['rss_mb']:.0f} MB (median of {args.runs})")
+        heaviest = sorted(result["packages"].items(), key=lambda item: item[1], reverse=True)[:args.top]
+        for name, microseconds in heaviest:
+            print(f"  {name:<32} {microseconds / 1000:>9.1f} ms")
+        if result["loaded"]:
+            print(f"  eagerly imported: {', '.join(result['loaded'])}")
+            failures.append(f"{module} imports {', '.join(result['loaded'])}")
+        if args.max_ms is not None and result["ms"] > args.max_ms:
+            failures.append(f"{module} took {result['ms']:.0f} ms (max {args.max_ms:.0f} ms)")
+
+    for failure in failures:
+        print(f"FAIL {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,217 @@
+# benchmarks/bench_turn.py
+
+"""
+End-to-end latency benchmark of a chat turn, offline.
+
+Runs the same path as process_message in app.py (agents.turn.run_turn, then the graph
+visualization of each cypher_qa result) over the sidebar quick questions, with the
+scripted models of devtools.fake_llm, devtools.synthetic_graph in place of Neo4j and
+devtools.fake_tavily_server in place of Tavily. Every stage reported by
+agents.utils.timing.stage is collected: agent and final LLM steps, Cypher generation,
+query execution, the QA step, web search, visualization, history writes and the whole
+turn. Results are compared against a stored baseline so regressions show up.
+
+Usage:
+    python -m benchmarks.bench_turn                       # 1k, 10k and 100k persons
+    python -m benchmarks.bench_turn --sizes 1000 --iterations 5 --memory
+    python -m benchmarks.bench_turn --update-baseline     # store the results as the new baseline
+
+Exits with status 1 when a stage's p95 is slower than the baseline by more than the
+tolerance (and by more than --min-delta-ms).
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import uuid
+from typing import Any, Dict, List
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+
+def configure_environment(workdir: str) -> None:
+    """Point every store at a scratch directory and switch off the caches that would hide the work"""
+    os.environ["CHECKPOINT_DB"] = os.path.join(workdir, "checkpoints.sqlite")
+    os.environ["CHAT_HISTORY_DB"] = f"sqlite:///{os.path.join(workdir, 'chat_history.db')}"
+    os.environ["SEMANTIC_CACHE"] = "false"
+    os.environ["QUICK_ANSWERS_FILE"] = os.path.join(workdir, "quick_answers.json")
+    os.environ["ARTIFACT_DIR"] = os.path.join(workdir, "artifacts")
+    os.environ["WEB_SEARCH_CACHE_TTL"] = "0"
+    os.environ["CASSETTE_MODE"] = "off"
+    os.environ.setdefault("TAVILY_API_KEY", "tvly-benchmark")
+
+
+class StageRecorder:
+    """Stage listener keeping every sample, by stage name"""
+
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = {}
+        self.allocations: Dict[str, List[int]] = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, name: str, elapsed: float, allocated, error: bool) -> None:
+        with self._lock:
+            self.samples.setdefault(name, []).append(elapsed)
+            if allocated is not None:
+                self.allocations.setdefault(name, []).append(allocated)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        from agents.utils.timing import percentile
+
+        with self._lock:
+            samples = {name: list(values) for name, values in self.samples.items()}
+            allocations = {name: list(values) for name, values in self.allocations.items()}
+        result = {}
+        for name, values in sorted(samples.items()):
+            stats = {
+                "count": len(values),
+                "p50_ms": round(percentile(values, 50) * 1000, 3),
+                "p95_ms": round(percentile(values, 95) * 1000, 3),
+                "p99_ms": round(percentile(values, 99) * 1000, 3),
+            }
+            if allocations.get(name):
+                stats["alloc_kb"] = round(sum(allocations[name]) / len(allocations[name]) / 1024, 1)
+            result[name] = stats
+        return result
+
+
+def run_size(agent: Any, persons: int, iterations: int, warmup: int, recorder: StageRecorder,
+             verbose: bool) -> None:
+    from langchain_core.messages import HumanMessage, ToolMessage
+    from agents.chat_agent import get_chat_config
+    from agents.chat_history import get_history_writer
+    from agents.quick_questions import QUICK_QUESTIONS
+    from agents.turn import build_visualization, run_turn, tool_output
+    from agents.utils.timing import add_stage_listener, remove_stage_listener, stage
+    from devtools.synthetic_graph import SyntheticGraph
+    from tools.graph_store import set_graph
+    from tools.schema_catalog import get_schema_catalog
+
+    graph = SyntheticGraph(persons)
+    set_graph(graph)
+    get_schema_catalog(graph, refresh=True)
+
+    def process_message(config: Dict[str, Any], prompt: str) -> None:
+        with stage("process_message"):
+            turn = run_turn(agent, config, HumanMessage(content=prompt, id=str(uuid.uuid4())))
+            for message in turn["messages"]:
+                if isinstance(message, ToolMessage) and message.name == "cypher_qa":
+                    try:
+                        build_visualization(tool_output(message))
+                    except json.JSONDecodeError:
+                        pass
+
+    with contextlib.ExitStack() as stack:
+        if not verbose:
+            stack.enter_context(contextlib.redirect_stdout(stack.enter_context(open(os.devnull, "w"))))
+        for iteration in range(warmup + iterations):
+            if iteration == warmup:
+                add_stage_listener(recorder)
+            # One conversation per iteration, as a user clicking through the quick questions
+            config = get_chat_config(username="bench", session_id=f"{persons}-{iteration}")
+            for question in QUICK_QUESTIONS:
+                process_message(config, question)
+        # History writes happen on the writer thread; record the queued ones too
+        get_history_writer().flush()
+    remove_stage_listener(recorder)
+
+
+def print_report(persons: int, summary: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]]) -> None:
+    print(f"\n=== {persons:,} persons ===")
+    print(f"{'stage':<20}{'n':>6}{'p50 ms':>11}{'p95 ms':>11}{'p99 ms':>11}{'alloc KB':>11}{'base p95':>11}")
+    for name, stats in summary.items():
+        base = baseline.get(name, {}).get("p95_ms")
+        print(
+            f"{name:<20}{stats['count']:>6}{stats['p50_ms']:>11.2f}{stats['p95_ms']:>11.2f}{stats['p99_ms']:>11.2f}"
+            f"{stats.get('alloc_kb', float('nan')):>11.1f}{base if base is not None else float('nan'):>11.2f}"
+        )
+
+
+def find_regressions(results: Dict[str, Dict[str, Dict[str, float]]], baseline: Dict[str, Any],
+                     tolerance: float, min_delta_ms: float) -> List[str]:
+    regressions = []
+    for size, stages in results.items():
+        for name, stats in stages.items():
+            base = baseline.get("results", {}).get(size, {}).get(name)
+            if not base:
+                continue
+            delta = stats["p95_ms"] - base["p95_ms"]
+            if delta > min_delta_ms and stats["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+                regressions.append(
+                    f"{size} persons, {name}: p95 {stats['p95_ms']:.2f} ms vs baseline {base['p95_ms']:.2f} ms"
+                )
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Offline end-to-end latency benchmark of a chat turn")
+    parser.add_argument("--sizes", default="1000,10000,100000", help="Comma separated numbers of persons")
+    parser.add_argument("--iterations", type=int, default=3, help="Conversations (quick question sets) per size")
+    parser.add_argument("--warmup", type=int, default=1, help="Conversations run before measuring")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="Median seconds per fake LLM call")
+    parser.add_argument("--search-latency", type=float, default=0.0, help="Seconds per fake Tavily call")
+    parser.add_argument("--direct", action="store_true", help="cypher_qa returns rows directly (no QA step)")
+    parser.add_argument("--memory", action="store_true", help="Trace allocations per stage (slower)")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative p95 slowdown")
+    parser.add_argument("--min-delta-ms", type=float, default=2.0, help="Ignore slowdowns smaller than this")
+    parser.add_argument("--verbose", action="store_true", help="Show the application's log output")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench_turn_")
+    configure_environment(workdir)
+
+    from devtools.fake_tavily_server import start_server
+    search_server = start_server(latency=args.search_latency)
+    os.environ["TAVILY_API_URL"] = search_server.url
+
+    from agents.chat_agent import create_agent
+    from devtools.fake_llm import FakeModelRouter
+
+    router = FakeModelRouter(latency=args.llm_latency)
+    agent = create_agent(direct_cypher_results=args.direct, router=router)
+
+    if args.memory:
+        tracemalloc.start()
+
+    baseline: Dict[str, Any] = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    settings = {"iterations": args.iterations, "llm_latency": args.llm_latency,
+                "search_latency": args.search_latency, "direct": args.direct}
+    if baseline and baseline.get("settings") != settings:
+        print(f"Warning: baseline settings {baseline.get('settings')} differ from {settings}")
+
+    results: Dict[str, Dict[str, Dict[str, float]]] = {}
+    started = time.perf_counter()
+    for persons in [int(size) for size in args.sizes.split(",") if size.strip()]:
+        recorder = StageRecorder()
+        run_size(agent, persons, args.iterations, args.warmup, recorder, args.verbose)
+        results[str(persons)] = recorder.summary()
+        print_report(persons, results[str(persons)], baseline.get("results", {}).get(str(persons), {}))
+    print(f"\nTotal {time.perf_counter() - started:.1f}s")
+
+    search_server.shutdown()
+    if args.update_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({"settings": settings, "results": results}, f, indent=2)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    regressions = find_regressions(results, baseline, args.tolerance, args.min_delta_ms) if baseline else []
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,195 @@
+# benchmarks/load_test.py
+
+"""
+Concurrent-session load test of the compiled agent graph, offline.
+
+Runs N simulated analysts at once against one agent from create_agent (as the API server
+and the Streamlit app share it), each in its own thread with its own thread id, asking
+quick questions with an exponentially distributed think time in between. Models are
+devtools.fake_llm with lognormal latencies, the graph is devtools.synthetic_graph with
+a modelled driver pool, and web search goes to devtools.fake_tavily_server; the
+checkpointer and chat history are the real SQLite stores.
+
+For each concurrency level it reports throughput, turn latency percentiles, error rates
+and lock waits: waits for a pooled checkpoint connection, checkpoint write time (SQLite
+busy waits show up there), "database is locked" errors, Neo4j pool waits and pool
+exhaustion errors.
+
+Usage:
+    python -m benchmarks.load_test --concurrency 1,8,32,64 --turns 5 --think-time 2
+    python -m benchmarks.load_test --concurrency 64 --pool-size 10 --checkpoint-pool-size 2
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import Counter
+from typing import Any, Dict, List
+
+from benchmarks.bench_turn import StageRecorder, configure_environment
+
+LOCK_STAGES = ("checkpoint_pool_wait", "checkpoint_write", "neo4j_pool_wait", "history_write")
+
+
+def classify_error(message: str) -> str:
+    text = message.lower()
+    if "database is locked" in text or "database is busy" in text:
+        return "sqlite_busy"
+    if "connection from the pool" in text:
+        return "neo4j_pool_exhausted"
+    if "deadline" in text or "timed out" in text:
+        return "timeout"
+    return "other"
+
+
+def run_session(agent: Any, session: str, turns: int, think_time: float, seed: int,
+                latencies: List[float], errors: Counter, lock: threading.Lock) -> None:
+    from langchain_core.messages import HumanMessage, ToolMessage
+    from agents.chat_agent import get_chat_config
+    from agents.quick_questions import QUICK_QUESTIONS
+    from agents.turn import run_turn
+
+    rng = random.Random(seed)
+    config = get_chat_config(username="load", session_id=session)
+    for _ in range(turns):
+        if think_time > 0:
+            time.sleep(rng.expovariate(1 / think_time))
+        question = rng.choice(QUICK_QUESTIONS)
+        started = time.perf_counter()
+        try:
+            turn = run_turn(agent, config, HumanMessage(content=question, id=str(uuid.uuid4())))
+            # Tools report failures in their output instead of raising
+            tool_errors = [
+                classify_error(str(m.content)) for m in turn["messages"]
+                if isinstance(m, ToolMessage) and str(m.content).startswith(("Error", "{\"error\""))
+            ]
+            with lock:
+                latencies.append(time.perf_counter() - started)
+                errors.update(f"tool_{kind}" for kind in tool_errors)
+        except Exception as e:
+            with lock:
+                errors[classify_error(str(e))] += 1
+
+
+def run_level(agent: Any, concurrency: int, args: argparse.Namespace) -> Dict[str, Any]:
+    from agents.utils.timing import add_stage_listener, percentile, remove_stage_listener
+
+    recorder = StageRecorder()
+    latencies: List[float] = []
+    errors: Counter = Counter()
+    lock = threading.Lock()
+    threads = [
+        threading.Thread(
+            target=run_session,
+            args=(agent, f"c{concurrency}-s{i}-{uuid.uuid4().hex[:6]}", args.turns, args.think_time,
+                  args.seed + i, latencies, errors, lock),
+            name=f"load-session-{i}",
+        )
+        for i in range(concurrency)
+    ]
+
+    add_stage_listener(recorder)
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    remove_stage_listener(recorder)
+
+    attempted = concurrency * args.turns
+    stages = recorder.summary()
+    return {
+        "concurrency": concurrency,
+        "turns": attempted,
+        "completed": len(latencies),
+        "elapsed_s": round(elapsed, 2),
+        "throughput_tps": round(len(latencies) / elapsed, 3) if elapsed else 0.0,
+        "p50_s": round(percentile(latencies, 50), 3),
+        "p95_s": round(percentile(latencies, 95), 3),
+        "p99_s": round(percentile(latencies, 99), 3),
+        "error_rate": round((attempted - len(latencies)) / attempted, 4) if attempted else 0.0,
+        "errors": dict(errors),
+        "locks": {name: stages[name] for name in LOCK_STAGES if name in stages},
+    }
+
+
+def print_level(result: Dict[str, Any]) -> None:
+    print(
+        f"{result['concurrency']:>6}{result['completed']:>6}/{result['turns']:<6}{result['throughput_tps']:>9.2f}"
+        f"{result['p50_s']:>9.2f}{result['p95_s']:>9.2f}{result['p99_s']:>9.2f}{result['error_rate'] * 100:>8.1f}%"
+        + "".join(f"{result['locks'].get(name, {}).get('p95_ms', 0.0):>12.1f}" for name in LOCK_STAGES)
+    )
+    if result["errors"]:
+        print(f"{'':>6}errors: {result['errors']}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Concurrent-session load test of the agent graph")
+    parser.add_argument("--concurrency", default="1,4,16,32", help="Comma separated numbers of concurrent sessions")
+    parser.add_argument("--turns", type=int, default=5, help="Questions per session")
+    parser.add_argument("--think-time", type=float, default=2.0, help="Mean seconds between questions")
+    parser.add_argument("--llm-latency", type=float, default=0.8, help="Median seconds per LLM call")
+    parser.add_argument("--llm-sigma", type=float, default=0.5, help="Sigma of the lognormal LLM latency")
+    parser.add_argument("--search-latency", type=float, default=0.6, help="Seconds per Tavily call")
+    parser.add_argument("--query-latency", type=float, default=0.02, help="Seconds per Neo4j query")
+    parser.add_argument("--persons", type=int, default=10000, help="Size of the synthetic graph")
+    parser.add_argument("--pool-size", type=int, default=100, help="Neo4j driver pool size (driver default 100)")
+    parser.add_argument("--acquisition-timeout", type=float, default=60.0, help="Seconds to wait for a Neo4j connection")
+    parser.add_argument("--checkpoint-pool-size", type=int, default=None, help="Overrides CHECKPOINT_POOL_SIZE")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    parser.add_argument("--verbose", action="store_true", help="Show the application's log output")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="load_test_")
+    configure_environment(workdir)
+    if args.checkpoint_pool_size:
+        os.environ["CHECKPOINT_POOL_SIZE"] = str(args.checkpoint_pool_size)
+
+    from devtools.fake_tavily_server import start_server
+    search_server = start_server(latency=args.search_latency)
+    os.environ["TAVILY_API_URL"] = search_server.url
+
+    from agents.chat_agent import create_agent
+    from devtools.fake_llm import FakeModelRouter
+    from devtools.synthetic_graph import SyntheticGraph
+    from tools.graph_store import set_graph
+    from tools.schema_catalog import get_schema_catalog
+
+    graph = SyntheticGraph(args.persons, query_latency=args.query_latency, pool_size=args.pool_size,
+                           acquisition_timeout=args.acquisition_timeout)
+    set_graph(graph)
+    get_schema_catalog(graph, refresh=True)
+    agent = create_agent(router=FakeModelRouter(latency=args.llm_latency, latency_sigma=args.llm_sigma, seed=args.seed))
+
+    print(
+        f"{'users':>6}{'done':>13}{'turns/s':>9}{'p50 s':>9}{'p95 s':>9}{'p99 s':>9}{'errors':>9}"
+        + "".join(f"{name[:11]:>12}" for name in LOCK_STAGES)
+    )
+    print(f"{'':>57}" + "p95 ms".rjust(12) * len(LOCK_STAGES))
+    results = []
+    for concurrency in [int(level) for level in args.concurrency.split(",") if level.strip()]:
+        with contextlib.ExitStack() as stack:
+            if not args.verbose:
+                stack.enter_context(contextlib.redirect_stdout(stack.enter_context(open(os.devnull, "w"))))
+            result = run_level(agent, concurrency, args)
+        results.append(result)
+        print_level(result)
+
+    search_server.shutdown()
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"settings": vars(args), "results": results}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,156 @@
+# components/graph_explorer/__init__.py
+
+"""
+Streamlit custom component keeping a vis-network graph on the client.
+
+The first render sends the whole graph; after that every render sends only the nodes
+and edges added since the previous one. Double-clicking a node asks the server for its
+neighbours (the `expand` callback, e.g. a bounded, parameterized one-hop Cypher query)
+and only the new nodes and edges travel back, so an interaction costs kilobytes rather
+than a new HTML page.
+
+Messages to the frontend (component args):
+    {"reset": true, "seq": n, "nodes": [...], "edges": [...], "options": {...}, "clusters": [...]}
+    {"reset": false, "base": n - 1, "seq": n, "nodes": [...], "edges": [...], "anchor": node id}
+    {"op": "noop", "seq": n}
+Every message is sent once; later reruns send only the noop with the current seq, so an
+unchanged explorer costs a few bytes per rerun. The frontend applies a delta only on top
+of `base`; when it has lost its graph (e.g. the iframe was remounted) or gets a noop for a
+seq it does not have, it asks for a reset. Events from the frontend (component value):
+    {"type": "expand", "node": node id, "nonce": ...} and {"type": "resync", "nonce": ...}
+
+Usage:
+    graph_explorer(key="explorer-1", load=lambda: {"nodes": ..., "edges": ...},
+                   expand=lambda node_id: (nodes, edges))
+"""
+
+import os
+import shutil
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import streamlit as st
+import streamlit.components.v1 as components
+
+from agents.utils.graph_html import NETWORK_OPTIONS, find_vis_assets
+
+FRONTEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "frontend")
+
+_component = components.declare_component("graph_explorer", path=FRONTEND_DIR)
+_assets_lock = threading.Lock()
+_assets_ready = False
+
+Elements = Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]
+
+
+def explorer_enabled() -> bool:
+    """Whether answers use the graph explorer instead of a static HTML graph (env: GRAPH_EXPLORER)"""
+    return os.getenv("GRAPH_EXPLORER", "true").strip().lower() in ("1", "true", "yes", "on")
+
+
+def ensure_assets() -> None:
+    """Copy the local vis-network files next to the frontend once (it falls back to the CDN without them)"""
+    global _assets_ready
+    with _assets_lock:
+        if _assets_ready:
+            return
+        _assets_ready = True
+        assets = find_vis_assets()
+        if assets is None:
+            return
+        vendor_dir = os.path.join(FRONTEND_DIR, "vendor")
+        try:
+            os.makedirs(vendor_dir, exist_ok=True)
+            for source, name in zip(assets, ("vis-network.min.js", "vis-network.css")):
+                target = os.path.join(vendor_dir, name)
+                if not os.path.exists(target) or os.path.getsize(target) != os.path.getsize(source):
+                    temporary = f"{target}.{os.getpid()}.tmp"
+                    shutil.copyfile(source, temporary)
+                    os.replace(temporary, target)
+        except OSError as e:
+            print(f"Could not copy vis-network for the graph explorer: {e}")
+
+
+class ExplorerState:
+    """Server-side copy of the client graph and the message of the latest render"""
+
+    def __init__(self, view: Dict[str, Any]):
+        self.nodes: Dict[Any, Dict[str, Any]] = {node["id"]: node for node in view["nodes"]}
+        self.edges: Dict[Any, Dict[str, Any]] = {self.edge_id(edge): edge for edge in view["edges"]}
+        self.options = view.get("options") or NETWORK_OPTIONS
+        self.clusters = view.get("clusters") or []
+        self.seq = 1
+        self.handled_nonce = None
+        self.message = self.reset_message()
+
+    @staticmethod
+    def edge_id(edge: Dict[str, Any]) -> Any:
+        return edge.get("id") or f"{edge['from']}-{edge.get('label', '')}-{edge['to']}"
+
+    def reset_message(self) -> Dict[str, Any]:
+        return {
+            "reset": True,
+            "seq": self.seq,
+            "nodes": list(self.nodes.values()),
+            "edges": [{**edge, "id": edge_id} for edge_id, edge in self.edges.items()],
+            "options": self.options,
+            "clusters": self.clusters,
+        }
+
+    def add(self, nodes: List[Dict[str, Any]], edges: List[Dict[str, Any]], anchor: Any) -> None:
+        """Record the new elements and make them the next delta"""
+        new_nodes = [node for node in nodes if node["id"] not in self.nodes]
+        new_edges = []
+        for edge in edges:
+            edge_id = self.edge_id(edge)
+            if edge_id not in self.edges:
+                self.edges[edge_id] = edge
+                new_edges.append({**edge, "id": edge_id})
+        self.nodes.update((node["id"], node) for node in new_nodes)
+        self.message = {
+            "reset": False,
+            "base": self.seq,
+            "seq": self.seq + 1,
+            "nodes": new_nodes,
+            "edges": new_edges,
+            "anchor": anchor,
+        }
+        self.seq += 1
+
+
+def graph_explorer(key: str, load: Callable[[], Dict[str, Any]],
+                   expand: Optional[Callable[[Any], Elements]] = None, height: int = 600) -> None:
+    """
+    Render an explorer whose graph persists on the client across reruns.
+
+    Args:
+        key: Unique, stable key of this explorer (e.g. derived from the message id)
+        load: Returns the initial view: "nodes" and "edges" (vis-network objects) and
+            optionally "options" and "clusters" (see agents/utils/graph_layout.py); called
+            only for the first render of the key
+        expand: Returns the (nodes, edges) around a double-clicked node; None disables
+            expansion
+        height: Height of the graph in pixels
+    """
+    ensure_assets()
+    state_key = f"_graph_explorer_{key}"
+    state: Optional[ExplorerState] = st.session_state.get(state_key)
+    if state is None:
+        state = st.session_state[state_key] = ExplorerState(load())
+
+    # The latest event of the frontend, handled once
+    event = st.session_state.get(key)
+    if isinstance(event, dict) and event.get("nonce") != state.handled_nonce:
+        state.handled_nonce = event.get("nonce")
+        if event.get("type") == "resync":
+            state.message = state.reset_message()
+        elif event.get("type") == "expand" and expand is not None:
+            try:
+                nodes, edges = expand(event["node"])
+                state.add(nodes, edges, event["node"])
+            except Exception as e:
+                print(f"Could not expand node {event.get('node')}: {e}")
+                st.caption(f"Could not expand the node: {e}")
+
+    message, state.message = state.message, {"op": "noop", "seq": state.seq}
+    _component(message=message, height=height, expandable=expand is not None, key=key, default=None)
@@ -0,0 +1 @@
+# Local stand-ins (search server, LLM, graph) for offline tests and benchmarks
@@ -0,0 +1,170 @@
+# devtools/fake_llm.py
+
+"""
+Scripted stand-in for the OpenAI chat models, for offline benchmarks.
+
+FakeChatModel recognizes which step of the workflow is calling it from the request (tool
+routing when tools are bound, Cypher generation, the cypher_qa QA step, the memory
+summary) and answers the way gpt-4o typically does for the sidebar quick questions: it
+calls cypher_qa and/or web_search, writes Cypher that devtools.synthetic_graph can run,
+and writes an answer of realistic length from the tool results. Each call waits a fixed
+or lognormally distributed latency and reports estimated token usage.
+"""
+
+import json
+import math
+import random
+import re
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from pydantic import PrivateAttr
+from agents.model_router import ModelRouter
+
+DATABASE_WORDS = re.compile(r"\b(person|persons|people|alias|aliases|sanctioned|program|programs|goes by name|information about)\b", re.IGNORECASE)
+WEB_WORDS = re.compile(r"\b(search internet|news|press release|trends?|article|money laundering|money laudering|impact)\b", re.IGNORECASE)
+OFF_TOPIC_ANSWER = "I am specialized in AML and sanctions data queries only, so I cannot help with that question."
+
+
+def generate_cypher(question: str) -> str:
+    """Cypher for a quick question, in the style of the generation prompt examples"""
+    if re.search(r"\b(DELETE|DETACH|CREATE|MERGE|SET|REMOVE|DROP)\b", question):
+        return question.strip()
+    match = re.search(r"alias(?:es)? more than (\d+)", question, re.IGNORECASE)
+    if match:
+        return (
+            "MATCH (p:Person)-[r:HAS_ALIAS]->(a:Alias)\n"
+            "WITH p, count(a) AS numAliases\n"
+            f"WHERE numAliases > {match.group(1)}\n"
+            "MATCH (p)-[r:HAS_ALIAS]->(a:Alias)\n"
+            "RETURN p,r,a"
+        )
+    programs = re.findall(r"'([^']+)'", question)
+    if programs and re.search(r"program|sanction", question, re.IGNORECASE):
+        names = ", ".join(f"'{p}'" for p in programs)
+        return (
+            "MATCH (p:Person)-[s:SANCTIONED_BY]->(prog:Program)\n"
+            f"WHERE prog.name IN [{names}]\n"
+            "RETURN p,s,prog"
+        )
+    if re.search(r"program name", question, re.IGNORECASE):
+        return "MATCH (prog:Program) RETURN DISTINCT prog"
+    match = re.search(r"by name\s+(.+?)(?:\?|$)", question, re.IGNORECASE)
+    if match:
+        name = match.group(1).strip()
+        return (
+            "MATCH (n)-[r]-(p:Person) \n"
+            f"WHERE tolower(p.fullName) contains tolower(\"{name}\") \n"
+            "RETURN n, r, p"
+        )
+    return "MATCH (p:Person) RETURN p LIMIT 10"
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // 4 + 1
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Chat model answering the quick questions without network.
+
+    Args:
+        latency: Median seconds per call
+        latency_sigma: Sigma of the lognormal latency distribution (0 = always `latency`)
+        seed: Seed of the latency generator
+    """
+
+    latency: float = 0.0
+    latency_sigma: float = 0.0
+    seed: Optional[int] = None
+    _random: Any = PrivateAttr(default=None)
+    _lock: Any = PrivateAttr(default=None)
+
+    def __init__(self, **kwargs: Any):
+        super().__init__(**kwargs)
+        self._random = random.Random(self.seed)
+        self._lock = threading.Lock()
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    def bind_tools(self, tools: List[Any], **kwargs: Any):
+        return self.bind(tools=[convert_to_openai_tool(tool) for tool in tools], **kwargs)
+
+    def sample_latency(self) -> float:
+        if self.latency <= 0:
+            return 0.0
+        if self.latency_sigma <= 0:
+            return self.latency
+        with self._lock:
+            return self._random.lognormvariate(math.log(self.latency), self.latency_sigma)
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        if kwargs.get("tools"):
+            message = self._agent_step(messages)
+        else:
+            message = AIMessage(content=self._completion(str(messages[-1].content)))
+
+        prompt_text = "".join(str(m.content) for m in messages)
+        output_text = str(message.content) + json.dumps(getattr(message, "tool_calls", []))
+        message.usage_metadata = {
+            "input_tokens": estimate_tokens(prompt_text),
+            "output_tokens": estimate_tokens(output_text),
+            "total_tokens": estimate_tokens(prompt_text) + estimate_tokens(output_text),
+        }
+        time.sleep(self.sample_latency())
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _agent_step(self, messages: List[BaseMessage]) -> AIMessage:
+        """Route the question to the tools, or answer from the tool results"""
+        last = messages[-1]
+        if isinstance(last, ToolMessage):
+            results = [m for m in messages[-4:] if isinstance(m, ToolMessage)]
+            summary = "\n".join(f"- {m.name}: {str(m.content)[:300]}" for m in results)
+            return AIMessage(content=(
+                f"Here is what I found:\n{summary}\n\n"
+                "Related questions you might be interested in:\n"
+                "- Which programs sanction these persons?\n"
+                "- What aliases do they use?\n"
+                "- Are there recent news articles about them?"
+            ))
+
+        question = str(last.content) if isinstance(last, HumanMessage) else ""
+        tool_calls = []
+        if DATABASE_WORDS.search(question) or re.search(r"\bMATCH\b", question):
+            tool_calls.append({"name": "cypher_qa", "args": {"query": question}, "id": f"call_{uuid.uuid4().hex[:24]}"})
+        if WEB_WORDS.search(question) or (not tool_calls and re.search(r"\bsearch\b", question, re.IGNORECASE)):
+            tool_calls.append({"name": "web_search", "args": {"query": question}, "id": f"call_{uuid.uuid4().hex[:24]}"})
+        if not tool_calls:
+            return AIMessage(content=OFF_TOPIC_ANSWER)
+        return AIMessage(content="", tool_calls=tool_calls)
+
+    def _completion(self, prompt: str) -> str:
+        """Cypher generation, the cypher_qa QA step or the memory summary"""
+        if "Generate Cypher statement" in prompt:
+            question = prompt.rsplit("Question:", 1)[-1].strip()
+            return f"```cypher\n{generate_cypher(question)}\n```"
+        if "Below are the results from a database query" in prompt:
+            context = prompt.split("Query Results:", 1)[-1].split("Question:", 1)[0].strip()
+            return f"The database returned the following records:\n{context[:800]}"
+        return "Summary: the analyst asked about sanctioned persons, their aliases and programs."
+
+
+class FakeModelRouter(ModelRouter):
+    """ModelRouter handing out FakeChatModel for every role"""
+
+    def __init__(self, latency: float = 0.0, latency_sigma: float = 0.0, seed: Optional[int] = None, **kwargs: Any):
+        super().__init__(**kwargs)
+        self.latency = latency
+        self.latency_sigma = latency_sigma
+        self.seed = seed
+
+    def _build(self, model: str, callbacks: Optional[list] = None) -> FakeChatModel:
+        return FakeChatModel(latency=self.latency, latency_sigma=self.latency_sigma, seed=self.seed, callbacks=callbacks)
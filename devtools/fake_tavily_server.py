@@ -0,0 +1,101 @@
+# devtools/fake_tavily_server.py
+
+"""
+Local stand-in for the Tavily search API.
+
+Answers POST /search with the captured response in tools/search_results.json (with the
+query echoed back) after an optional delay, and counts requests so cache and
+deduplication behaviour can be checked without using the Tavily quota.
+
+Usage:
+    python -m devtools.fake_tavily_server --port 8765 --latency 0.5
+    TAVILY_API_URL=http://localhost:8765 streamlit run app.py
+
+GET /stats returns {"requests": <number of /search calls>}.
+"""
+
+import argparse
+import copy
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Tuple
+
+SAMPLE_RESPONSE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tools", "search_results.json")
+
+
+class FakeTavilyServer(ThreadingHTTPServer):
+    """HTTP server holding the canned response, the delay and the request counter"""
+
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], latency: float = 0.0, response: Dict[str, Any] = None):
+        super().__init__(address, FakeTavilyHandler)
+        self.latency = latency
+        if response is None:
+            with open(SAMPLE_RESPONSE_PATH, "r", encoding="utf-8") as f:
+                response = json.load(f)
+        self.response = response
+        self.requests = 0
+        self.lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+class FakeTavilyHandler(BaseHTTPRequestHandler):
+
+    def _send_json(self, status: int, payload: Dict[str, Any]) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        if self.path.rstrip("/") != "/search":
+            self._send_json(404, {"detail": "not found"})
+            return
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        with self.server.lock:
+            self.server.requests += 1
+        time.sleep(self.server.latency)
+
+        response = copy.deepcopy(self.server.response)
+        response["query"] = request.get("query", response.get("query"))
+        response["results"] = response.get("results", [])[: request.get("max_results", 5)]
+        response["response_time"] = self.server.latency
+        self._send_json(200, response)
+
+    def do_GET(self):
+        if self.path.rstrip("/") == "/stats":
+            self._send_json(200, {"requests": self.server.requests})
+        else:
+            self._send_json(404, {"detail": "not found"})
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(port: int = 0, latency: float = 0.0) -> FakeTavilyServer:
+    """Start the server on a background thread (port 0 picks a free port); stop with shutdown()"""
+    server = FakeTavilyServer(("127.0.0.1", port), latency=latency)
+    threading.Thread(target=server.serve_forever, name="fake-tavily", daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local stand-in for the Tavily search API")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds to wait before answering")
+    args = parser.parse_args()
+
+    server = FakeTavilyServer(("127.0.0.1", args.port), latency=args.latency)
+    print(f"Fake Tavily server on {server.url} (set TAVILY_API_URL={server.url})")
+    server.serve_forever()
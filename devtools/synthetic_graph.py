@@ -0,0 +1,213 @@
+# devtools/synthetic_graph.py
+
+"""
+In-memory stand-in for the OFAC Neo4j graph, for offline benchmarks.
+
+SyntheticGraph generates a seeded graph with the labels, relationship types and property
+names of the real one (Person, Alias, Address, Program, Identitydocument) at any size,
+and answers the Cypher shapes that the generation prompt examples (and
+devtools.fake_llm) produce. Results have the same shape as Neo4jGraph.query: nodes as
+property dicts and relationships as (start, type, end) tuples; query_with_graph also
+returns the graph payload of tools/graph_result.py. Unsupported statements return no
+rows.
+
+For load tests it can also add a per-query latency and model the driver's connection
+pool: at most `pool_size` queries run at once, and a query that cannot get a connection
+within `acquisition_timeout` fails like the driver does.
+"""
+
+import random
+import re
+import threading
+import time
+from typing import Any, Dict, List, Optional
+from langchain_neo4j import Neo4jGraph
+from agents.utils.timing import stage
+from tools.cypher_params import inline_parameters
+from tools.graph_result import GraphCollector
+from tools.schema_catalog import SchemaCatalog
+
+FIRST_NAMES = ["Ayman", "Omar", "Ali", "Hassan", "Ivan", "Sergei", "Maria", "Carlos", "Jose", "Ahmed",
+               "Fatima", "Yusuf", "Dmitri", "Elena", "Juan", "Li", "Wei", "Kim", "Abdul", "Nadia"]
+LAST_NAMES = ["AL-ZAWAHIRI", "HASSAN", "PETROV", "GARCIA", "MAGANA", "KHAN", "IVANOV", "LOPEZ", "RAHMAN",
+              "CHEN", "PARK", "SALEH", "VOLKOV", "MORALES", "HADDAD", "NASSER", "ORTEGA", "KARIMI"]
+PROGRAMS = ["SDGT", "SYRIA", "IRAN", "RUSSIA-EO14024", "CUBA", "DPRK", "SDNTK", "GLOMAG", "CYBER2",
+            "VENEZUELA", "IRAQ2", "BALKANS", "BELARUS", "ILLICIT-DRUGS-EO14059", "YEMEN"]
+COUNTRIES = ["Afghanistan", "Syria", "Iran", "Russia", "Mexico", "Colombia", "Venezuela", "Cuba",
+             "North Korea", "Yemen", "Lebanon", "Iraq", "Pakistan", "Belarus", "China"]
+DOCUMENT_TYPES = ["Passport", "National ID No.", "Cedula No.", "Driver's License No."]
+
+NODE_PROPERTIES = {
+    "Person": ["id", "fullName", "firstName", "lastName", "entityType", "birthDate", "gender", "nationality"],
+    "Alias": ["id", "fullname", "firstName", "lastName"],
+    "Address": ["id", "country", "city"],
+    "Program": ["id", "name"],
+    "Identitydocument": ["id", "type", "documentnumber", "issuingCountry"],
+}
+RELATIONSHIPS = [
+    ("Person", "HAS_ALIAS", "Alias"),
+    ("Person", "HAS_ADDRESS", "Address"),
+    ("Person", "SANCTIONED_BY", "Program"),
+    ("Person", "HAS_DOCUMENT", "Identitydocument"),
+]
+RELATIONSHIP_LABELS = {rel: end for _, rel, end in RELATIONSHIPS}
+
+
+class SyntheticGraph(Neo4jGraph):
+    """
+    Seeded synthetic OFAC graph answering the generation prompt's Cypher shapes.
+
+    Args:
+        persons: Number of Person nodes; there are about 2.5 aliases, 1 address, 1.3
+            programs and 0.6 documents per person
+        seed: Random seed, the same seed gives the same graph
+        query_latency: Seconds added to every query (network and database time)
+        pool_size: Max concurrent queries, 0 for no limit
+        acquisition_timeout: Seconds a query waits for a pooled connection
+    """
+
+    def __init__(self, persons: int = 1000, seed: int = 7, query_latency: float = 0.0,
+                 pool_size: int = 0, acquisition_timeout: float = 60.0):
+        # Neo4jGraph.__init__ connects to a database, so it is not called
+        self.query_latency = query_latency
+        self.acquisition_timeout = acquisition_timeout
+        self._pool = threading.BoundedSemaphore(pool_size) if pool_size else None
+        self.persons: List[Dict[str, Any]] = []
+        self.neighbors: Dict[str, List[tuple]] = {}
+        self.programs = [{"id": f"program-{i}", "name": name} for i, name in enumerate(PROGRAMS)]
+        self.labels: Dict[str, str] = {program["id"]: "Program" for program in self.programs}
+        self._generate(persons, random.Random(seed))
+
+        structured_schema = {
+            "node_props": {label: [{"property": p, "type": "STRING"} for p in props] for label, props in NODE_PROPERTIES.items()},
+            "rel_props": {},
+            "relationships": [{"start": s, "type": t, "end": e} for s, t, e in RELATIONSHIPS],
+            "metadata": {"constraint": [], "index": []},
+        }
+        catalog = SchemaCatalog(structured_schema)
+        self.structured_schema = structured_schema
+        self.schema = catalog.render(set(NODE_PROPERTIES), set(NODE_PROPERTIES), {t for _, t, _ in RELATIONSHIPS})
+
+    def _generate(self, count: int, rng: random.Random) -> None:
+        relationship_count = sanction_count = 0
+        for i in range(count):
+            first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+            person = {
+                "id": str(10000 + i),
+                "fullName": f"{last}, {first}",
+                "firstName": first,
+                "lastName": last,
+                "entityType": "Individual",
+                "birthDate": f"{rng.randint(1940, 2000)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+                "gender": rng.choice(["Male", "Female"]),
+                "nationality": rng.choice(COUNTRIES),
+            }
+            # Names used by the quick questions
+            if i == 0:
+                person.update(fullName="RAMON MAGANA, Alcides", firstName="Alcides", lastName="RAMON MAGANA")
+            edges = []
+            alias_count = rng.randint(11, 15) if rng.random() < 0.02 else rng.randint(0, 4)
+            for a in range(alias_count):
+                alias_first, alias_last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+                edges.append(("HAS_ALIAS", {
+                    "id": f"{person['id']}-alias-{a}",
+                    "fullname": f"{alias_first} {alias_last}",
+                    "firstName": alias_first,
+                    "lastName": alias_last,
+                }))
+            edges.append(("HAS_ADDRESS", {"id": f"{person['id']}-address", "country": person["nationality"], "city": f"City {rng.randint(1, 500)}"}))
+            for program in rng.sample(self.programs, 2 if rng.random() < 0.3 else 1):
+                edges.append(("SANCTIONED_BY", program))
+                sanction_count += 1
+            if rng.random() < 0.6:
+                edges.append(("HAS_DOCUMENT", {
+                    "id": f"{person['id']}-document",
+                    "type": rng.choice(DOCUMENT_TYPES),
+                    "documentnumber": f"{rng.randint(10**7, 10**8 - 1)}",
+                    "issuingCountry": person["nationality"],
+                }))
+            self.persons.append(person)
+            self.neighbors[person["id"]] = edges
+            self.labels[person["id"]] = "Person"
+            for rel, node in edges:
+                self.labels.setdefault(node["id"], RELATIONSHIP_LABELS[rel])
+            relationship_count += len(edges)
+        # Programs are shared, every other neighbor is a node of its own
+        self.node_count = count + len(self.programs) + relationship_count - sanction_count
+        self.relationship_count = relationship_count
+
+    def refresh_schema(self) -> None:
+        pass
+
+    def query_with_graph(self, query: str, params: dict, max_rows: Optional[int]):
+        rows = self.query(query, params)
+        collector = GraphCollector()
+        for row in rows[:max_rows]:
+            for value in row.values():
+                if isinstance(value, tuple):
+                    start, rel, end = value
+                    collector.add_relationship(f"{start['id']}-{rel}-{end['id']}", rel, start["id"], end["id"], {})
+                elif isinstance(value, dict) and value.get("id") in self.labels:
+                    collector.add_node(value["id"], [self.labels[value["id"]]], value)
+        return rows[:max_rows], collector.payload(), len(rows)
+
+    def query(self, query: str, params: dict = {}, session_params: dict = {}) -> List[Dict[str, Any]]:
+        # The patterns below match literal Cypher; parameterized statements get their values back
+        query = inline_parameters(query, params)
+        if self._pool is None:
+            time.sleep(self.query_latency)
+            return self._execute(query)
+        with stage("neo4j_pool_wait"):
+            acquired = self._pool.acquire(timeout=self.acquisition_timeout)
+        if not acquired:
+            raise RuntimeError(f"Failed to obtain a connection from the pool within {self.acquisition_timeout}s")
+        try:
+            time.sleep(self.query_latency)
+            return self._execute(query)
+        finally:
+            self._pool.release()
+
+    def _execute(self, query: str) -> List[Dict[str, Any]]:
+        cypher = " ".join(query.split())
+
+        if re.fullmatch(r"MATCH \(n\) RETURN count\(n\) AS count", cypher, re.IGNORECASE):
+            return [{"count": self.node_count}]
+        if re.fullmatch(r"MATCH \(\)-\[r\]->\(\) RETURN count\(r\) AS count", cypher, re.IGNORECASE):
+            return [{"count": self.relationship_count}]
+
+        match = re.search(r"tolower\(p\.fullName\) contains tolower\([\"'](.+?)[\"']\)", cypher, re.IGNORECASE)
+        if match:
+            name = match.group(1).lower()
+            return [
+                {"n": node, "r": (person, rel, node), "p": person}
+                for person in self.persons if name in person["fullName"].lower()
+                for rel, node in self.neighbors[person["id"]]
+            ]
+
+        match = re.search(r"numAliases > (\d+)", cypher)
+        if match:
+            minimum = int(match.group(1))
+            rows = []
+            for person in self.persons:
+                aliases = [node for rel, node in self.neighbors[person["id"]] if rel == "HAS_ALIAS"]
+                if len(aliases) > minimum:
+                    rows.extend({"p": person, "r": (person, "HAS_ALIAS", alias), "a": alias} for alias in aliases)
+            return rows
+
+        match = re.search(r"prog\.name IN \[([^\]]*)\]", cypher)
+        if match:
+            names = set(re.findall(r"[\"']([^\"']+)[\"']", match.group(1)))
+            return [
+                {"p": person, "s": (person, "SANCTIONED_BY", node), "prog": node}
+                for person in self.persons
+                for rel, node in self.neighbors[person["id"]] if rel == "SANCTIONED_BY" and node["name"] in names
+            ]
+
+        if re.fullmatch(r"MATCH \(prog:Program\) RETURN DISTINCT prog", cypher):
+            return [{"prog": program} for program in self.programs]
+
+        match = re.fullmatch(r"MATCH \(p:Person\) RETURN p LIMIT (\d+)", cypher)
+        if match:
+            return [{"p": person} for person in self.persons[: int(match.group(1))]]
+        return []
+
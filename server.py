@@ -0,0 +1,258 @@
+# server.py
+
+import asyncio
+import json
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from dotenv import load_dotenv
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import JSONResponse, StreamingResponse
+from langchain_core.messages import AIMessage, AIMessageChunk, HumanMessage, ToolMessage
+from pydantic import BaseModel, Field
+from agents.chat_history import get_history_writer
+from agents.registry import get_agent
+from agents.turn import run_turn, tool_output
+from agents.utils.metrics import get_metrics
+from agents.utils.profiling import profile_turn
+from agents.warmup import start_warmup, warmup_status
+
+# Load environment variables
+load_dotenv(override=True)
+
+# Threads running agent turns (the graph and tools are synchronous)
+API_WORKERS = int(os.getenv("API_WORKERS", "16"))
+# Turns allowed to run or wait for a worker at once; further requests get 503
+API_MAX_PENDING = int(os.getenv("API_MAX_PENDING", "64"))
+
+
+class ChatRequest(BaseModel):
+    """A user message for a session"""
+    message: str = Field(description="The user's question")
+
+
+class ToolResult(BaseModel):
+    """Output of a tool called during the turn"""
+    name: str
+    content: Any
+
+
+class ChatResponse(BaseModel):
+    """Result of a chat turn"""
+    session_id: str
+    answer: str
+    tool_results: List[ToolResult] = Field(default_factory=list)
+
+
+class SessionResponse(BaseModel):
+    """A new chat session"""
+    session_id: str
+
+
+class AgentService:
+    """
+    One compiled agent (with its LLM clients and tools) shared by all sessions of the process.
+
+    Turns run on a bounded thread pool, through agents.turn.run_turn like the app's (so the
+    semantic cache is consulted and filled). Turns of the same session are serialized so
+    that two requests never write checkpoints of one thread concurrently.
+    """
+
+    def __init__(self, workers: int = API_WORKERS, max_pending: int = API_MAX_PENDING):
+        self.agent = get_agent()
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="agent-turn")
+        self.capacity = asyncio.Semaphore(max_pending)
+        # Lock of each session with a turn running or waiting, and the number of such turns
+        self.session_locks: Dict[str, Tuple[asyncio.Lock, int]] = {}
+
+    @staticmethod
+    def session_config(session_id: str) -> Dict[str, Any]:
+        """Thread config of a session; independent of the host so any replica can serve it"""
+        return {"configurable": {"thread_id": f"api_{session_id}", "checkpoint_ns": ""}}
+
+    @asynccontextmanager
+    async def turn_slot(self, session_id: str) -> AsyncIterator[None]:
+        """Admission control plus per-session serialization"""
+        if self.capacity.locked():
+            raise HTTPException(status_code=503, detail="Server busy, retry later")
+        async with self.capacity:
+            lock, users = self.session_locks.get(session_id, (None, 0))
+            lock = lock or asyncio.Lock()
+            self.session_locks[session_id] = (lock, users + 1)
+            try:
+                async with lock:
+                    yield
+            finally:
+                # Forget the lock with its last turn, so idle sessions take no memory
+                lock, users = self.session_locks[session_id]
+                if users == 1:
+                    del self.session_locks[session_id]
+                else:
+                    self.session_locks[session_id] = (lock, users - 1)
+
+    @staticmethod
+    def tool_results(turn: Dict[str, Any]) -> List[ToolResult]:
+        """Tool outputs of a turn; a cached answer carries the cypher_qa output it was based on"""
+        if turn["cached"]:
+            content = turn["cached"].get("tool_content")
+            return [ToolResult(name="cypher_qa", content=parse_tool_content(content))] if content else []
+        return [
+            ToolResult(name=msg.name, content=parse_tool_content(tool_output(msg)))
+            for msg in turn["messages"] if isinstance(msg, ToolMessage)
+        ]
+
+    @staticmethod
+    def answer(turn: Dict[str, Any]) -> str:
+        messages = turn["messages"]
+        return messages[-1].content if messages and isinstance(messages[-1], AIMessage) else ""
+
+    def run_turn(self, session_id: str, text: str) -> ChatResponse:
+        """Run one turn to completion (called on the worker pool)"""
+        user_message = HumanMessage(content=text, id=str(uuid.uuid4()))
+        with profile_turn(f"api_{session_id}"):
+            turn = run_turn(self.agent, self.session_config(session_id), user_message)
+        return ChatResponse(session_id=session_id, answer=self.answer(turn), tool_results=self.tool_results(turn))
+
+    def stream_turn(self, session_id: str, text: str, emit) -> None:
+        """Run one turn and pass (event, data) pairs to `emit` as they happen (worker pool)"""
+        user_message = HumanMessage(content=text, id=str(uuid.uuid4()))
+
+        def on_chunk(mode: str, data: Any) -> None:
+            if mode == "messages":
+                chunk, metadata = data
+                if (isinstance(chunk, AIMessageChunk) and chunk.content
+                        and metadata.get("langgraph_node") == "agent"):
+                    emit("token", {"content": chunk.content})
+            elif mode == "updates":
+                for node, update in (data or {}).items():
+                    for msg in (update or {}).get("messages", []) if isinstance(update, dict) else []:
+                        if isinstance(msg, ToolMessage) and node == "tools":
+                            emit("tool", {"name": msg.name, "content": parse_tool_content(tool_output(msg))})
+
+        with profile_turn(f"api_{session_id}"):
+            # run_turn times the turn (stage "turn") and attaches the metrics callbacks
+            turn = run_turn(self.agent, self.session_config(session_id), user_message, on_chunk=on_chunk)
+        if turn["cached"]:
+            # Nothing was streamed: send the cached answer and its tool output at once
+            for result in self.tool_results(turn):
+                emit("tool", {"name": result.name, "content": result.content})
+            emit("token", {"content": self.answer(turn)})
+        emit("done", {"session_id": session_id, "answer": self.answer(turn)})
+
+    def shutdown(self) -> None:
+        self.executor.shutdown(wait=True)
+        get_history_writer().close()
+
+
+def parse_tool_content(content: Any) -> Any:
+    """Tool outputs are JSON strings when the tool returned a dict"""
+    if isinstance(content, str):
+        try:
+            return json.loads(content)
+        except json.JSONDecodeError:
+            return content
+    return content
+
+
+def format_sse(event: str, data: Dict[str, Any]) -> str:
+    """Encode one server-sent event"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+
+service: Optional[AgentService] = None
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global service
+    service = AgentService()
+    # Cold schema, driver pool and quick-question answers are warmed in the background
+    start_warmup()
+    yield
+    service.shutdown()
+
+
+app = FastAPI(title="AML/OFAC GraphRAG Chatbot API", lifespan=lifespan)
+
+
+@app.get("/health")
+async def health() -> Dict[str, str]:
+    return {"status": "ok"}
+
+
+@app.get("/ready")
+async def ready() -> JSONResponse:
+    """
+    Warm-up progress; 200 once the driver, schema and agent are warm (or warm-up is
+    disabled), 503 before. The quick questions keep warming in the background.
+    """
+    status = warmup_status()
+    return JSONResponse(status, status_code=200 if status["state"] in ("ready", "disabled") else 503)
+
+
+@app.get("/debug/metrics")
+async def debug_metrics() -> Dict[str, Any]:
+    """In-process metrics: stage/node/tool latencies, tokens, Cypher rows and cache hit rates"""
+    return get_metrics().snapshot()
+
+
+@app.post("/sessions", response_model=SessionResponse)
+async def create_session() -> SessionResponse:
+    """Start a session; its history lives in the checkpointer under the session id"""
+    return SessionResponse(session_id=uuid.uuid4().hex)
+
+
+@app.post("/sessions/{session_id}/messages", response_model=ChatResponse)
+async def post_message(session_id: str, request: ChatRequest) -> ChatResponse:
+    """Send a message and wait for the full answer"""
+    if not request.message.strip():
+        raise HTTPException(status_code=422, detail="Empty message")
+    async with service.turn_slot(session_id):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(service.executor, service.run_turn, session_id, request.message)
+
+
+@app.post("/sessions/{session_id}/messages/stream")
+async def stream_message(session_id: str, request: ChatRequest) -> StreamingResponse:
+    """
+    Send a message and stream the turn as server-sent events:
+    `token` (answer tokens), `tool` (tool outputs), `done` (final answer) or `error`.
+    """
+    if not request.message.strip():
+        raise HTTPException(status_code=422, detail="Empty message")
+    # Reject before the response starts; turn_slot re-checks once the stream runs
+    if service.capacity.locked():
+        raise HTTPException(status_code=503, detail="Server busy, retry later")
+
+    async def events() -> AsyncIterator[str]:
+        async with service.turn_slot(session_id):
+            loop = asyncio.get_running_loop()
+            events_queue: asyncio.Queue = asyncio.Queue()
+
+            def emit(event: str, data: Dict[str, Any]) -> None:
+                loop.call_soon_threadsafe(events_queue.put_nowait, (event, data))
+
+            def run() -> None:
+                try:
+                    service.stream_turn(session_id, request.message, emit)
+                except Exception as e:
+                    emit("error", {"detail": str(e)})
+                finally:
+                    emit(None, None)
+
+            future = loop.run_in_executor(service.executor, run)
+            while True:
+                event, data = await events_queue.get()
+                if event is None:
+                    break
+                yield format_sse(event, data)
+            await future
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run("server:app", host=os.getenv("API_HOST", "0.0.0.0"), port=int(os.getenv("API_PORT", "8000")))
@@ -0,0 +1,72 @@
+# tests/test_checkpointer.py
+
+import time
+import uuid
+import pytest
+
+pytest.importorskip("langgraph.checkpoint.sqlite")
+
+from agents.checkpointer import UUID_EPOCH_OFFSET, PooledSqliteSaver, checkpoint_timestamp
+
+
+def checkpoint_id(timestamp: float) -> str:
+    """UUIDv6 checkpoint id for a unix time, like the ones LangGraph generates"""
+    ticks = int(timestamp * 1e7) + UUID_EPOCH_OFFSET
+    hex_id = f"{ticks >> 12:012x}6{ticks & 0xfff:03x}{uuid.uuid4().hex[16:]}"
+    return str(uuid.UUID(hex_id))
+
+
+def add_checkpoint(saver: PooledSqliteSaver, thread_id: str, timestamp: float) -> str:
+    checkpoint = checkpoint_id(timestamp)
+    with saver.cursor() as cur:
+        cur.execute(
+            "INSERT INTO checkpoints (thread_id, checkpoint_ns, checkpoint_id, type, checkpoint, metadata) "
+            "VALUES (?, '', ?, 'msgpack', x'00', x'00')",
+            (thread_id, checkpoint)
+        )
+        cur.execute(
+            "INSERT INTO writes (thread_id, checkpoint_ns, checkpoint_id, task_id, idx, channel, type, value) "
+            "VALUES (?, '', ?, 'task', 0, 'messages', 'msgpack', x'00')",
+            (thread_id, checkpoint)
+        )
+    return checkpoint
+
+
+def count(saver: PooledSqliteSaver, table: str, thread_id: str) -> int:
+    with saver.cursor(transaction=False) as cur:
+        cur.execute(f"SELECT COUNT(*) FROM {table} WHERE thread_id = ?", (thread_id,))
+        return cur.fetchone()[0]
+
+
+def test_checkpoint_timestamp_round_trip():
+    now = time.time()
+    assert checkpoint_timestamp(checkpoint_id(now)) == pytest.approx(now, abs=1e-3)
+    assert checkpoint_timestamp("not-a-uuid") is None
+    assert checkpoint_timestamp(None) is None
+
+
+def test_prune_keeps_last_checkpoints_per_thread(tmp_path):
+    saver = PooledSqliteSaver(str(tmp_path / "checkpoints.sqlite"), pool_size=2, keep_last=2)
+    now = time.time()
+    ids = [add_checkpoint(saver, "a", now - 10 + i) for i in range(5)]
+    add_checkpoint(saver, "b", now)
+
+    deleted = saver.prune()
+    assert deleted == {"threads": 0, "checkpoints": 3, "writes": 3}
+    assert count(saver, "checkpoints", "a") == 2 and count(saver, "checkpoints", "b") == 1
+    with saver.cursor(transaction=False) as cur:
+        cur.execute("SELECT checkpoint_id FROM checkpoints WHERE thread_id = 'a' ORDER BY checkpoint_id")
+        assert [row[0] for row in cur.fetchall()] == ids[-2:]
+
+
+def test_prune_deletes_idle_threads(tmp_path):
+    saver = PooledSqliteSaver(str(tmp_path / "checkpoints.sqlite"), pool_size=2, keep_last=0, thread_ttl=3600)
+    now = time.time()
+    add_checkpoint(saver, "idle", now - 7200)
+    add_checkpoint(saver, "active", now - 7200)
+    add_checkpoint(saver, "active", now - 60)
+
+    deleted = saver.prune()
+    assert deleted["threads"] == 1
+    assert count(saver, "checkpoints", "idle") == 0 and count(saver, "writes", "idle") == 0
+    assert count(saver, "checkpoints", "active") == 2
@@ -0,0 +1,52 @@
+# tests/test_condense.py
+
+from tools.condense import condense_results, normalize_url, split_sentences
+
+
+def result(url, content, title="Title", score=0.5):
+    return {"title": title, "url": url, "content": content, "score": score}
+
+
+def test_normalize_url_drops_tracking_and_scheme():
+    assert normalize_url("https://www.treasury.gov/ofac/?utm_source=x#top") == "treasury.gov/ofac"
+    assert normalize_url("http://treasury.gov/ofac?id=1") == "treasury.gov/ofac?id=1"
+
+
+def test_split_sentences_cuts_long_runs():
+    text = " ".join(["word"] * 100)
+    assert [len(sentence.split()) for sentence in split_sentences(text)] == [40, 40, 20]
+
+
+def test_duplicate_urls_keep_the_best_scored_result():
+    results = [
+        result("https://www.example.com/a", "Lower scored copy of the same page about sanctions.", score=0.1),
+        result("http://example.com/a/", "Higher scored copy of the same page about sanctions.", score=0.9),
+    ]
+    condensed = condense_results("sanctions", results)
+    assert len(condensed) == 1 and condensed[0]["score"] == 0.9
+
+
+def test_every_result_keeps_its_lead_sentence_without_query_overlap():
+    results = [
+        result("https://a.example/1", "The first page opens with this lead sentence. It goes on for a while."),
+        result("https://b.example/2", "The second page opens with another lead sentence. Then more text."),
+    ]
+    condensed = condense_results("what is the latest news", results, max_tokens=10)
+    assert [item["url"] for item in condensed] == ["https://a.example/1", "https://b.example/2"]
+    assert condensed[0]["content"] == "The first page opens with this lead sentence."
+    assert condensed[1]["content"] == "The second page opens with another lead sentence."
+
+
+def test_matching_sentences_fill_the_budget_in_original_order():
+    content = (
+        "Treasury publishes the list every week for banks. "
+        "Weather in the capital was mild and sunny today. "
+        "OFAC added new SDGT designations for Syria on Tuesday. "
+        "The SDGT program covers global terrorism sanctions."
+    )
+    condensed = condense_results("OFAC SDGT designations", [result("https://ofac.example", content)], max_tokens=600)
+    assert condensed[0]["content"] == (
+        "Treasury publishes the list every week for banks. ... "
+        "OFAC added new SDGT designations for Syria on Tuesday. ... "
+        "The SDGT program covers global terrorism sanctions."
+    )
@@ -0,0 +1,63 @@
+# tests/test_cypher_params.py
+
+from tools.cypher_params import TemplateTracker, inline_parameters, parameterize
+
+
+def test_strings_numbers_and_lists_become_parameters():
+    template, params = parameterize(
+        "MATCH (p:Person)-[s:SANCTIONED_BY]->(prog:Program) "
+        "WHERE prog.name IN ['SDGT', 'SYRIA'] AND tolower(p.name) CONTAINS 'ayman' RETURN p LIMIT 10"
+    )
+    assert template == (
+        "MATCH (p:Person)-[s:SANCTIONED_BY]->(prog:Program) "
+        "WHERE prog.name IN $p0 AND tolower(p.name) CONTAINS $p1 RETURN p LIMIT $p2"
+    )
+    assert params == {"p0": ["SDGT", "SYRIA"], "p1": "ayman", "p2": 10}
+
+
+def test_questions_about_other_names_share_a_template():
+    first, _ = parameterize("MATCH (p:Person) WHERE p.name = 'Ayman' RETURN p")
+    second, _ = parameterize("MATCH (p:Person) WHERE p.name = \"Omar\" RETURN p")
+    assert first == second
+
+
+def test_equal_values_share_one_parameter():
+    template, params = parameterize("MATCH (a {name: 'x'}), (b {alias: 'x'}) RETURN a, b")
+    assert template == "MATCH (a {name: $p0}), (b {alias: $p0}) RETURN a, b"
+    assert params == {"p0": "x"}
+
+
+def test_structural_numbers_and_subscripts_stay_inline():
+    template, params = parameterize("MATCH (p)-[r*1..3]-(q) RETURN p.aliases[0], p['name'], q")
+    assert template == "MATCH (p)-[r*1..3]-(q) RETURN p.aliases[$p0], p[$p1], q"
+    assert params == {"p0": 0, "p1": "name"}
+
+
+def test_identifiers_comments_and_escapes():
+    template, params = parameterize("MATCH (`Person 2`) // 'not a literal'\nWHERE n.name = 'O\\'Brien' RETURN 1.5")
+    assert template == "MATCH (`Person 2`) // 'not a literal'\nWHERE n.name = $p0 RETURN $p1"
+    assert params == {"p0": "O'Brien", "p1": 1.5}
+
+
+def test_statements_with_parameters_are_left_unchanged():
+    cypher = "MATCH (p:Person) WHERE p.name = $name AND p.title = 'Dr' RETURN p"
+    assert parameterize(cypher) == (cypher, {})
+    # A dollar sign inside a string is not a parameter
+    assert parameterize("MATCH (p) WHERE p.note = 'costs $5' RETURN p")[1] == {"p0": "costs $5"}
+
+
+def test_inline_parameters_restores_literals():
+    template, params = parameterize("MATCH (prog:Program) WHERE prog.name IN ['SDGT', 'SYRIA'] RETURN prog LIMIT 5")
+    assert inline_parameters(template, params) == (
+        'MATCH (prog:Program) WHERE prog.name IN ["SDGT", "SYRIA"] RETURN prog LIMIT 5'
+    )
+
+
+def test_template_tracker_evicts_least_recent():
+    tracker = TemplateTracker(size=2)
+    assert not tracker.seen("a")
+    assert not tracker.seen("b")
+    assert tracker.seen("a")
+    assert not tracker.seen("c")  # evicts b
+    assert not tracker.seen("b")
+    assert tracker.seen("c")
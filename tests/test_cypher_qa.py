@@ -0,0 +1,40 @@
+# tests/test_cypher_qa.py
+
+import pytest
+
+pytest.importorskip("langchain")
+pytest.importorskip("langchain_neo4j")
+
+from tools.cypher_qa import compact_value, extract_cypher, validate_cypher
+
+
+@pytest.mark.parametrize("cypher", [
+    "MATCH (p:Person) WHERE tolower(p.name) CONTAINS 'ayman' RETURN p LIMIT 10",
+    "MATCH (p:Person)-[s:SANCTIONED_BY]->(prog:Program {name: 'SDGT'}) RETURN p, s, prog",
+    # Write keywords inside string literals are data, not clauses
+    "MATCH (p:Person) WHERE p.remarks CONTAINS 'DELETE; SET' RETURN p",
+])
+def test_read_queries_are_valid(cypher):
+    assert validate_cypher(cypher) is None
+
+
+@pytest.mark.parametrize("cypher, reason", [
+    ("", "empty Cypher statement"),
+    ("MATCH (n) DELETE n", "write clause DELETE is not allowed"),
+    ("MATCH (n) DETACH DELETE n", "write clause DETACH is not allowed"),
+    ("MATCH (p:Person) SET p.flagged = true RETURN p", "write clause SET is not allowed"),
+    ("merge (p:Person {name: 'x'})", "write clause MERGE is not allowed"),
+    ("MATCH (n) RETURN n; MATCH (m) RETURN m", "multiple statements are not allowed"),
+])
+def test_invalid_queries_are_rejected(cypher, reason):
+    assert validate_cypher(cypher) == reason
+
+
+def test_extract_cypher_strips_fences_and_semicolon():
+    assert extract_cypher("```cypher\nMATCH (n) RETURN n;\n```") == "MATCH (n) RETURN n"
+    assert extract_cypher("MATCH (n) RETURN n;") == "MATCH (n) RETURN n"
+
+
+def test_compact_value_drops_empty_and_embedding_properties():
+    row = {"p": {"name": "Ayman", "title": "", "aliases": [], "name_embedding": [0.1, 0.2], "dob": None}}
+    assert compact_value(row) == {"p": {"name": "Ayman"}}
@@ -0,0 +1,60 @@
+# tests/test_quick_answers.py
+
+import pytest
+import agents.quick_answers as quick_answers
+from agents.quick_answers import QuickAnswerStore
+from agents.utils.artifacts import ArtifactStore
+
+QUESTION = "Find people sanctioned in 'SDGT' programs"
+CONTENT = '{"query": "Find people sanctioned in \'SDGT\' programs", "cypher": "MATCH (p) RETURN p", "rows": [{"p": 1}]}'
+GRAPH = {"nodes": [{"id": "1"}], "relationships": []}
+
+
+@pytest.fixture
+def artifacts(tmp_path, monkeypatch):
+    store = ArtifactStore(str(tmp_path / "artifacts"))
+    monkeypatch.setattr(quick_answers, "get_artifact_store", lambda: store)
+    return store
+
+
+def test_result_is_handed_over_once_answered_from_the_database(tmp_path, artifacts):
+    store = QuickAnswerStore(str(tmp_path / "quick_answers.json"), data_version_fn=lambda: "v1")
+    assert store.status(QUESTION) == "missing" and not store.knows(QUESTION)
+
+    store.put(QUESTION, CONTENT, GRAPH, "<html>graph</html>", display_key="display")
+    assert store.status(QUESTION) == "ready"
+    # Not before a full turn showed the agent answers it from the database alone
+    assert store.get(QUESTION) is None
+
+    store.record_answer(QUESTION, True)
+    assert store.get("  find people sanctioned in 'sdgt'  PROGRAMS ") == {
+        "question": QUESTION, "content": CONTENT, "graph": GRAPH,
+    }
+    assert artifacts.get(store.html_for("display")) == "<html>graph</html>"
+
+    # Persisted
+    reloaded = QuickAnswerStore(str(tmp_path / "quick_answers.json"), data_version_fn=lambda: "v1")
+    assert reloaded.get(QUESTION)["content"] == CONTENT
+
+
+def test_other_answers_and_empty_results_are_not_run_again(tmp_path, artifacts):
+    store = QuickAnswerStore(str(tmp_path / "quick_answers.json"), data_version_fn=lambda: "v1")
+    store.put("MATCH (n) DELETE n", None)
+    assert store.status("MATCH (n) DELETE n") == "unanswerable"
+
+    store.put("How to cook chicken?", CONTENT, GRAPH)
+    store.record_answer("How to cook chicken?", False)
+    assert store.status("How to cook chicken?") == "unanswerable"
+    assert store.get("How to cook chicken?") is None
+
+
+def test_results_expire_with_the_data_version(tmp_path, artifacts):
+    version = {"value": "v1"}
+    store = QuickAnswerStore(str(tmp_path / "quick_answers.json"), data_version_fn=lambda: version["value"],
+                             version_check_interval=0)
+    store.put(QUESTION, CONTENT, GRAPH)
+    store.record_answer(QUESTION, True)
+    assert store.get(QUESTION) is not None
+
+    version["value"] = "v2"
+    assert store.status(QUESTION) == "missing" and store.get(QUESTION) is None
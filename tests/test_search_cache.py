@@ -0,0 +1,84 @@
+# tests/test_search_cache.py
+
+import json
+import threading
+import time
+import urllib.request
+import pytest
+
+pytest.importorskip("langchain_core")
+
+from devtools.fake_tavily_server import start_server
+from tools.search_cache import SearchCache
+
+
+@pytest.fixture
+def server():
+    server = start_server(latency=0.3)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def search(server, query):
+    """Upstream call to the local Tavily stand-in"""
+    request = urllib.request.Request(
+        f"{server.url}/search",
+        data=json.dumps({"query": query, "max_results": 3}).encode("utf-8"),
+        headers={"Content-Type": "application/json"}
+    )
+    with urllib.request.urlopen(request, timeout=10) as response:
+        return json.load(response)
+
+
+def test_key_ignores_case_and_whitespace():
+    key = SearchCache.make_key("OFAC  sanctions Syria ", max_results=3)
+    assert key == SearchCache.make_key("ofac sanctions syria", max_results=3)
+    assert key != SearchCache.make_key("ofac sanctions syria", max_results=5)
+    assert key != SearchCache.make_key("ofac sanctions iran", max_results=3)
+
+
+def test_entries_expire_after_ttl(tmp_path, monkeypatch):
+    cache = SearchCache(str(tmp_path), ttl=60)
+    key = SearchCache.make_key("ofac")
+    cache.set(key, {"answer": "cached"})
+    assert cache.get(key) == {"answer": "cached"}
+
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 61)
+    assert cache.get(key) is None
+    assert not any(path.suffix == ".json" for path in tmp_path.rglob("*"))
+
+
+def test_hit_skips_upstream(tmp_path, server):
+    cache = SearchCache(str(tmp_path))
+    key = SearchCache.make_key("ofac sanctions syria")
+    first = cache.get_or_fetch(key, lambda: search(server, "ofac sanctions syria"))
+    second = cache.get_or_fetch(SearchCache.make_key("OFAC Sanctions Syria"), lambda: search(server, "ofac sanctions syria"))
+    assert first == second
+    assert server.requests == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_concurrent_identical_queries_share_one_fetch(tmp_path, server):
+    cache = SearchCache(str(tmp_path))
+    key = SearchCache.make_key("ofac sanctions syria")
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(cache.get_or_fetch(key, lambda: search(server, "ofac sanctions syria"))))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert server.requests == 1
+    assert len(results) == 8 and all(result == results[0] for result in results)
+
+
+def test_rejected_payloads_are_not_stored(tmp_path):
+    cache = SearchCache(str(tmp_path))
+    key = SearchCache.make_key("ofac")
+    cache.get_or_fetch(key, lambda: {"error": "quota"}, cacheable=lambda value: "error" not in value)
+    assert cache.get(key) is None
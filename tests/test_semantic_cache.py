@@ -0,0 +1,44 @@
+# tests/test_semantic_cache.py
+
+import pytest
+from agents.semantic_cache import is_standalone, question_literals
+
+
+def test_literals_keep_lowercase_names():
+    assert question_literals("find all information about a person named ayman") == ["ayman"]
+    assert question_literals("find all information about a person named omar") == ["omar"]
+
+
+def test_literals_ignore_case_and_phrasing():
+    assert question_literals("Which persons are sanctioned under SDGT?") == question_literals(
+        "find people sanctioned under sdgt")
+    assert question_literals("Find people sanctioned under 'SYRIA'") == ["syria"]
+
+
+def test_literals_keep_numbers_and_attributes():
+    assert question_literals("What is Ayman's date of birth?") == ["ayman", "birth", "date"]
+    assert question_literals("Show documents issued in 1999") == ["1999", "issued"]
+
+
+def test_context_dependent_questions():
+    assert is_standalone("Find all information about a person named Ayman")
+    assert not is_standalone("What programs is he sanctioned under?")
+    assert not is_standalone("Show the aliases of that person")
+
+
+class FakeEmbeddings:
+    """Every question gets the same vector, so only the literals tell them apart"""
+
+    def embed_query(self, text):
+        return [1.0, 0.0, 0.0]
+
+
+def test_lookup_misses_on_other_lowercase_name(tmp_path):
+    pytest.importorskip("faiss")
+    from agents.semantic_cache import SemanticCache
+
+    cache = SemanticCache(FakeEmbeddings(), directory=str(tmp_path))
+    cache.add("find all information about a person named ayman", "Ayman is sanctioned under SDGT")
+    assert cache.lookup("find all information about a person named omar") is None
+    hit = cache.lookup("Find all information about the person named Ayman")
+    assert hit is not None and hit["answer"] == "Ayman is sanctioned under SDGT"
@@ -0,0 +1,153 @@
+# tools/condense.py
+
+import math
+import os
+import re
+from collections import Counter
+from typing import Any, Dict, List, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+(?=[A-Z0-9\"'(\[])|\n+")
+WORD = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the this to was were "
+    "what when where which who will with about can latest news".split()
+)
+
+
+def split_sentences(text: str, min_chars: int = 30, max_words: int = 40) -> List[str]:
+    """
+    Split text into sentences, dropping fragments shorter than min_chars. Scraped page text
+    often has no punctuation, so runs longer than max_words are cut into max_words chunks.
+    """
+    sentences = []
+    for sentence in SENTENCE_BOUNDARY.split(text or ""):
+        words = sentence.split()
+        for start in range(0, len(words), max_words):
+            chunk = " ".join(words[start:start + max_words])
+            if len(chunk) >= min_chars:
+                sentences.append(chunk)
+    return sentences
+
+
+def tokenize(text: str) -> List[str]:
+    return [w for w in WORD.findall(text.lower()) if w not in STOPWORDS]
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // 4 + 1
+
+
+def normalize_url(url: str) -> str:
+    """URL without scheme, www, fragment, tracking parameters or trailing slash"""
+    parts = urlsplit(url or "")
+    host = parts.netloc.lower().removeprefix("www.")
+    query = urlencode([(k, v) for k, v in parse_qsl(parts.query) if not k.startswith("utm_")])
+    return f"{host}{parts.path.rstrip('/')}" + (f"?{query}" if query else "")
+
+
+def bm25_scores(query: str, documents: List[str], k1: float = 1.5, b: float = 0.75) -> List[float]:
+    """Okapi BM25 score of each document (here: sentence) for the query"""
+    query_terms = set(tokenize(query))
+    tokenized = [tokenize(doc) for doc in documents]
+    if not query_terms or not tokenized:
+        return [0.0] * len(documents)
+    avg_length = sum(len(t) for t in tokenized) / len(tokenized) or 1.0
+    doc_freq = Counter(term for tokens in tokenized for term in set(tokens) & query_terms)
+    n = len(tokenized)
+
+    scores = []
+    for tokens in tokenized:
+        freq = Counter(tokens)
+        score = 0.0
+        for term in query_terms:
+            if not freq[term]:
+                continue
+            idf = math.log(1 + (n - doc_freq[term] + 0.5) / (doc_freq[term] + 0.5))
+            score += idf * freq[term] * (k1 + 1) / (freq[term] + k1 * (1 - b + b * len(tokens) / avg_length))
+        scores.append(score)
+    return scores
+
+
+def condense_results(query: str, results: List[Dict[str, Any]], max_tokens: int = 600,
+                     max_sentences_per_result: int = 4) -> List[Dict[str, Any]]:
+    """
+    Keep only the sentences of the search results that best match the query.
+
+    Results are deduplicated by URL and split into sentences (raw_content when present,
+    otherwise content). Every result keeps its title, URL and lead sentence, so no citation
+    is lost when the query shares no words with the text (stopword-only queries, other word
+    forms). The remaining token budget goes to further sentences, ranked by BM25 against
+    the query and picked greedily; each result's sentences stay in their original order.
+    """
+    unique: Dict[str, Dict[str, Any]] = {}
+    for result in results:
+        key = normalize_url(result.get("url", ""))
+        if key not in unique or (result.get("score") or 0) > (unique[key].get("score") or 0):
+            unique[key] = result
+    results = list(unique.values())
+
+    # (result index, position in result, sentence)
+    candidates: List[Tuple[int, int, str]] = []
+    selected: Dict[int, List[Tuple[int, str]]] = {index: [] for index in range(len(results))}
+    budget = max_tokens
+    seen = set()
+    for index, result in enumerate(results):
+        text = result.get("raw_content") or result.get("content") or ""
+        for position, sentence in enumerate(split_sentences(text)):
+            fingerprint = " ".join(tokenize(sentence))
+            if position == 0:
+                # The lead sentence is always kept
+                selected[index].append((position, sentence))
+                budget -= estimate_tokens(sentence)
+                seen.add(fingerprint)
+            elif fingerprint and fingerprint not in seen:
+                seen.add(fingerprint)
+                candidates.append((index, position, sentence))
+
+    scores = bm25_scores(query, [sentence for _, _, sentence in candidates])
+    ranked = sorted(zip(scores, candidates), key=lambda item: item[0], reverse=True)
+
+    for score, (index, position, sentence) in ranked:
+        if score <= 0:
+            break
+        cost = estimate_tokens(sentence)
+        if cost > budget or len(selected[index]) >= max_sentences_per_result:
+            continue
+        selected[index].append((position, sentence))
+        budget -= cost
+
+    condensed = []
+    for index, result in enumerate(results):
+        condensed.append({
+            "title": result.get("title"),
+            "url": result.get("url"),
+            "content": " ... ".join(sentence for _, sentence in sorted(selected[index])),
+            "score": result.get("score"),
+        })
+    return condensed
+
+
+def condense_search_payload(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Shrink a WebSearchResults payload before it goes into the agent context: condensed
+    results, no follow-up questions and at most WEB_SEARCH_MAX_IMAGES images.
+
+    Env vars: WEB_SEARCH_CONDENSE (default true), WEB_SEARCH_CONTEXT_TOKENS (default 600),
+    WEB_SEARCH_MAX_IMAGES (default 2).
+    """
+    if os.getenv("WEB_SEARCH_CONDENSE", "true").strip().lower() not in ("1", "true", "yes", "on"):
+        return payload
+    results = condense_results(
+        payload.get("query", ""),
+        payload.get("results", []),
+        max_tokens=int(os.getenv("WEB_SEARCH_CONTEXT_TOKENS", "600"))
+    )
+    condensed = {
+        **payload,
+        "results": results,
+        "total_results": len(results),
+        "images": (payload.get("images") or [])[: int(os.getenv("WEB_SEARCH_MAX_IMAGES", "2"))],
+    }
+    condensed.pop("follow_up_questions", None)
+    return condensed
@@ -0,0 +1,154 @@
+# tools/cypher_params.py
+
+"""
+Literal extraction for generated Cypher.
+
+The model writes literals into the statement (`contains tolower("Ayman")`,
+`prog.name IN ['SDGT', 'SYRIA']`), so every name gives a new query string that Neo4j
+plans again. parameterize() moves string and number literals, and lists of them, into a
+parameter map:
+
+    MATCH (p:Person)-[s:SANCTIONED_BY]->(prog:Program) WHERE prog.name IN ['SDGT', 'SYRIA'] RETURN p,s,prog
+    -> MATCH (p:Person)-[s:SANCTIONED_BY]->(prog:Program) WHERE prog.name IN $p0 RETURN p,s,prog
+       {"p0": ["SDGT", "SYRIA"]}
+
+so questions that differ only in names or numbers share one template and one cached
+plan, and the values never become part of the statement text. Variable-length bounds
+(`[r*1..3]`) stay in place (they cannot be parameters), and statements that already use
+parameters are left unchanged.
+"""
+
+import json
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Tuple
+
+_STRING = r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\""
+# Not part of an identifier, a parameter or a range (`*2`, `1..3`)
+_NUMBER = r"(?<![\w.$*])\d+(?:\.\d+)?(?:[eE][-+]?\d+)?(?![\w.])"
+
+LITERAL_PATTERN = re.compile(
+    rf"(?P<comment>//[^\n]*|/\*.*?\*/)"
+    rf"|(?P<identifier>`[^`]*`)"
+    rf"|(?P<list>\[\s*(?:{_STRING}|{_NUMBER})(?:\s*,\s*(?:{_STRING}|{_NUMBER}))*\s*\])"
+    rf"|(?P<string>{_STRING})"
+    rf"|(?P<number>{_NUMBER})",
+    re.DOTALL
+)
+STRING_PATTERN = re.compile(_STRING)
+LIST_ITEM_PATTERN = re.compile(rf"{_STRING}|{_NUMBER}")
+# Words that can come right before a list literal (after any other word, `[` is a subscript)
+LIST_KEYWORDS = {
+    "in", "return", "with", "unwind", "where", "and", "or", "xor", "not", "then", "else", "when",
+    "contains", "case", "distinct", "by", "starts", "ends",
+}
+ESCAPE_PATTERN = re.compile(r"\\(u[0-9a-fA-F]{4}|.)", re.DOTALL)
+ESCAPES = {"n": "\n", "t": "\t", "r": "\r", "b": "\b", "f": "\f"}
+
+
+def _unescape(literal: str) -> str:
+    def replace(match: "re.Match") -> str:
+        escape = match.group(1)
+        if escape[0] == "u" and len(escape) == 5:
+            return chr(int(escape[1:], 16))
+        return ESCAPES.get(escape, escape)
+
+    return ESCAPE_PATTERN.sub(replace, literal[1:-1])
+
+
+def _value(literal: str) -> Any:
+    if literal[0] in "'\"":
+        return _unescape(literal)
+    return float(literal) if any(c in literal for c in ".eE") else int(literal)
+
+
+def _is_subscript(cypher: str, start: int) -> bool:
+    """Whether the `[` at start indexes the value before it (n['name'], list[0])"""
+    before = cypher[:start].rstrip()
+    if before[-1:] in (")", "]", "}", "`"):
+        return True
+    word = re.search(r"\w+$", before)
+    return word is not None and word.group().lower() not in LIST_KEYWORDS
+
+
+def parameterize(cypher: str) -> Tuple[str, Dict[str, Any]]:
+    """
+    Move the literals of a statement into parameters.
+
+    Returns:
+        tuple: (template, params); equal values share one parameter
+    """
+    if "$" in STRING_PATTERN.sub("''", cypher):
+        return cypher, {}
+    params: Dict[str, Any] = {}
+    names: Dict[str, str] = {}
+
+    def bind(value: Any) -> str:
+        key = json.dumps([type(value).__name__, value])
+        if key not in names:
+            names[key] = f"p{len(names)}"
+            params[names[key]] = value
+        return f"${names[key]}"
+
+    parts = []
+    position = 0
+    while True:
+        match = LITERAL_PATTERN.search(cypher, position)
+        if match is None:
+            break
+        kind = match.lastgroup
+        if kind == "list" and _is_subscript(cypher, match.start()):
+            # Only the items of a subscript are literals
+            parts.append(cypher[position:match.start() + 1])
+            position = match.start() + 1
+            continue
+        parts.append(cypher[position:match.start()])
+        if kind == "list":
+            parts.append(bind([_value(item) for item in LIST_ITEM_PATTERN.findall(match.group())]))
+        elif kind in ("string", "number"):
+            parts.append(bind(_value(match.group())))
+        else:
+            parts.append(match.group())
+        position = match.end()
+    parts.append(cypher[position:])
+    return "".join(parts), params
+
+
+def inline_parameters(template: str, params: Dict[str, Any]) -> str:
+    """The statement with the parameters written back as literals (for display and stand-in graphs)"""
+    def literal(value: Any) -> str:
+        if isinstance(value, list):
+            return "[" + ", ".join(literal(item) for item in value) + "]"
+        return json.dumps(value, ensure_ascii=False)
+
+    return re.sub(r"\$(\w+)", lambda m: literal(params[m.group(1)]) if m.group(1) in params else m.group(), template)
+
+
+class TemplateTracker:
+    """
+    Recently executed templates, as an estimate of Neo4j's plan cache (which also keeps
+    the last 1000 distinct statements by default)
+    """
+
+    def __init__(self, size: int = 1000):
+        self.size = size
+        self._templates: "OrderedDict[str, None]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def seen(self, template: str) -> bool:
+        """Record an execution; True if the template ran recently"""
+        with self._lock:
+            hit = template in self._templates
+            self._templates[template] = None
+            self._templates.move_to_end(template)
+            while len(self._templates) > self.size:
+                self._templates.popitem(last=False)
+            return hit
+
+
+_tracker = TemplateTracker()
+
+
+def get_template_tracker() -> TemplateTracker:
+    return _tracker
@@ -1,13 +1,24 @@
 #tools/cypher_qa.py
 
 from dataclasses import Field
-from typing import Dict, Any, Optional, Type
+from typing import Dict, Any, List, Optional, Tuple, Type
 from langchain.tools import BaseTool
-from langchain_neo4j import GraphCypherQAChain, Neo4jGraph
+from langchain_neo4j import Neo4jGraph
 from langchain.prompts.prompt import PromptTemplate
+from langchain_core.output_parsers import StrOutputParser
 from langchain_core.tools import tool
+import logging
 import os
+import re
+from agents.utils.metrics import get_metrics
+from agents.utils.timing import stage
+from tools.cypher_params import get_template_tracker, parameterize
+from tools.graph_result import GraphPayload, query_with_graph
+from tools.graph_store import get_graph
+from tools.schema_catalog import get_schema_catalog
 
+# The schema and the question come last so that the instructions and examples form a
+# stable prompt prefix that provider-side prompt caching can reuse
 CYPHER_GENERATION_TEMPLATE = """
 Task:Generate Cypher statement to query a graph database.
 Instructions:
@@ -18,12 +29,6 @@ Instructions:
    - Even when only one node is queried, include the `MATCH` for relationships, i.e., `MATCH (n)-[r]-(p:Person)`, and ensure that the relationship (`r`) is part of the return, even if not explicitly required for the answer.
 4. Do not include any embeddings in your output.
 
-Schema:
-{schema}
-
-Question:
-{question}
-
 Cypher examples:
 
 1. Find all information of one person by name
@@ -60,10 +65,18 @@ RETURN p,s,prog
 MATCH (p:Person)-[s:SANCTIONED_BY]->(prog:Program)
 RETURN p,s,prog
 ```
+
+Schema:
+{schema}
+
+Question:
+{question}
 """
 
 cypher_prompt = PromptTemplate.from_template(CYPHER_GENERATION_TEMPLATE)
 
+logger = logging.getLogger(__name__)
+
 
 CYPHER_QA_TEMPLATE = """Below are the results from a database query. Please provide a comprehensive response that:
 
@@ -95,35 +108,201 @@ Response:"""
 qa_prompt = PromptTemplate(input_variables=["context","question"], template=CYPHER_QA_TEMPLATE)
 
 
+# Instructions appended to the agent system prompt when cypher_qa returns raw rows
+# (direct mode). The agent then does the write-up that the QA step used to do.
+DIRECT_RESULTS_INSTRUCTIONS = """
+            Handling cypher_qa results:
+            - cypher_qa returns the executed Cypher (`cypher`), the result rows (`rows`) and `row_count`
+            - Answer the question directly from the rows; do not invent data that is not in the rows
+            - Use markdown formatting (bold for names, bullet points for lists)
+            - For person queries, always include: full name, title, birth details if available
+            - For sanctions, mention programs and dates if available
+            - For documents, include document types and numbers
+            - If `row_count` is 0 or information is missing, say so
+"""
+
+
+def use_schema_subset() -> bool:
+    """Whether the generation prompt gets only the relevant part of the schema (env: CYPHER_SCHEMA_SUBSET)"""
+    return os.getenv("CYPHER_SCHEMA_SUBSET", "true").strip().lower() in ("1", "true", "yes", "on")
+
+
+def use_parameters() -> bool:
+    """Whether literals of the generated Cypher are sent as query parameters (env: CYPHER_PARAMETERIZE)"""
+    return os.getenv("CYPHER_PARAMETERIZE", "true").strip().lower() in ("1", "true", "yes", "on")
+
+
+def use_direct_results() -> bool:
+    """Whether cypher_qa should skip the QA LLM pass (env: CYPHER_QA_RETURN_DIRECT)"""
+    return os.getenv("CYPHER_QA_RETURN_DIRECT", "false").strip().lower() in ("1", "true", "yes", "on")
+
+
+def compact_value(value: Any) -> Any:
+    """Drop empty properties and embedding vectors from a query result value"""
+    if isinstance(value, dict):
+        return {
+            k: compact_value(v)
+            for k, v in value.items()
+            if v not in (None, "", [], {}) and "embedding" not in k.lower()
+        }
+    if isinstance(value, (list, tuple)):
+        return [compact_value(v) for v in value]
+    return value
+
+
+def format_direct_result(question: str, cypher: str, rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Build the compact payload returned to the agent in direct mode.
+
+    Args:
+        question: The natural language question
+        cypher: The executed Cypher statement
+        rows: The query result rows
+
+    Returns:
+        dict with the executed Cypher, the result rows and the row count
+    """
+    return {
+        "query": question,
+        "cypher": cypher,
+        "rows": [compact_value(row) for row in rows],
+        "row_count": len(rows),
+    }
+
+
+# Clauses that modify the database; string literals are blanked before matching
+WRITE_CLAUSE_PATTERN = re.compile(
+    r"\b(CREATE|MERGE|DELETE|DETACH|SET|REMOVE|DROP|FOREACH|LOAD\s+CSV)\b", re.IGNORECASE
+)
+STRING_LITERAL_PATTERN = re.compile(r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"")
+
+
+def extract_cypher(text: str) -> str:
+    """Strip markdown code fences (and a ```cypher language tag) and a trailing ; from generated Cypher"""
+    match = re.search(r"```(?:cypher)?\s*(.*?)```", text, re.DOTALL | re.IGNORECASE)
+    return (match.group(1) if match else text).strip().rstrip(";").strip()
+
+
+def validate_cypher(cypher: str) -> Optional[str]:
+    """
+    Check a generated statement before it is executed.
+
+    Returns:
+        str: The reason the statement was rejected, or None if it is valid
+    """
+    if not cypher:
+        return "empty Cypher statement"
+    stripped = STRING_LITERAL_PATTERN.sub("''", cypher)
+    if ";" in stripped:
+        return "multiple statements are not allowed"
+    match = WRITE_CLAUSE_PATTERN.search(stripped)
+    if match:
+        return f"write clause {match.group(1).upper()} is not allowed"
+    return None
+
+
 class CypherQATool(BaseTool):
     name: str = "cypher_qa"
     description: str = "Query a Neo4j graph database for information about individuals, sanctions, aliases, and identity documents"
     llm: Any 
+    cypher_llm: Any = None
+    qa_llm: Any = None
+    escalation_llm: Any = None
+    direct_results: bool = False
+    top_k: int = 10
+    # The graph payload of the rows goes to ToolMessage.artifact, for the visualization;
+    # only the content reaches the model
+    response_format: str = "content_and_artifact"
+
+    def __init__(self, llm: Any, direct_results: Optional[bool] = None, cypher_llm: Any = None,
+                 qa_llm: Any = None, escalation_llm: Any = None):
+        """
+        Initialize the tool with an LLM
+
+        Args:
+            llm: Default LLM for Cypher generation and the QA step
+            direct_results: If True, skip the QA step and return the rows and the executed
+                Cypher to the agent. Defaults to the CYPHER_QA_RETURN_DIRECT env var.
+            cypher_llm: LLM for Cypher generation (defaults to llm)
+            qa_llm: LLM for the QA step (defaults to llm)
+            escalation_llm: Larger LLM used to regenerate the Cypher when the statement from
+                cypher_llm fails validation or execution. No retry if None.
+        """
+        if direct_results is None:
+            direct_results = use_direct_results()
+        super().__init__(
+            llm=llm,
+            cypher_llm=cypher_llm or llm,
+            qa_llm=qa_llm or llm,
+            escalation_llm=escalation_llm,
+            direct_results=direct_results,
+            top_k=int(os.getenv("CYPHER_QA_TOP_K", "10"))
+        )
 
-    def __init__(self, llm: Any):
-        """Initialize the tool with an LLM"""
-        super().__init__(llm=llm)
+    def _generate_cypher(self, llm: Any, question: str, schema: str) -> str:
+        """Generate a Cypher statement for the question"""
+        chain = cypher_prompt | llm | StrOutputParser()
+        with stage("cypher_generation"):
+            return extract_cypher(chain.invoke({"question": question, "schema": schema}))
+
+    def _generate_and_execute(self, graph: Neo4jGraph, question: str):
+        """
+        Generate and run the Cypher, escalating to escalation_llm once if the statement
+        fails validation or raises an error. The first attempt sees only the part of the
+        schema relevant to the question; the escalated attempt sees the full schema.
+        Literals are executed as parameters (see tools/cypher_params.py), so the same question
+        about another name reuses the cached plan; the returned Cypher keeps them inline.
+
+        Returns:
+            tuple: (cypher, rows, graph payload or None)
+        """
+        schema_subset = get_schema_catalog(graph).subset(question) if use_schema_subset() else None
+        attempts = [(self.cypher_llm, schema_subset or graph.get_schema)]
+        if self.escalation_llm is not None and self.escalation_llm is not self.cypher_llm:
+            attempts.append((self.escalation_llm, graph.get_schema))
+
+        for attempt, (llm, schema) in enumerate(attempts, start=1):
+            cypher = self._generate_cypher(llm, question, schema)
+            logger.debug("Generated Cypher (attempt %d):\n%s", attempt, cypher)
+            error = validate_cypher(cypher)
+            if error is None:
+                template, params = parameterize(cypher) if use_parameters() else (cypher, {})
+                get_metrics().record_cache("cypher_template", hit=get_template_tracker().seen(template))
+                try:
+                    with stage("query_execution"):
+                        rows, payload, total = query_with_graph(graph, template, params, max_rows=self.top_k)
+                    get_metrics().observe("chatbot_cypher_rows", total)
+                    get_metrics().increment("chatbot_cypher_attempts", attempt=str(attempt), result="ok")
+                    return cypher, rows, payload
+                except Exception as e:
+                    error = str(e)
+                    get_metrics().increment("chatbot_cypher_attempts", attempt=str(attempt), result="error")
+            else:
+                get_metrics().increment("chatbot_cypher_attempts", attempt=str(attempt), result="invalid")
+            if attempt < len(attempts):
+                logger.info("Cypher failed (%s), escalating to a larger model", error)
+        raise ValueError(f"Could not generate a valid Cypher statement: {error}")
     
-    def _run(self, query: str) -> str:
-        """Execute the tool."""
+    def _run(self, query: str) -> Tuple[Any, Optional[GraphPayload]]:
+        """Execute the tool; returns the content for the model and the graph payload (or None)"""
         try:
-            chain = GraphCypherQAChain.from_llm(
-                self.llm,
-                graph=Neo4jGraph(
-                    url=os.getenv("NEO4J_URI", "bolt://localhost:7687"),
-                    username=os.getenv("NEO4J_USER", "neo4j"),
-                    password=os.getenv("NEO4J_PASSWORD", "password")
-                ),
-                verbose=True,
-                return_intermediate_steps=True,
-                cypher_prompt=cypher_prompt,
-                qa_prompt=qa_prompt,
-                allow_dangerous_requests = True
-            )
-            
-            return chain.invoke(query)
+            # Shared driver; the schema is fetched once per process, not on every call
+            graph = get_graph()
+            cypher, rows, payload = self._generate_and_execute(graph, query)
+            if self.direct_results:
+                return format_direct_result(query, cypher, rows), payload
+
+            qa_chain = qa_prompt | self.qa_llm | StrOutputParser()
+            with stage("qa"):
+                answer = qa_chain.invoke({"question": query, "context": rows})
+            result = {
+                "query": query,
+                "result": answer,
+                "intermediate_steps": [{"query": cypher}, {"context": rows}]
+            }
+            return result, payload
         except Exception as e:
-            return f"Error querying database: {str(e)}"
+            return f"Error querying database: {str(e)}", None
             
     def _arun(self, query: str) -> str:
         """TODO: Implement async version if needed"""
@@ -0,0 +1,148 @@
+# tools/graph_result.py
+
+"""
+Compact graph payload of a Cypher result.
+
+Neo4jGraph.query turns nodes into property dicts and relationships into (start, type,
+end) tuples of property dicts, which loses node identity and labels. query_with_graph
+runs the statement on the driver instead and, next to the same rows, collects the
+Node, Relationship and Path values of the records into a payload with one entry per
+node:
+
+    {
+        "nodes": [{"id": element id, "labels": [...], "properties": {...}}],
+        "relationships": [{"id": element id, "type": ..., "start": node id, "end": node id,
+                           "properties": {...}}]
+    }
+"""
+
+import os
+from typing import Any, Dict, List, Optional, Tuple
+from neo4j import Query
+from neo4j.graph import Node, Path, Relationship
+
+GraphPayload = Dict[str, List[Dict[str, Any]]]
+
+# One hop around a node, for the graph explorer; bounded and parameterized so the plan is cached
+NEIGHBOR_QUERY = """
+MATCH (n)-[r]-(m)
+WHERE elementId(n) = $node_id
+RETURN n, r, m
+LIMIT $limit
+"""
+
+
+def plain_properties(properties: Dict[str, Any]) -> Dict[str, Any]:
+    """JSON-ready properties without empty values and embedding vectors"""
+    result = {}
+    for key, value in properties.items():
+        if value in (None, "", [], {}) or "embedding" in key.lower():
+            continue
+        if isinstance(value, (list, tuple)):
+            value = [v if isinstance(v, (str, int, float, bool)) else str(v) for v in value]
+        elif not isinstance(value, (str, int, float, bool)):
+            # Temporal and spatial values
+            value = str(value)
+        result[key] = value
+    return result
+
+
+class GraphCollector:
+    """Collects nodes and relationships, deduplicated by element id, from result values"""
+
+    def __init__(self):
+        self.nodes: Dict[str, Dict[str, Any]] = {}
+        self.relationships: Dict[str, Dict[str, Any]] = {}
+
+    def add_node(self, node_id: str, labels: List[str], properties: Dict[str, Any]) -> None:
+        known = self.nodes.get(node_id)
+        # Relationship endpoints that were not returned themselves come without labels or properties
+        if known is None or (not known["labels"] and labels):
+            self.nodes[node_id] = {"id": node_id, "labels": labels, "properties": plain_properties(properties)}
+
+    def add_relationship(self, rel_id: str, rel_type: str, start: str, end: str, properties: Dict[str, Any]) -> None:
+        if rel_id not in self.relationships:
+            self.relationships[rel_id] = {
+                "id": rel_id, "type": rel_type, "start": start, "end": end, "properties": plain_properties(properties)
+            }
+
+    def add(self, value: Any) -> None:
+        """Add the graph values found in a record value (lists and maps are searched too)"""
+        if isinstance(value, Node):
+            self.add_node(value.element_id, sorted(value.labels), dict(value))
+        elif isinstance(value, Relationship):
+            for node in value.nodes:
+                self.add(node)
+            self.add_relationship(
+                value.element_id, value.type, value.start_node.element_id, value.end_node.element_id, dict(value)
+            )
+        elif isinstance(value, Path):
+            for node in value.nodes:
+                self.add(node)
+            for relationship in value.relationships:
+                self.add(relationship)
+        elif isinstance(value, (list, tuple)):
+            for item in value:
+                self.add(item)
+        elif isinstance(value, dict):
+            for item in value.values():
+                self.add(item)
+
+    def payload(self) -> Optional[GraphPayload]:
+        """The payload, or None if the values had no nodes"""
+        if not self.nodes:
+            return None
+        return {"nodes": list(self.nodes.values()), "relationships": list(self.relationships.values())}
+
+
+def query_with_graph(graph: Any, cypher: str, params: Optional[Dict[str, Any]] = None,
+                     max_rows: Optional[int] = None) -> Tuple[List[Dict[str, Any]], Optional[GraphPayload], int]:
+    """
+    Run a statement and return its rows (as Neo4jGraph.query does) and the graph payload
+    of the kept rows.
+
+    Graphs without a driver (the cassette and synthetic stand-ins) provide their own
+    query_with_graph; any other graph falls back to graph.query without a payload.
+
+    Args:
+        graph: Neo4jGraph or stand-in
+        cypher: The statement
+        params: Query parameters
+        max_rows: Keep only the first max_rows rows (all by default)
+
+    Returns:
+        tuple: (rows, payload or None, total row count)
+    """
+    params = params or {}
+    if hasattr(graph, "query_with_graph"):
+        return graph.query_with_graph(cypher, params, max_rows)
+    driver = getattr(graph, "_driver", None)
+    if driver is None:
+        rows = graph.query(cypher, params)
+        return rows[:max_rows], None, len(rows)
+
+    collector = GraphCollector()
+    rows = []
+    total = 0
+    with driver.session(database=graph._database) as session:
+        for record in session.run(Query(text=cypher, timeout=getattr(graph, "timeout", None)), params):
+            total += 1
+            if max_rows is not None and total > max_rows:
+                continue
+            rows.append(record.data())
+            collector.add(record.values())
+    if getattr(graph, "sanitize", False):
+        from langchain_neo4j.graphs.neo4j_graph import value_sanitize
+
+        rows = [value_sanitize(row) for row in rows]
+    return rows, collector.payload(), total
+
+
+def expand_neighbors(graph: Any, node_id: str, limit: Optional[int] = None) -> Optional[GraphPayload]:
+    """
+    Graph payload of the neighbours of a node, at most `limit` relationships
+    (default GRAPH_EXPLORER_EXPAND_LIMIT, 25).
+    """
+    limit = limit or int(os.getenv("GRAPH_EXPLORER_EXPAND_LIMIT", "25"))
+    _, payload, _ = query_with_graph(graph, NEIGHBOR_QUERY, {"node_id": node_id, "limit": limit})
+    return payload
@@ -0,0 +1,56 @@
+# tools/graph_store.py
+
+import os
+import threading
+from typing import Optional
+from langchain_neo4j import Neo4jGraph
+from agents.utils.cassettes import CassetteGraph, get_cassette_store
+
+_graph: Optional[Neo4jGraph] = None
+_graph_lock = threading.Lock()
+
+
+def get_graph() -> Neo4jGraph:
+    """
+    Process-wide Neo4jGraph (one driver and connection pool) built from the NEO4J_* env vars.
+    With CASSETTE_MODE set, queries are recorded or replayed (no database when replaying).
+    """
+    global _graph
+    with _graph_lock:
+        if _graph is None:
+            store = get_cassette_store()
+            if store is not None and store.mode == "replay":
+                _graph = CassetteGraph(None, store)
+            else:
+                _graph = Neo4jGraph(
+                    url=os.getenv("NEO4J_URI", "bolt://localhost:7687"),
+                    username=os.getenv("NEO4J_USER", "neo4j"),
+                    password=os.getenv("NEO4J_PASSWORD", "password")
+                )
+                if store is not None:
+                    _graph = CassetteGraph(_graph, store)
+        return _graph
+
+
+def set_graph(graph: Neo4jGraph) -> None:
+    """Use `graph` as the process-wide graph (e.g. an in-memory stand-in for benchmarks)"""
+    global _graph
+    with _graph_lock:
+        _graph = graph
+
+
+def get_data_version(graph: Neo4jGraph = None) -> str:
+    """
+    Version of the loaded OFAC data, used to invalidate caches after a reload.
+
+    OFAC_DATA_VERSION (e.g. the publication date of the loaded list) takes precedence.
+    Otherwise the node and relationship counts are used, which come from the count store
+    and are cheap to read.
+    """
+    version = os.getenv("OFAC_DATA_VERSION")
+    if version:
+        return version
+    graph = graph or get_graph()
+    nodes = graph.query("MATCH (n) RETURN count(n) AS count")[0]["count"]
+    relationships = graph.query("MATCH ()-[r]->() RETURN count(r) AS count")[0]["count"]
+    return f"{nodes}:{relationships}"
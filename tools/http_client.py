@@ -0,0 +1,156 @@
+# tools/http_client.py
+
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Deque, Dict, Optional
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+class DeadlineExceeded(TimeoutError):
+    """The request did not complete within its deadline"""
+
+
+class LatencyTracker:
+    """Rolling window of request latencies for one endpoint"""
+
+    def __init__(self, size: int = 200, min_samples: int = 20):
+        self.samples: Deque[float] = deque(maxlen=size)
+        self.min_samples = min_samples
+        self._lock = threading.Lock()
+
+    def add(self, latency: float) -> None:
+        with self._lock:
+            self.samples.append(latency)
+
+    def percentile(self, p: float) -> Optional[float]:
+        """p-th percentile of the window, or None until min_samples are recorded"""
+        with self._lock:
+            if len(self.samples) < self.min_samples:
+                return None
+            ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+
+
+class HttpClient:
+    """
+    Shared keep-alive HTTP session with per-request deadlines and optional hedging.
+
+    Connections are pooled per host and failed requests (connection errors, 429/5xx) are
+    retried with backoff. Every call has a total deadline: when it passes, DeadlineExceeded
+    is raised instead of waiting for the upstream. With hedging enabled, a second identical
+    request is sent when the first has not answered after the endpoint's p95 latency (or
+    `hedge_after`), and the first response wins. Only hedge idempotent requests.
+
+    Args:
+        pool_size: Max pooled connections per host (and worker threads)
+        retries: Retries for connection errors and 429/5xx responses
+        connect_timeout: Seconds to establish a connection
+        read_timeout: Seconds between bytes of the response
+        deadline: Default total seconds per call, including retries
+        hedge: Send a hedged request after the p95 latency
+    """
+
+    def __init__(self, pool_size: int = 20, retries: int = 2, connect_timeout: float = 3.05,
+                 read_timeout: float = 10.0, deadline: float = 15.0, hedge: bool = False):
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.deadline = deadline
+        self.hedge = hedge
+        self.session = requests.Session()
+        retry = Retry(
+            total=retries,
+            read=0,
+            backoff_factor=0.3,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset({"GET", "POST"}),
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=10, pool_maxsize=pool_size, max_retries=retry)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.latency: Dict[str, LatencyTracker] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=pool_size * 2, thread_name_prefix="http-client")
+
+    def _tracker(self, url: str) -> LatencyTracker:
+        with self._lock:
+            return self.latency.setdefault(url, LatencyTracker())
+
+    def post_json(self, url: str, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None,
+                  deadline: Optional[float] = None, hedge_after: Optional[float] = None) -> Dict[str, Any]:
+        """
+        POST a JSON payload and return the decoded JSON response.
+
+        Raises:
+            DeadlineExceeded: No response within the deadline
+            requests.RequestException: The request failed after retries
+        """
+        deadline = deadline or self.deadline
+        expires = time.monotonic() + deadline
+        tracker = self._tracker(url)
+
+        def attempt() -> Dict[str, Any]:
+            remaining = expires - time.monotonic()
+            if remaining <= 0:
+                raise DeadlineExceeded(f"Deadline of {deadline}s exceeded for {url}")
+            started = time.monotonic()
+            response = self.session.post(
+                url,
+                json=payload,
+                headers=headers,
+                timeout=(min(self.connect_timeout, remaining), min(self.read_timeout, remaining))
+            )
+            response.raise_for_status()
+            tracker.add(time.monotonic() - started)
+            return response.json()
+
+        pending = {self._executor.submit(attempt)}
+        if hedge_after is None and self.hedge:
+            hedge_after = tracker.percentile(95)
+        if hedge_after is not None and hedge_after < deadline:
+            done, _ = wait(pending, timeout=hedge_after)
+            if not done:
+                pending.add(self._executor.submit(attempt))
+
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = wait(pending, timeout=max(0.0, expires - time.monotonic()), return_when=FIRST_COMPLETED)
+            if not done:
+                break
+            for future in done:
+                if future.exception() is None:
+                    return future.result()
+                error = future.exception()
+        if error is not None and not pending and not isinstance(error, requests.Timeout):
+            raise error
+        raise DeadlineExceeded(f"Deadline of {deadline}s exceeded for {url}")
+
+
+_client: Optional[HttpClient] = None
+_client_lock = threading.Lock()
+
+
+def get_http_client() -> HttpClient:
+    """
+    Process-wide HTTP client.
+
+    Env vars: HTTP_POOL_SIZE (20), HTTP_RETRIES (2), HTTP_CONNECT_TIMEOUT (3.05),
+    HTTP_READ_TIMEOUT (10), HTTP_DEADLINE (15), HTTP_HEDGE (false).
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = HttpClient(
+                pool_size=int(os.getenv("HTTP_POOL_SIZE", "20")),
+                retries=int(os.getenv("HTTP_RETRIES", "2")),
+                connect_timeout=float(os.getenv("HTTP_CONNECT_TIMEOUT", "3.05")),
+                read_timeout=float(os.getenv("HTTP_READ_TIMEOUT", "10")),
+                deadline=float(os.getenv("HTTP_DEADLINE", "15")),
+                hedge=os.getenv("HTTP_HEDGE", "false").strip().lower() in ("1", "true", "yes", "on")
+            )
+        return _client
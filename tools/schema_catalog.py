@@ -0,0 +1,187 @@
+# tools/schema_catalog.py
+
+import re
+import threading
+from typing import Any, Dict, List, Optional, Set
+
+# Question words mapped to the words used in label, relationship and property names
+SYNONYMS = {
+    "aka": "alias",
+    "nickname": "alias",
+    "sanctioned": "sanction",
+    "designated": "sanction",
+    "listed": "sanction",
+    "sdgt": "program",
+    "passport": "document",
+    "id": "document",
+    "identity": "document",
+    "live": "address",
+    "lives": "address",
+    "located": "address",
+    "country": "address",
+    "city": "address",
+    "born": "birth",
+    "individual": "person",
+    "people": "person",
+    "persons": "person",
+    "who": "person",
+}
+
+# Words that also appear in relationship names (HAS_ALIAS, SANCTIONED_BY) but carry no meaning
+STOPWORDS = frozenset("a an the of in on at to by for with from has have had is are was be more than one".split())
+
+# Questions asking for everything about an entity need the full schema
+BROAD_WORDS = frozenset({"information", "everything", "detail", "profile", "connection", "relationship", "related"})
+
+# Words shared by properties of many labels, not used to match labels through their properties
+GENERIC_PROPERTY_WORDS = frozenset({"name", "full", "type", "id"})
+
+# Properties kept for labels that are only included to connect the matched ones
+IDENTIFYING_PROPERTY = re.compile(r"name|id$|number|type|title", re.IGNORECASE)
+
+
+def name_words(name: str) -> Set[str]:
+    """Lowercase words of a CamelCase or SNAKE_CASE name, singular"""
+    words = re.findall(r"[A-Z]?[a-z]+|[A-Z]+(?![a-z])|\d+", name)
+    return {singular(w.lower()) for w in words} | {singular(name.lower())}
+
+
+def singular(word: str) -> str:
+    if len(word) > 4 and word.endswith("ies"):
+        return word[:-3] + "y"
+    if len(word) > 3 and word.endswith("es") and word[-3] in "sx":
+        return word[:-2]
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+def question_words(question: str) -> Set[str]:
+    words = set()
+    for word in re.findall(r"[a-z0-9]+", question.lower()):
+        if word in STOPWORDS:
+            continue
+        words.add(singular(word))
+        for form in (word, singular(word)):
+            if form in SYNONYMS:
+                words.add(SYNONYMS[form])
+    return words
+
+
+class SchemaCatalog:
+    """
+    Precomputed catalog of the graph schema that renders the part relevant to a question.
+
+    Labels, relationship types and properties are matched against the question words
+    (with a few domain synonyms). Relationship types connecting matched labels to the most
+    connected label (e.g. Person) are added so that the generated query can join them. The
+    rendered schema is sorted so that the same selection always gives the same string.
+
+    Args:
+        structured_schema: Neo4jGraph.get_structured_schema
+    """
+
+    def __init__(self, structured_schema: Dict[str, Any]):
+        self.node_props: Dict[str, List[Dict[str, Any]]] = structured_schema.get("node_props", {})
+        self.rel_props: Dict[str, List[Dict[str, Any]]] = structured_schema.get("rel_props", {})
+        self.relationships: List[Dict[str, str]] = sorted(
+            structured_schema.get("relationships", []),
+            key=lambda r: (r["start"], r["type"], r["end"])
+        )
+        self.label_words = {label: name_words(label) for label in self.node_props}
+        self.rel_words = {r["type"]: name_words(r["type"]) for r in self.relationships}
+        self.prop_words = {
+            label: {p["property"]: name_words(p["property"]) for p in props}
+            for label, props in self.node_props.items()
+        }
+        degree: Dict[str, int] = {}
+        for r in self.relationships:
+            degree[r["start"]] = degree.get(r["start"], 0) + 1
+            degree[r["end"]] = degree.get(r["end"], 0) + 1
+        self.anchor: Optional[str] = max(degree, key=lambda label: (degree[label], label)) if degree else None
+
+    def select(self, question: str):
+        """
+        Labels and relationship types relevant to the question.
+
+        Returns:
+            tuple: (matched labels, all included labels, relationship types); empty if nothing
+            matched or the question asks for everything about an entity
+        """
+        words = question_words(question)
+        if words & BROAD_WORDS:
+            return set(), set(), set()
+        property_words = words - GENERIC_PROPERTY_WORDS
+        matched = {
+            label for label, label_words in self.label_words.items()
+            if label_words & words or any(w & property_words for w in self.prop_words[label].values())
+        }
+        rel_types = {t for t, rel_words in self.rel_words.items() if rel_words & words}
+        if not matched and not rel_types:
+            return set(), set(), set()
+
+        for r in self.relationships:
+            if r["type"] in rel_types:
+                matched.update((r["start"], r["end"]))
+        labels = set(matched)
+        if self.anchor:
+            labels.add(self.anchor)
+        # Connect every included label to the others
+        for r in self.relationships:
+            if r["start"] in labels and r["end"] in labels:
+                rel_types.add(r["type"])
+        return matched, labels, rel_types
+
+    def render(self, matched: Set[str], labels: Set[str], rel_types: Set[str]) -> str:
+        """Compact schema text in the Neo4jGraph.get_schema layout"""
+        lines = ["Node properties:"]
+        for label in sorted(labels):
+            props = self.node_props.get(label, [])
+            if label not in matched and label != self.anchor:
+                props = [p for p in props if IDENTIFYING_PROPERTY.search(p["property"])]
+            lines.append(f"{label} {{{', '.join(self._format_property(p, label in matched) for p in props)}}}")
+
+        rel_lines = [
+            f"{rel_type} {{{', '.join(self._format_property(p, False) for p in self.rel_props[rel_type])}}}"
+            for rel_type in sorted(rel_types) if self.rel_props.get(rel_type)
+        ]
+        if rel_lines:
+            lines.append("Relationship properties:")
+            lines.extend(rel_lines)
+
+        lines.append("The relationships:")
+        lines.extend(
+            f"(:{r['start']})-[:{r['type']}]->(:{r['end']})"
+            for r in self.relationships if r["type"] in rel_types and r["start"] in labels and r["end"] in labels
+        )
+        return "\n".join(lines)
+
+    @staticmethod
+    def _format_property(prop: Dict[str, Any], with_values: bool) -> str:
+        text = f"{prop['property']}: {prop.get('type', 'STRING')}"
+        values = prop.get("values")
+        if with_values and values:
+            text += f" (e.g. {', '.join(repr(v) for v in values[:5])})"
+        return text
+
+    def subset(self, question: str) -> Optional[str]:
+        """Schema text for the question, or None if nothing matched (use the full schema)"""
+        matched, labels, rel_types = self.select(question)
+        if not labels:
+            return None
+        return self.render(matched, labels, rel_types)
+
+
+_catalog: Optional[SchemaCatalog] = None
+_catalog_lock = threading.Lock()
+
+
+def get_schema_catalog(graph: Any, refresh: bool = False) -> SchemaCatalog:
+    """Process-wide catalog built from the graph's (already fetched) structured schema"""
+    global _catalog
+    with _catalog_lock:
+        if _catalog is None or refresh:
+            if refresh:
+                graph.refresh_schema()
+            _catalog = SchemaCatalog(graph.get_structured_schema)
+        return _catalog
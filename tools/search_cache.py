@@ -0,0 +1,125 @@
+# tools/search_cache.py
+
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional
+from agents.utils.metrics import get_metrics
+
+
+class SearchCache:
+    """
+    Disk-backed TTL cache for web search payloads with single-flight deduplication.
+
+    Each entry is one JSON file named by the hash of the normalized query and the search
+    parameters. While a query is being fetched, identical concurrent lookups wait for that
+    fetch instead of sending their own upstream request.
+
+    Args:
+        directory: Where the entries are stored
+        ttl: Seconds an entry stays valid
+    """
+
+    def __init__(self, directory: str = "search_cache", ttl: float = 6 * 3600):
+        self.directory = directory
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, Future] = {}
+
+    @staticmethod
+    def make_key(query: str, **params: Any) -> str:
+        """Cache key of a query (case and whitespace insensitive) and its search parameters"""
+        normalized = " ".join(query.lower().split())
+        return hashlib.sha256(json.dumps({"query": normalized, **params}, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Cached payload, or None if missing or expired"""
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        if time.time() - entry["stored_at"] > self.ttl:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+        return entry["value"]
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"stored_at": time.time(), "value": value}, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def get_or_fetch(self, key: str, fetch: Callable[[], Dict[str, Any]],
+                     cacheable: Callable[[Dict[str, Any]], bool] = lambda value: True) -> Dict[str, Any]:
+        """
+        Cached payload for `key`, calling `fetch` on a miss. Only one fetch per key runs at a
+        time; concurrent callers get its result. Payloads rejected by `cacheable` (e.g. errors)
+        are returned but not stored.
+        """
+        value = self.get(key)
+        with self._lock:
+            if value is not None:
+                self.hits += 1
+                get_metrics().record_cache("web_search", hit=True)
+                return value
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[key] = future
+                self.misses += 1
+            else:
+                self.hits += 1
+            get_metrics().record_cache("web_search", hit=not leader)
+
+        if not leader:
+            return future.result()
+
+        try:
+            value = fetch()
+            if cacheable(value):
+                self.set(key, value)
+            future.set_result(value)
+            return value
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+
+_cache: Optional[SearchCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_search_cache() -> Optional[SearchCache]:
+    """
+    Process-wide search cache, or None if WEB_SEARCH_CACHE_TTL is 0.
+
+    Env vars: WEB_SEARCH_CACHE_DIR (default search_cache), WEB_SEARCH_CACHE_TTL (seconds,
+    default 21600).
+    """
+    global _cache
+    ttl = float(os.getenv("WEB_SEARCH_CACHE_TTL", str(6 * 3600)))
+    if ttl <= 0:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = SearchCache(os.getenv("WEB_SEARCH_CACHE_DIR", "search_cache"), ttl=ttl)
+        return _cache
@@ -0,0 +1,40 @@
+# tools/tavily_api.py
+
+import os
+from typing import Any, Dict, Optional
+from agents.utils.cassettes import get_cassette_store
+from tools.http_client import get_http_client
+
+TAVILY_API_URL = "https://api.tavily.com"
+
+
+def tavily_search(query: str, deadline: Optional[float] = None, **params: Any) -> Dict[str, Any]:
+    """
+    Call the Tavily search endpoint through the shared HTTP client.
+
+    Args:
+        query: Search query
+        deadline: Total seconds allowed (env TAVILY_DEADLINE, default 8)
+        **params: Tavily search parameters (search_depth, max_results, include_answer, ...)
+
+    Returns:
+        dict: The raw Tavily response
+
+    Raises:
+        DeadlineExceeded: No response within the deadline
+    """
+    api_key = os.getenv("TAVILY_API_KEY")
+    base_url = os.getenv("TAVILY_API_URL", TAVILY_API_URL).rstrip("/")
+
+    def call() -> Dict[str, Any]:
+        return get_http_client().post_json(
+            f"{base_url}/search",
+            {"query": query, "api_key": api_key, **params},
+            headers={"Content-Type": "application/json", "Authorization": f"Bearer {api_key}"},
+            deadline=deadline or float(os.getenv("TAVILY_DEADLINE", "8"))
+        )
+
+    store = get_cassette_store()
+    if store is not None:
+        return store.play("tavily", {"query": query, **params}, call)
+    return call()
@@ -2,7 +2,9 @@
 
 from typing import Any
 from langchain.tools import BaseTool
-from langchain_community.tools.tavily_search import TavilySearchResults
+from tools.tavily_api import tavily_search
+from tools.condense import condense_results
+import os
 
 class TavilySearchTool(BaseTool):
     """Tool for performing web searches using Tavily"""
@@ -18,15 +20,21 @@ class TavilySearchTool(BaseTool):
     def _run(self, query: str) -> str:
         """Run the tool."""
         try:
-            search = TavilySearchResults(
+            # Shared keep-alive session with a deadline instead of a new client per call
+            response = tavily_search(
+                query,
                 max_results=3,
                 search_depth='advanced',
                 include_answer=True,
                 include_raw_content=True,
             )
-            
-            response = search.invoke(query)
-            return str(response)
+            # Keep only the raw-content sentences that match the query
+            results = condense_results(
+                query,
+                response.get("results", []),
+                max_tokens=int(os.getenv("WEB_SEARCH_CONTEXT_TOKENS", "600"))
+            )
+            return str(results)
         except Exception as e:
             return f"Error performing web search: {str(e)}"
             
@@ -3,10 +3,13 @@
 from typing import List, Optional, Dict, Any
 from pydantic import BaseModel, Field
 from langchain.tools import BaseTool
-from tavily import TavilyClient
 import os
 from dotenv import load_dotenv
 import json
+from tools.search_cache import SearchCache, get_search_cache
+from tools.tavily_api import tavily_search
+from tools.condense import condense_search_payload
+from agents.utils.timing import stage
 
 class SearchResult(BaseModel):
     """Structure for web search results"""
@@ -38,20 +41,32 @@ class TavilySearchTool(BaseTool):
         Do NOT use this tool for general web searches or unrelated topics."""
     
     def _run(self, query: str) -> Dict[str, Any]:
-        """Run the tool."""
+        """Run the tool, serving repeated queries from the search cache.
+        The full payload is cached; the agent gets the condensed version."""
+        params = dict(
+            search_depth="advanced",
+            include_answer="advanced",
+            include_raw_content=False,
+            include_images=True,
+            max_results=3
+        )
+        cache = get_search_cache()
+        if cache is None:
+            return condense_search_payload(self._search(query, params))
+        results = cache.get_or_fetch(
+            SearchCache.make_key(query, **params),
+            lambda: self._search(query, params),
+            cacheable=lambda results: "error" not in results
+        )
+        return condense_search_payload(results)
+
+    def _search(self, query: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Search Tavily and format the response (empty results if the deadline passes)."""
         try:
-            # Initialize Tavily client
-            client = TavilyClient(api_key=os.getenv("TAVILY_API_KEY"))
-            
-            # Get response from Tavily
-            response = client.search(
-                query=query,
-                search_depth="advanced",
-                include_answer="advanced",
-                include_raw_content=False,
-                include_images=True,
-                max_results=3
-            )
+            # Get response from Tavily over the shared keep-alive session
+            # (TAVILY_API_URL points it to a stand-in server)
+            with stage("web_search"):
+                response = tavily_search(query, **params)
             
             # Create Pydantic model instance
             formatted_results = WebSearchResults(